@@ -1,21 +1,19 @@
 # Final assistant_backend.py
 
-import threading
-import queue
-import time
 import numpy as np
 import os
-import pymongo
 import pyaudio
-import streamlit as st
+import threading
 from dotenv import load_dotenv
 from groq import Groq
-from tts_generation import generate_audio
-from audio_capture import capture_audio
-from audio_playback import play_audio
+from transcription import get_transcriber
 from list_audio_devices import list_devices
-from pydub import AudioSegment, silence
-import streamlit.runtime.scriptrunner as scriptrunner
+from sessions import Session, SessionManager
+from transcript_store import get_transcript_store
+from blob_store import store_image
+from live_summary import LIVE_SUMMARY, LiveSummarizer
+from search_index import get_search_index
+from utils.audio_devices import find_input_device
 
 load_dotenv()
 
@@ -26,25 +24,12 @@ CHANNELS = 1
 
 DEFAULT_SILENCE_THRESH_DBFS = -40
 MIN_SILENCE_MS = 700
-URGENT_FLUSH_SECONDS = 10
-MIN_AUDIO_DURATION_SECONDS = 1.5
-MIN_ACCUMULATED_DURATION = 2.0
-
-# Initialize clients
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-MONGO_CONNECTION = os.getenv("MONGO_CONNECTION")
-mongo_client = pymongo.MongoClient(MONGO_CONNECTION)
-db = mongo_client["materials"]
-collection = db["transcripts"]
-
-MODEL = "whisper-large-v3-turbo"
-
-# Globals
-current_transcript_lines = []
-uploaded_images = []  # Stores uploaded images (as PIL objects or file buffers)
-image_summaries = []  # Stores generated image summaries
-audio_queue = queue.Queue()
-playback_queue = queue.Queue()
+
+INPUT_LANGUAGE = os.getenv("INPUT_LANGUAGE", "auto")
+TARGET_LANGUAGE = os.getenv("TARGET_LANGUAGE", "en")
+
+# Sessions: one per browser session (or lecture hall), all sharing one set of API clients
+manager = SessionManager()
 
 # ElevenLabs Voice IDs Mapping
 ELEVENLABS_VOICE_IDS = {
@@ -55,141 +40,150 @@ ELEVENLABS_VOICE_IDS = {
 
 # Configs
 speaking_threshold = 0.01  # RMS threshold for speech detection
-assistant_running_flag = threading.Event()
 
 # --- Utilities ---
 def detect_speaking(audio_np):
     rms = np.sqrt(np.mean(audio_np**2))
     return rms > speaking_threshold
 
-def current_volume_level():
+def current_volume_level(session_name="default"):
     # Fake value if not speaking
-    return 20 if assistant_running_flag.is_set() else 0
+    session = manager.get(session_name)
+    return 20 if session is not None and session.running else 0
+
+def get_session(session_name="default") -> Session:
+    """
+    The named session, created with the default settings on first use. Each call
+    marks it as in use and drops other sessions idle for SESSION_IDLE_SECONDS
+    (e.g. of browser tabs that were closed).
+    """
+    manager.prune()
+    session = manager.get(session_name)
+    if session is None:
+        try:
+            session = manager.add(Session(
+                name=session_name,
+                input_language=INPUT_LANGUAGE,
+                target_language=TARGET_LANGUAGE,
+                voice_id=ELEVENLABS_VOICE_IDS["Voice 1"],
+                silence_thresh=DEFAULT_SILENCE_THRESH_DBFS,
+                min_silence_ms=MIN_SILENCE_MS
+            ))
+        except ValueError:
+            session = manager.get(session_name)  # created concurrently by another rerun
+        else:
+            if LIVE_SUMMARY:
+                session.summarizer = LiveSummarizer()
+    session.touch()
+    return session
+
+def set_voice(chosen_voice, session_name="default"):
+    """Called from the page on every rerun; the runtime reads it per segment (worker threads can't see session_state)."""
+    get_session(session_name).voice_id = ELEVENLABS_VOICE_IDS.get(chosen_voice, ELEVENLABS_VOICE_IDS["Voice 1"])
+
+def set_glossary(terms, session_name="default"):
+    """Course vocabulary fed to Whisper with the rolling transcript context."""
+    get_session(session_name).set_glossary(terms)
 
 # --- Transcription ---
 def transcribe_audio_bytes(audio_bytes):
-    import tempfile
-    import wave
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmpfile:
-        with wave.open(tmpfile.name, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(SAMPLE_RATE)
-            wf.writeframes(audio_bytes)
-    with open(tmpfile.name, "rb") as audio_file:
-        result = client.audio.transcriptions.create(
-            file=audio_file,
-            model=MODEL,
-            response_format="text",
-            temperature=0.0,
-        )
-    return result.strip()
-
-# --- Threads ---
-def capture_loop(input_device_index=None):
-    scriptrunner.add_script_run_ctx(threading.current_thread())
-    mic_stream = capture_audio(chunk=CHUNK_SIZE, rate=SAMPLE_RATE, input_device_index=input_device_index)
-    for chunk in mic_stream:
-        if not assistant_running_flag.is_set():
-            break
-        audio_queue.put(chunk)
-
-def processing_loop():
-    scriptrunner.add_script_run_ctx(threading.current_thread())
-    global current_transcript
-    buffer = bytearray()
-    last_flush = time.time()
-
-    while assistant_running_flag.is_set():
-        try:
-            chunk = audio_queue.get(timeout=1)
-            buffer.extend(chunk)
-
-            audio_np = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
-
-            duration_sec = len(buffer) / (SAMPLE_RATE * BYTES_PER_SAMPLE)
-
-            if duration_sec >= 2 or (time.time() - last_flush) > 5:
-                transcript = transcribe_audio_bytes(buffer)
-                if transcript:
-                    current_transcript_lines.append(transcript.strip())
-                    try:
-                        # Fetch the current selected voice
-                        chosen_voice = st.session_state.get("chosen_voice", "Voice 1")
-                        voice_id = ELEVENLABS_VOICE_IDS.get(chosen_voice, ELEVENLABS_VOICE_IDS["Voice 1"])
-
-                        # Pass the voice_id into generate_audio
-                        tts_audio = generate_audio(transcript, voice_id=voice_id)
-
-                        if tts_audio:
-                            playback_queue.put(tts_audio)
-                    except Exception as e:
-                        print(f"[ERROR] TTS failed: {e}")
-
-                buffer = bytearray()
-                last_flush = time.time()
-
-        except queue.Empty:
-            pass
-
-def playback_loop():
-    scriptrunner.add_script_run_ctx(threading.current_thread())
-    while assistant_running_flag.is_set():
-        try:
-            audio_data = playback_queue.get(timeout=1)
-            play_audio(audio_data)
-        except queue.Empty:
-            pass
+    return get_transcriber().transcribe(audio_bytes, SAMPLE_RATE) or ""
 
 # --- Main API ---
-def start_assistant(input_device_name, output_device_name):
-    assistant_running_flag.set()
-
-    # Find input device index manually
-    p = pyaudio.PyAudio()
-    input_device_index = None
-    for i in range(p.get_device_count()):
-        dev = p.get_device_info_by_index(i)
-        if dev.get('maxInputChannels') > 0 and input_device_name.lower() in dev.get('name').lower():
-            input_device_index = i
-            break
-    p.terminate()
+def start_assistant(input_device_name, output_device_name, session_name="default"):
+    session = get_session(session_name)
+    if session.running:
+        print(f"[WARN] Session '{session_name}' is already running.")
+        return session
 
+    input_device_index = find_input_device(input_device_name)
     if input_device_index is None:
         raise RuntimeError(f"Could not find input device containing '{input_device_name}'")
 
     print(f"[INFO] Using input device index {input_device_index} ({input_device_name})")
+    print(f"[INFO] Using transcriber: {get_transcriber().name}")
 
-    threading.Thread(target=capture_loop, args=(input_device_index,), daemon=True).start()
-    threading.Thread(target=processing_loop, daemon=True).start()
-    threading.Thread(target=playback_loop, daemon=True).start()
+    session.input_device_index = input_device_index
+    if session.lecture_id is None:
+        # Off the start path: with MongoDB down, connecting can take MONGO_TIMEOUT_MS
+        threading.Thread(target=_open_lecture, args=(session,), daemon=True, name="open-lecture").start()
+    return manager.start(session_name)
 
-def stop_assistant():
-    assistant_running_flag.clear()
+def stop_assistant(session_name="default"):
+    manager.stop(session_name)
 
-import base64
+_lecture_lock = threading.Lock()
 
-def save_transcript_to_mongo(transcript_text, chosen_voice="Unknown", lecture_name="Unnamed"):
+def _open_lecture(session):
+    try:
+        _ensure_lecture(session)
+    except Exception as e:
+        print(f"[WARN] Transcript will not be persisted live (MongoDB unavailable): {e}")
+
+def _ensure_lecture(session, voice="Unknown"):
+    """Open the session's lecture in the transcript store and persist its lines from now on."""
+    with _lecture_lock:
+        if session.lecture_id is None:
+            store = get_transcript_store()
+            lecture_id = store.open_lecture(voice=voice)
+            # Hook new lines before copying the existing ones: a line caught by both is upserted twice, none is missed
+            session.on_line = lambda index, text: store.append(lecture_id, index, text)
+            for index, line in enumerate(list(session.transcript_lines)):
+                store.append(lecture_id, index, line)
+            session.lecture_id = lecture_id
+            if session.summarizer is not None:
+                session.summarizer.on_update = lambda state: store.save_live_state(lecture_id, state)
+        return session.lecture_id
+
+def save_transcript_to_mongo(transcript_text, chosen_voice="Unknown", lecture_name="Unnamed", session_name="default"):
+    """
+    Finalize the session's lecture. Its lines were persisted while it ran, so this
+    only flushes the last few and writes the metadata; `transcript_text` is kept
+    for callers of the old signature. A stopped session is removed once saved:
+    the next page load starts a fresh one rather than appending to this lecture.
+    """
+    session = get_session(session_name)
     try:
-        # Encode uploaded images to base64
-        images_base64 = []
-        for uploaded_file in uploaded_images:
-            uploaded_file.seek(0)  # rewind file
-            images_base64.append(base64.b64encode(uploaded_file.read()).decode('utf-8'))
-
-        doc = {
-            "name": lecture_name,
-            "transcript": transcript_text.strip(),
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "voice": chosen_voice,
-            "image_summaries": image_summaries.copy(),  # summaries
-            "uploaded_images_base64": images_base64     # base64 images
-        }
-        collection.insert_one(doc)
-        return True
+        lecture_id = _ensure_lecture(session, chosen_voice)
+        get_transcript_store().save_lecture(
+            lecture_id,
+            segment_count=len(session.transcript_lines),
+            name=lecture_name,
+            voice=chosen_voice,
+            image_summaries=session.image_summaries.copy(),  # summaries
+            images=session.image_refs.copy()                 # blob references, not the images
+        )
     except Exception as e:
         print(f"[ERROR] Failed to save transcript to MongoDB: {e}")
         return False
+    if not session.running:
+        manager.remove(session_name)
+    # Off the Save click: indexing may embed the whole lecture
+    threading.Thread(target=_index_lecture, args=(lecture_id,), daemon=True, name="index-lecture").start()
+    return True
+
+def _index_lecture(lecture_id):
+    try:
+        get_search_index().index_lecture(lecture_id)
+    except Exception as e:
+        print(f"[WARN] Lecture saved but not indexed for search: {e}")
+
+def add_slide(uploaded_file, session_name="default"):
+    """
+    Summarize an uploaded slide and store it (plus a thumbnail) in the blob store; returns the summary.
+    If storing fails the summary is still kept, with no image (ref None).
+    """
+    session = get_session(session_name)
+    description = summarize_image(uploaded_file)
+    uploaded_file.seek(0)  # rewind file
+    try:
+        ref = store_image(uploaded_file.read(), getattr(uploaded_file, "type", None) or "image/png")
+    except Exception as e:
+        print(f"[WARN] Slide image not stored, keeping its summary only: {e}")
+        ref = None
+    session.image_summaries.append(description)
+    session.image_refs.append(ref)
+    return description
 
 def list_audio_devices():
     """List input and output devices separately."""
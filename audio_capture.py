@@ -1,8 +1,149 @@
+import os
+import threading
+import numpy as np
 import pyaudio
 
-def capture_audio(chunk=4096, rate=16000, input_device_index=None):
+# Seconds of mic audio the capture ring holds; a reader further behind than this loses the oldest audio
+CAPTURE_RING_SECONDS = float(os.getenv("CAPTURE_RING_SECONDS", "30"))
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size int16 ring filled by one writer (the PyAudio callback) and read
+    by any number of cursors. Nothing is allocated after construction: reads
+    return views into the ring, and a reader that falls more than `capacity`
+    samples behind skips ahead, with the lost samples counted as overruns.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._samples = np.zeros(capacity, dtype=np.int16)
+        self.written = 0           # total samples ever written
+        self.input_overflows = 0   # callbacks where PortAudio reported dropped input
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def write(self, data) -> None:
+        """Copy one block of 16-bit PCM (bytes or any buffer) into the ring."""
+        src = np.frombuffer(data, dtype=np.int16)
+        n = len(src)
+        if n > self.capacity:
+            src = src[-self.capacity:]
+        start = (self.written + n - len(src)) % self.capacity
+        first = min(len(src), self.capacity - start)
+        self._samples[start:start + first] = src[:first]
+        self._samples[:len(src) - first] = src[first:]
+        with self._cond:
+            self.written += n
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Wake every waiting reader; reads return None once the remaining audio is consumed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reader(self) -> "RingReader":
+        """A cursor starting at the current write position."""
+        return RingReader(self, self.written)
+
+    def stats(self) -> dict:
+        return {"written": self.written, "input_overflows": self.input_overflows, "capacity": self.capacity}
+
+
+class RingReader:
+    """One consumer's position in an AudioRingBuffer."""
+
+    def __init__(self, ring: AudioRingBuffer, position: int):
+        self.ring = ring
+        self.position = position
+        self.overruns = 0  # samples overwritten before this reader got to them
+
+    def read(self, n: int, timeout: float | None = None) -> memoryview | None:
+        """
+        Wait for the next `n` samples and return them as a byte-format memoryview
+        into the ring (a copy only if they wrap around the end). The view stays
+        valid until the writer laps it, i.e. for `capacity - n` more samples.
+        Returns None on timeout, or when the ring is closed and drained.
+        """
+        ring = self.ring
+        with ring._cond:
+            if not ring._cond.wait_for(lambda: ring.written - self.position >= n or ring._closed, timeout):
+                return None
+            if ring.written - self.position < n:
+                return None
+
+        behind = ring.written - self.position
+        if behind > ring.capacity:
+            # Lapped: jump to the oldest sample still in the ring, keeping n-sample alignment
+            skip = -(-(behind - ring.capacity) // n) * n
+            self.position += skip
+            self.overruns += skip
+
+        start = self.position % ring.capacity
+        self.position += n
+        if start + n <= ring.capacity:
+            return memoryview(ring._samples[start:start + n]).cast("B")
+        return memoryview(np.concatenate((ring._samples[start:], ring._samples[:start + n - ring.capacity]))).cast("B")
+
+
+def capture_audio(chunk=4096, rate=16000, input_device_index=None, ring_seconds=CAPTURE_RING_SECONDS):
+    """
+    Yields raw audio frames of size `chunk` from a callback-mode PyAudio stream.
+
+    PortAudio's thread copies each block into a preallocated AudioRingBuffer;
+    this generator yields memoryviews into that ring, so no per-chunk buffers
+    are allocated. Consume or copy each chunk within `ring_seconds`. Dropped
+    input (PortAudio overflow or a slow reader) is counted and reported, never
+    padded with silence.
+    """
+    # A whole number of chunks, so reads never straddle the wrap-around
+    ring = AudioRingBuffer(max(1, int(ring_seconds * rate / chunk)) * chunk)
+    reader = ring.reader()
+
+    def callback(in_data, frame_count, time_info, status):
+        ring.write(in_data)
+        if status & pyaudio.paInputOverflow:
+            ring.input_overflows += 1
+        return None, pyaudio.paContinue
+
+    p = pyaudio.PyAudio()
+    stream = p.open(
+        format=pyaudio.paInt16,
+        channels=1,
+        rate=rate,
+        input=True,
+        input_device_index=input_device_index,
+        frames_per_buffer=chunk,
+        stream_callback=callback
+    )
+
+    print("[INFO] Microphone stream started…")
+
+    overflows, overruns = 0, 0
+    try:
+        while stream.is_active():
+            data = reader.read(chunk, timeout=1.0)
+            if data is None:
+                continue
+            if ring.input_overflows != overflows or reader.overruns != overruns:
+                overflows, overruns = ring.input_overflows, reader.overruns
+                print(f"[WARN] Audio input dropped: {overflows} device overflows, "
+                      f"{overruns / rate:.2f}s overwritten before it was read.")
+            yield data
+
+    finally:
+        print("[INFO] Stopping audio capture.")
+        ring.close()
+        stream.stop_stream()
+        stream.close()
+        p.terminate()
+
+
+def capture_audio_blocking(chunk=4096, rate=16000, input_device_index=None):
     """
-    Yields raw audio frames of size `chunk`. On buffer overflow, yields silence instead of crashing.
+    The previous blocking-read capture: one new bytes object per chunk, and a
+    chunk of silence in place of audio lost to an overflow.
     """
     p = pyaudio.PyAudio()
     stream = p.open(
@@ -31,4 +172,4 @@ def capture_audio(chunk=4096, rate=16000, input_device_index=None):
         print("[INFO] Stopping audio capture.")
         stream.stop_stream()
         stream.close()
-        p.terminate()
\ No newline at end of file
+        p.terminate()
@@ -0,0 +1,31 @@
+# audio_encoding.py
+
+import struct
+
+
+def wav_header(data_size: int, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    44-byte RIFF/WAVE header for `data_size` bytes of little-endian PCM.
+    Same layout the `wave` module writes, without going through a file.
+    """
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+def pcm_to_wav_bytes(pcm: bytes, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Raw PCM → complete WAV file contents, in memory. Copies the PCM exactly once."""
+    return wav_header(len(pcm), sample_rate, channels, sample_width) + pcm
+
+
+def wav_upload(pcm: bytes, sample_rate: int = 16000, filename: str = "segment.wav") -> tuple[str, bytes]:
+    """
+    (filename, wav_bytes) tuple accepted as `file=` by the Groq audio endpoints,
+    so segments are uploaded straight from memory with no temp file.
+    """
+    return filename, pcm_to_wav_bytes(pcm, sample_rate)
@@ -1,10 +1,14 @@
+import asyncio
 import io
+import threading
+import pyaudio
 import simpleaudio as sa
 from pydub import AudioSegment
 
-def play_audio(audio_data: bytes) -> None:
+def play_audio(audio_data: bytes, trace=None) -> None:
     """
     Decode ElevenLabs MP3 bytes via pydub, then play raw PCM frames with simpleaudio.
+    `trace` (a tracing.SegmentTrace) gets decode / playback_start / playback_end marks.
     """
     if not audio_data:
         return
@@ -18,7 +22,147 @@ def play_audio(audio_data: bytes) -> None:
     nchannels  = audio_seg.channels
     sampwidth  = audio_seg.sample_width
     framerate  = audio_seg.frame_rate
+    if trace is not None:
+        trace.mark("decode")
 
     # 3) Play via simpleaudio
+    if trace is not None:
+        trace.mark("playback_start")
     play_obj = sa.play_buffer(raw_data, nchannels, sampwidth, framerate)
-    play_obj.wait_done()
\ No newline at end of file
+    play_obj.wait_done()
+    if trace is not None:
+        trace.mark("playback_end")
+
+
+def _frames(data: bytes, sample_width: int) -> tuple:
+    """(whole samples, leftover bytes) of `data`."""
+    usable = len(data) - len(data) % sample_width
+    return data[:usable], data[usable:]
+
+
+def iter_pcm_frames(chunks, sample_width: int = 2):
+    """
+    Re-chunk a byte stream so every piece holds whole samples.
+    HTTP chunk boundaries don't respect sample boundaries; a dangling byte is carried over.
+    """
+    carry = b""
+    for chunk in chunks:
+        frames, carry = _frames(carry + chunk if carry else chunk, sample_width)
+        if frames:
+            yield frames
+
+
+async def aiter_pcm_frames(chunks, sample_width: int = 2):
+    """iter_pcm_frames for an async chunk iterator."""
+    carry = b""
+    async for chunk in chunks:
+        frames, carry = _frames(carry + chunk if carry else chunk, sample_width)
+        if frames:
+            yield frames
+
+
+class PcmOutput:
+    """
+    One PyAudio instance and one 16-bit output stream, opened once and written
+    to segment after segment. Creating PyAudio and opening, draining and closing
+    a stream take tens of milliseconds each, which per segment would come before
+    every first sound. All methods block; async callers run them via
+    asyncio.to_thread. Between segments the stream simply plays silence.
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, output_device_index=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.output_device_index = output_device_index
+        self._p = None
+        self._stream = None
+        self._lock = threading.Lock()  # a write in a worker thread must finish before close()
+
+    def open(self) -> "PcmOutput":
+        """Open the device now rather than on the first write."""
+        with self._lock:
+            self._open()
+        return self
+
+    def _open(self):
+        if self._stream is None:
+            self._p = self._p or pyaudio.PyAudio()
+            self._stream = self._p.open(format=pyaudio.paInt16, channels=self.channels, rate=self.sample_rate,
+                                        output=True, output_device_index=self.output_device_index)
+
+    def write(self, frames: bytes) -> None:
+        with self._lock:
+            self._open()
+            self._stream.write(frames)
+
+    def close(self) -> None:
+        """Play out what is buffered and release the device."""
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+                self._stream = None
+            if self._p is not None:
+                self._p.terminate()
+                self._p = None
+
+
+def play_pcm_stream(chunks, sample_rate: int = 16000, channels: int = 1, output_device_index=None,
+                    trace=None, output: PcmOutput | None = None) -> None:
+    """
+    Play 16-bit PCM while it is still downloading: each chunk is written to a
+    PyAudio output stream as soon as it arrives. Pass an open PcmOutput to reuse
+    its stream; otherwise one is opened before the first chunk is awaited and
+    closed at the end.
+    """
+    own = output is None
+    if own:
+        output = PcmOutput(sample_rate, channels, output_device_index).open()
+    started = False
+    try:
+        for frames in iter_pcm_frames(chunks):
+            if not started and trace is not None:
+                trace.mark("playback_start")
+            started = True
+            output.write(frames)
+    finally:
+        if own:
+            output.close()
+        if trace is not None:
+            trace.mark("playback_end")
+
+
+def play_tts(tts_data, sample_rate: int = 16000, trace=None) -> None:
+    """Play whatever tts_generation.synthesize returned: MP3 bytes or a PCM chunk iterator."""
+    if isinstance(tts_data, (bytes, bytearray)):
+        play_audio(tts_data, trace=trace)
+    else:
+        play_pcm_stream(tts_data, sample_rate=sample_rate, trace=trace)
+
+
+async def aplay_tts(tts_data, sample_rate: int = 16000, trace=None, output: PcmOutput | None = None) -> None:
+    """
+    Async play_tts. MP3 bytes are decoded and played in a worker thread; an async
+    PCM iterator is written to `output` chunk by chunk as it downloads. Without
+    an output one is opened for this call; every PortAudio call runs in a
+    worker thread, never on the loop.
+    """
+    if isinstance(tts_data, (bytes, bytearray)):
+        await asyncio.to_thread(play_audio, tts_data, trace)
+        return
+
+    own = output is None
+    if own:
+        output = await asyncio.to_thread(PcmOutput(sample_rate).open)
+    started = False
+    try:
+        async for frames in aiter_pcm_frames(tts_data):
+            if not started and trace is not None:
+                trace.mark("playback_start")
+            started = True
+            await asyncio.to_thread(output.write, frames)
+    finally:
+        if own:
+            await asyncio.to_thread(output.close)
+        if trace is not None:
+            trace.mark("playback_end")
@@ -0,0 +1,173 @@
+# benchmarks/bench_adaptive_segments.py
+#
+# Fixed vs adaptive segment length (SegmentLengthController) while the backend's latency changes mid-lecture.
+# A lecturer who never pauses long enough to end a segment is replayed through the full pipeline, so every cut
+# is an urgent flush; the stand-in Whisper's per-request latency steps through --phases (one per equal slice of
+# the lecture). Reports lag per phase, merges (backlog) and the segment lengths the controller chose.
+# Run from the repo root:  python -m benchmarks.bench_adaptive_segments [--minutes 3] [--phases 300 6000 300]
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import numpy as np
+
+from benchmarks.bench_tts_streaming import start_server
+from benchmarks.bench_pipeline import WORDS_PER_SECOND, FaultyTTSHandler, _delay, make_player, replay_capture
+
+SAMPLE_RATE = 16000
+
+
+def continuous_lecture(seconds, seed=0):
+    """Speech bursts (~-20 dBFS) with only short breaths (0.25–0.5 s) between them: no segment-ending pauses."""
+    rng = np.random.default_rng(seed)
+    out = np.empty(int(seconds * SAMPLE_RATE), dtype=np.int16)
+    pos, speaking = 0, True
+    while pos < len(out):
+        length = int((rng.uniform(1.0, 3.0) if speaking else rng.uniform(0.25, 0.5)) * SAMPLE_RATE)
+        seg = rng.normal(0, 3000 if speaking else 30, size=min(length, len(out) - pos))
+        out[pos:pos + len(seg)] = np.clip(seg, -32768, 32767).astype(np.int16)
+        pos += len(seg)
+        speaking = not speaking
+    return out.tobytes()
+
+
+def make_phased_transcriber(phases_ms, phase_seconds, jitter_ms, ms_per_audio_second, words_per_second, seed):
+    from transcription import Transcriber
+
+    class PhasedTranscriber(Transcriber):
+        """Whisper stand-in whose per-request latency follows `phases_ms`, plus a per-audio-second cost."""
+
+        name = "stand-in"
+
+        def __init__(self):
+            self.rng = random.Random(seed)
+            self.started = None
+
+        def phase(self):
+            if self.started is None:
+                self.started = time.monotonic()
+            return min(int((time.monotonic() - self.started) / phase_seconds), len(phases_ms) - 1)
+
+        async def atranscribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+            audio_seconds = len(audio_chunk) / (sample_rate * 2)
+            ms = phases_ms[self.phase()] + audio_seconds * ms_per_audio_second
+            await asyncio.sleep(_delay(ms, jitter_ms, self.rng))
+            return " ".join(["word"] * max(1, round(audio_seconds * words_per_second)))
+
+        def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+            return asyncio.run(self.atranscribe(audio_chunk, sample_rate))
+
+        def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto",
+                                   translate=False):
+            return [(0.0, len(audio_chunk) / (sample_rate * 2), self.transcribe(audio_chunk, sample_rate), [])]
+
+    return PhasedTranscriber()
+
+
+def run(adaptive, pcm, args):
+    from runtime import AssistantRuntime
+    from tracing import Tracer, TraceSink
+
+    traces = []
+
+    class CollectingSink(TraceSink):
+        def record(self, pipeline, trace):
+            traces.append(trace)
+
+    wall_seconds = len(pcm) / (SAMPLE_RATE * 2) / args.speed
+    phase_seconds = wall_seconds / len(args.phases)
+    # The stand-in TTS speaks WORDS_PER_SECOND, so fewer words per captured second make playback `tts_pace`x faster
+    transcriber = make_phased_transcriber(args.phases, phase_seconds, args.stt_jitter_ms, args.stt_ms_per_audio_second,
+                                          WORDS_PER_SECOND / args.tts_pace, args.seed)
+    tracer = Tracer(pipeline="bench", sink=CollectingSink(), export_seconds=float("inf"))
+    runtime = AssistantRuntime(
+        audio_source=lambda: replay_capture([pcm], speed=args.speed),
+        player=make_player(args.speed),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        urgent_flush_seconds=args.urgent_flush_seconds,
+        adaptive_segments=adaptive,
+        transcriber=transcriber,
+        tracer=tracer,
+        name="adaptive" if adaptive else "fixed"
+    )
+    targets = []
+    if runtime.controller is not None:
+        observe = runtime.controller.observe
+
+        def recording_observe(*a, **kw):
+            result = observe(*a, **kw)
+            targets.append((time.monotonic(), runtime.controller.target_seconds))
+            return result
+
+        runtime.controller.observe = recording_observe
+
+    t0 = time.monotonic()
+    asyncio.run(runtime.run())
+
+    start = min((t.marks["capture_start"] for t in traces if "capture_start" in t.marks), default=0)
+    per_phase = []
+    for i in range(len(args.phases)):
+        # First word: waits for the whole segment to be captured and processed; last word: only for processing
+        lags = [(t.marks["playback_start"] - t.marks["capture_start"], t.spans()["end_to_end"]) for t in traces
+                if "end_to_end" in t.spans() and i == min(int((t.marks["capture_end"] - start) / phase_seconds),
+                                                          len(args.phases) - 1)]
+        chosen = [s for at, s in targets if i == min(int((at - t0) / phase_seconds), len(args.phases) - 1)]
+        per_phase.append((np.array(lags) if lags else np.zeros((1, 2)),
+                          np.mean(chosen) if chosen else args.urgent_flush_seconds))
+    return runtime.counts, per_phase
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=3, help="length of the continuous lecture")
+    parser.add_argument("--speed", type=float, default=1,
+                        help="capture and playback rate vs real time (segment lengths and lag are wall clock)")
+    parser.add_argument("--phases", type=float, nargs="+", default=[300, 6000, 300],
+                        help="Whisper per-request latency (ms) for each equal slice of the lecture")
+    parser.add_argument("--stt-jitter-ms", type=float, default=100)
+    parser.add_argument("--stt-ms-per-audio-second", type=float, default=30)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=300)
+    parser.add_argument("--tts-speed", type=float, default=8.0, help="TTS generation speed vs real time")
+    parser.add_argument("--tts-pace", type=float, default=1.25,
+                        help="speech rate of the TTS voice vs the lecturer (at 1 or less, playback never catches up)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=4)
+    parser.add_argument("--urgent-flush-seconds", type=float, default=10, help="the fixed length, and adaptive's start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    FaultyTTSHandler.first_byte_ms = args.tts_first_byte_ms
+    FaultyTTSHandler.speed = args.tts_speed
+    FaultyTTSHandler.rng = random.Random(args.seed + 2)
+    server = start_server(FaultyTTSHandler)
+
+    os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+    os.environ.setdefault("TTS_VOICE_ID", "bench-voice")
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ["TTS_CACHE_ENABLED"] = "0"
+    os.environ["TTS_STREAMING"] = "1"
+
+    pcm = continuous_lecture(args.minutes * 60, seed=args.seed)
+    results = {mode: run(mode == "adaptive", pcm, args) for mode in ("fixed", "adaptive")}
+    server.shutdown()
+
+    print(f"\n{args.minutes:g} min continuous lecture at {args.speed:g}x, {args.workers} workers, "
+          f"Whisper latency by phase: {' → '.join(f'{ms:g} ms' for ms in args.phases)}\n")
+    print(f"{'mode':<9} {'phase':>5} {'stt ms':>7} {'seg s':>6} {'first word p50':>15} {'p95':>6} "
+          f"{'last word p50':>14} {'p95':>6}")
+    for mode, (counts, per_phase) in results.items():
+        for i, (lag, seconds) in enumerate(per_phase):
+            first, last = lag[:, 0], lag[:, 1]
+            print(f"{mode:<9} {i + 1:>5} {args.phases[i]:>7g} {seconds:>6.1f} {np.percentile(first, 50):>15.1f} "
+                  f"{np.percentile(first, 95):>6.1f} {np.percentile(last, 50):>14.1f} {np.percentile(last, 95):>6.1f}")
+        print(f"{'':<9} segments {counts['segments']}, played {counts['played']}, merged {counts['segments_merged']}\n")
+    print("lag (s) runs from a word's capture to the start of its segment's playback; "
+          "seg s is the mean urgent-flush length in use")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_batching.py
+#
+# Short-segment throughput against a rate-limited Whisper stand-in: one request per segment vs
+# BatchingTranscriber coalescing segments across sessions. The stand-in charges a fixed per-request overhead
+# plus per-audio-second time and admits at most --rpm requests per minute, like a Groq API key.
+# Each segment is a constant tone whose level encodes its id, so the split-back transcript is checked exactly.
+# Every session sends its own rolling prompt (a PromptContext with a per-session glossary), as the runtime does.
+# Run from the repo root:  python -m benchmarks.bench_batching [--sessions 8] [--seconds 30] [--rpm 120]
+
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+
+from prompt_context import PromptContext
+from transcription import Transcriber
+from transcription_batching import BatchingTranscriber
+
+SAMPLE_RATE = 16000
+
+
+class RateLimitedWhisper(Transcriber):
+    """Transcribes each non-silent run to 'seg<level>'; optionally merges runs across a gap, like Whisper sometimes does."""
+
+    name = "stand-in"
+
+    def __init__(self, rpm, overhead_ms, ms_per_audio_second, merge_rate, seed=0):
+        self.interval = 60 / rpm
+        self.next_slot = 0.0
+        self.overhead = overhead_ms / 1000
+        self.per_second = ms_per_audio_second / 1000
+        self.merge_rate = merge_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.prompts = set()
+
+    async def _admit(self, audio_chunk):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        self.requests += 1
+        await asyncio.sleep(slot - now + self.overhead + len(audio_chunk) / (SAMPLE_RATE * 2) * self.per_second)
+
+    def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        return asyncio.run(self.atranscribe(audio_chunk, sample_rate, prompt))
+
+    def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        return asyncio.run(self.atranscribe_timestamped(audio_chunk, sample_rate, prompt))
+
+    async def atranscribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        self.prompts.add(prompt)
+        await self._admit(audio_chunk)
+        return " ".join(text for _, _, text, _ in self._runs(audio_chunk, sample_rate))
+
+    async def atranscribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto",
+                                      translate=False):
+        self.prompts.add(prompt)
+        await self._admit(audio_chunk)
+        segments = self._runs(audio_chunk, sample_rate)
+        merged = []
+        for seg in segments:
+            if merged and self.rng.random() < self.merge_rate:
+                start, _, text, words = merged[-1]
+                merged[-1] = (start, seg[1], f"{text} {seg[2]}", words + seg[3])
+            else:
+                merged.append(seg)
+        return merged
+
+    @staticmethod
+    def _runs(audio_chunk, sample_rate):
+        samples = np.frombuffer(audio_chunk, dtype=np.int16)
+        loud = np.concatenate(([0], (samples != 0).astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(loud))
+        out = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            text = f"seg{int(samples[start])}"
+            t0, t1 = start / sample_rate, end / sample_rate
+            out.append((t0, t1, text, [(t0, t1, text)]))
+        return out
+
+
+async def drive(transcriber, sessions, seconds, rng):
+    """Each session emits a 1–2 s segment every 1–3 s; returns (latencies, correct, total)."""
+    latencies, results = [], []
+    next_id = [1]
+
+    async def one(seg_id, pcm, context):
+        t0 = time.perf_counter()
+        text = await transcriber.atranscribe(pcm, SAMPLE_RATE, prompt=context.prompt())
+        latencies.append(time.perf_counter() - t0)
+        results.append(text == f"seg{seg_id}")
+        context.commit(text)
+
+    async def session(n):
+        context = PromptContext([f"course{n} term{i}" for i in range(5)])
+        tasks = []
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            seg_id = next_id[0]
+            next_id[0] += 1
+            pcm = np.full(int(rng.uniform(1.0, 2.0) * SAMPLE_RATE), seg_id, dtype=np.int16).tobytes()
+            tasks.append(asyncio.create_task(one(seg_id, pcm, context)))
+            await asyncio.sleep(rng.uniform(1.0, 3.0))
+        await asyncio.gather(*tasks)
+
+    await asyncio.gather(*(session(n) for n in range(sessions)))
+    return np.array(latencies) * 1e3, sum(results), len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=30, help="how long each session keeps producing segments")
+    parser.add_argument("--rpm", type=float, default=120, help="requests per minute the API key allows")
+    parser.add_argument("--overhead-ms", type=float, default=250, help="fixed cost per request")
+    parser.add_argument("--ms-per-audio-second", type=float, default=30)
+    parser.add_argument("--window-ms", type=float, default=150)
+    parser.add_argument("--merge-rate", type=float, default=0.2, help="chance the stand-in merges across a marker")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.seconds:g}s of 1-2 s segments, {args.rpm:g} requests/min, "
+          f"{args.overhead_ms:g} ms per request\n")
+    print(f"{'mode':<16} {'segments':>9} {'requests':>9} {'seg/req':>8} {'seg/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'correct':>8} {'prompts':>8}")
+    for mode in ("per segment", "batched"):
+        whisper = RateLimitedWhisper(args.rpm, args.overhead_ms, args.ms_per_audio_second, args.merge_rate, args.seed)
+        transcriber = whisper if mode == "per segment" else BatchingTranscriber(whisper, window_ms=args.window_ms)
+        t0 = time.perf_counter()
+        lat, correct, total = asyncio.run(drive(transcriber, args.sessions, args.seconds, random.Random(args.seed)))
+        wall = time.perf_counter() - t0
+        print(f"{mode:<16} {total:>9} {whisper.requests:>9} {total / whisper.requests:>8.2f} {total / wall:>7.2f} "
+              f"{np.percentile(lat, 50):>8.0f} {np.percentile(lat, 95):>8.0f} {correct / total:>8.0%} "
+              f"{len(whisper.prompts):>8}")
+
+
+if __name__ == "__main__":
+    main()
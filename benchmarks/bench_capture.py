@@ -0,0 +1,82 @@
+# benchmarks/bench_capture.py
+#
+# Allocations and CPU per minute of audio for the capture path: the old blocking read (the bytes object PyAudio
+# returns is what flows downstream) vs the callback ring buffer (PyAudio's block is copied into a preallocated
+# ring and freed at once; downstream gets views).
+# PortAudio is simulated: the producer hands over the same blocks the driver would, so no audio device is needed.
+# Run from the repo root:  python -m benchmarks.bench_capture [--minutes 10]
+
+import argparse
+import time
+import tracemalloc
+
+from audio_capture import AudioRingBuffer
+from segmentation import Segmenter
+from benchmarks.bench_vad import synthetic_lecture, SAMPLE_RATE, CHUNK_SIZE
+
+
+def blocking_source(pcm):
+    """stream.read(): PyAudio returns a freshly allocated bytes object for every chunk."""
+    view = memoryview(pcm)
+    step = CHUNK_SIZE * 2
+    for i in range(0, len(pcm) - step + 1, step):
+        yield bytes(view[i:i + step])
+
+
+def ring_source(pcm):
+    """Callback mode: the driver's block is copied into the ring, the consumer gets a view."""
+    view = memoryview(pcm)
+    step = CHUNK_SIZE * 2
+    ring = AudioRingBuffer(int(30 * SAMPLE_RATE / CHUNK_SIZE) * CHUNK_SIZE)
+    reader = ring.reader()
+    for i in range(0, len(pcm) - step + 1, step):
+        in_data = bytes(view[i:i + step])  # PyAudio allocates this for every callback too
+        ring.write(in_data)
+        yield reader.read(CHUNK_SIZE, timeout=0)
+
+
+def run(source, pcm, consume):
+    segmenter = Segmenter(sample_rate=SAMPLE_RATE, silence_thresh=-40, min_silence_ms=700) if consume else None
+    t0 = time.process_time()
+    for i, chunk in enumerate(source(pcm)):
+        if segmenter is not None:
+            segmenter.feed(chunk, i * CHUNK_SIZE / SAMPLE_RATE)
+    return time.process_time() - t0
+
+
+def allocations(source, pcm):
+    """Peak transient bytes allocated while producing each chunk, summed over the recording."""
+    tracemalloc.start()
+    total = 0
+    gen = source(pcm)
+    while True:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            chunk = next(gen)
+        except StopIteration:
+            break
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - before
+        del chunk
+    tracemalloc.stop()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    args = parser.parse_args()
+
+    pcm = synthetic_lecture(args.minutes * 60)
+    print(f"{args.minutes:g} min of audio, {CHUNK_SIZE}-sample chunks\n")
+    print(f"{'capture path':<26} {'alloc KB/min':>13} {'capture CPU ms/min':>19} {'+ segmenter ms/min':>19}")
+    for name, source in (("blocking read (old)", blocking_source), ("callback ring (new)", ring_source)):
+        alloc = allocations(source, pcm) / 1024 / args.minutes
+        capture_ms = run(source, pcm, consume=False) * 1e3 / args.minutes
+        total_ms = run(source, pcm, consume=True) * 1e3 / args.minutes
+        print(f"{name:<26} {alloc:>13.0f} {capture_ms:>19.1f} {total_ms:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
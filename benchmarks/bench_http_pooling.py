@@ -0,0 +1,96 @@
+# benchmarks/bench_http_pooling.py
+#
+# Per-request latency against a local mock API: a fresh connection per call (old requests.post)
+# vs the pooled keep-alive clients in http_client.py.
+# The mock adds --handshake-ms to every *new* connection to stand in for TCP + TLS setup to a remote API.
+# Run from the repo root:  python -m benchmarks.bench_http_pooling [--requests 50] [--handshake-ms 60]
+
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import requests
+
+import http_client
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # otherwise headers + body writes hit the 40 ms delayed-ACK stall
+    handshake_ms = 60
+    payload = b"x" * 2048
+
+    def setup(self):
+        time.sleep(self.handshake_ms / 1000)  # once per connection
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn, n):
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return np.array(times) * 1e3
+
+
+async def timed_async(url, n, concurrency):
+    times = []
+
+    async def one():
+        t0 = time.perf_counter()
+        await http_client.async_request("POST", url, json={"text": "hello"})
+        times.append(time.perf_counter() - t0)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with sem:
+            await one()
+
+    await asyncio.gather(*(bounded() for _ in range(n)))
+    await http_client.close_async_client()
+    return np.array(times) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=60)
+    args = parser.parse_args()
+
+    MockAPIHandler.handshake_ms = args.handshake_ms
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/text-to-speech/voice/stream"
+
+    results = {
+        "requests.post (no pool)": timed(lambda: requests.post(url, json={"text": "hello"}, timeout=10),
+                                         args.requests),
+        "http_client.session()": timed(lambda: http_client.session().post(url, json={"text": "hello"}, timeout=10),
+                                       args.requests),
+        "async, 1 in flight": asyncio.run(timed_async(url, args.requests, 1)),
+        "async, 4 in flight": asyncio.run(timed_async(url, args.requests, 4)),
+    }
+    server.shutdown()
+
+    print(f"{args.requests} requests per client, {args.handshake_ms:g} ms per new connection\n")
+    print(f"{'client':<26} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for name, t in results.items():
+        print(f"{name:<26} {np.percentile(t, 50):>8.1f} {np.percentile(t, 95):>8.1f} {t.mean():>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
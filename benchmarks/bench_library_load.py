@@ -0,0 +1,137 @@
+# benchmarks/bench_library_load.py
+#
+# Library page cost before and after moving slides out of lecture documents: inline base64 images and transcript
+# (old save_transcript_to_mongo) vs image references into a GridFS bucket with thumbnails (blob_store) and
+# transcript segments in their own collection (transcript_store).
+# Fills a throwaway database on MONGO_CONNECTION (dropped afterwards) and replays the page's queries:
+#   list   — show_all_lectures: every lecture card with a 150-char preview
+#   detail — show_lecture_detail's image section: all images (before) vs thumbnails (after)
+# Bytes are what the server sent back, counted with a pymongo command listener.
+# Run from the repo root:  python -m benchmarks.bench_library_load [--lectures 50] [--images 5] [--repeat 5]
+
+import argparse
+import base64
+import io
+import os
+import time
+
+import bson
+import pymongo
+from dotenv import load_dotenv
+from pymongo import monitoring
+
+from blob_store import GridFSBlobStore, make_thumbnail
+from transcript_store import TranscriptStore
+
+
+class ReplyBytes(monitoring.CommandListener):
+    def __init__(self):
+        self.bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def slide_png(seed):
+    """A 1280x720 noisy PNG, about the weight of a photographed slide."""
+    from PIL import Image
+
+    image = Image.effect_noise((1280, 720), 40 + seed % 20).convert("RGB")
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def populate(db, lectures, images, lines):
+    slides = [slide_png(i) for i in range(images)]
+    store = TranscriptStore(db, flush_seconds=3600, flush_segments=10**9)
+    blobs = GridFSBlobStore(db, bucket="bench_images")
+    for n in range(lectures):
+        # Content addressing would store identical slides once; vary one byte so each lecture has its own
+        own = [s[:-1] + bytes([n % 256]) for s in slides]
+        db["legacy"].insert_one({
+            "name": f"Lecture {n}",
+            "transcript": "\n".join(lines),
+            "timestamp": f"2025-01-01 00:{n // 60:02d}:{n % 60:02d}",
+            "voice": "bench",
+            "image_summaries": ["summary"] * images,
+            "uploaded_images_base64": [base64.b64encode(s).decode("utf-8") for s in own],
+        })
+        lecture_id = store.open_lecture(name=f"Lecture {n}")
+        for index, line in enumerate(lines):
+            store.append(lecture_id, index, line)
+        refs = []
+        for s in own:
+            thumbnail, width, height = make_thumbnail(s)
+            refs.append({"image": blobs.put(s, "image/png"), "thumbnail": blobs.put(thumbnail, "image/jpeg"),
+                         "content_type": "image/png", "bytes": len(s), "width": width, "height": height})
+        store.save_lecture(lecture_id, len(lines), image_summaries=["summary"] * images, images=refs)
+    store.close()
+    return store, blobs
+
+
+def timed(listener, fn, repeat):
+    listener.bytes = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e3, listener.bytes / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lectures", type=int, default=50)
+    parser.add_argument("--images", type=int, default=5, help="slides per lecture")
+    parser.add_argument("--lines", type=int, default=600, help="transcript lines per lecture")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    load_dotenv()
+    listener = ReplyBytes()
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"), event_listeners=[listener])
+    db = client["hearsay_bench"]
+    try:
+        lines = [f"line {i} of a lecture transcript, about twenty five words long " * 2 for i in range(args.lines)]
+        store, blobs = populate(db, args.lectures, args.images, lines)
+        db["transcripts"].create_index("timestamp")
+        db["legacy"].create_index("timestamp")
+
+        def list_before():
+            for item in db["legacy"].find().sort("timestamp", -1):
+                item["transcript"][:150]
+
+        def list_after():
+            for item in store.lectures.find().sort("timestamp", -1):
+                store.preview(item)
+
+        one_legacy = db["legacy"].find_one()["_id"]
+        one_lecture = store.lectures.find_one()["_id"]
+
+        def detail_before():
+            item = db["legacy"].find_one({"_id": one_legacy})
+            for b64 in item["uploaded_images_base64"]:
+                base64.b64decode(b64)
+
+        def detail_after():
+            item = store.lectures.find_one({"_id": one_lecture})
+            for ref in item["images"]:
+                blobs.get(ref["thumbnail"])
+
+        print(f"{args.lectures} lectures x {args.images} slides, {args.lines} transcript lines each\n")
+        print(f"{'page':<8} {'before ms':>10} {'before KB':>10} {'after ms':>9} {'after KB':>9}")
+        for page, before, after in (("list", list_before, list_after), ("detail", detail_before, detail_after)):
+            b_ms, b_bytes = timed(listener, before, args.repeat)
+            a_ms, a_bytes = timed(listener, after, args.repeat)
+            print(f"{page:<8} {b_ms:>10.1f} {b_bytes / 1024:>10.0f} {a_ms:>9.1f} {a_bytes / 1024:>9.0f}")
+    finally:
+        client.drop_database("hearsay_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_library_page.py
+#
+# Library page render with many lectures: the old show_all_lectures query (every full document, no index) vs
+# TranscriptStore.list_lectures (timestamp index, projected to name/timestamp/status/preview, one page at a time).
+# Seeds a throwaway database on MONGO_CONNECTION (dropped afterwards) with --lectures documents in the pre-segment
+# format, inline transcript and optional base64 image, and the same lectures as metadata + preview.
+# Render = query plus building every card's HTML, as the page does. Bytes are counted with a pymongo listener.
+# Run from the repo root:  python -m benchmarks.bench_library_page [--lectures 10000] [--image-kb 0] [--pages 3]
+
+import argparse
+import base64
+import os
+import random
+import time
+
+import pymongo
+from dotenv import load_dotenv
+
+from benchmarks.bench_library_load import ReplyBytes
+from transcript_store import PREVIEW_CHARS, TranscriptStore
+
+
+def seed(db, n, transcript_kb, image_kb):
+    rng = random.Random(0)
+    words = [f"term{i}" for i in range(3000)]
+    image = base64.b64encode(os.urandom(image_kb * 1024)).decode("utf-8") if image_kb else None
+    legacy, lectures = [], []
+    for i in range(n):
+        text = " ".join(rng.choice(words) for _ in range(transcript_kb * 1024 // 9))
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1.7e9 + i * 3600))
+        doc = {"name": f"Lecture {i}", "transcript": text, "timestamp": timestamp, "voice": "bench",
+               "image_summaries": ["summary"] if image else [],
+               "uploaded_images_base64": [image] if image else []}
+        legacy.append(doc)
+        lectures.append({"name": doc["name"], "timestamp": timestamp, "voice": "bench", "status": "saved",
+                         "segment_count": 1, "preview": text[:PREVIEW_CHARS], "image_summaries": doc["image_summaries"]})
+        if len(legacy) == 1000:
+            db["legacy"].insert_many(legacy)
+            db["transcripts"].insert_many(lectures)
+            legacy, lectures = [], []
+    if legacy:
+        db["legacy"].insert_many(legacy)
+        db["transcripts"].insert_many(lectures)
+
+
+def card(item, preview):
+    return (f'<div><h3>📖 {item["name"]}</h3><p><strong>🕒 {item["timestamp"]}</strong></p>'
+            f'<p>{preview}...</p><a href="?page=lecture&id={item["_id"]}">🔗 View Details</a></div>')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lectures", type=int, default=10000)
+    parser.add_argument("--transcript-kb", type=int, default=8, help="inline transcript size of the old documents")
+    parser.add_argument("--image-kb", type=int, default=0, help="one inline image of this size per old document")
+    parser.add_argument("--pages", type=int, default=3, help="'load more' pages to time after the first")
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    load_dotenv()
+    listener = ReplyBytes()
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"), event_listeners=[listener])
+    db = client["hearsay_bench"]
+    try:
+        t0 = time.perf_counter()
+        seed(db, args.lectures, args.transcript_kb, args.image_kb)
+        store = TranscriptStore(db)
+        store.close()
+        print(f"seeded {args.lectures} lectures in {time.perf_counter() - t0:.0f}s\n")
+
+        def measure(fn):
+            listener.bytes = 0
+            t0 = time.perf_counter()
+            n = fn()
+            return (time.perf_counter() - t0) * 1e3, listener.bytes, n
+
+        def old_page():
+            html = [card(item, item["transcript"][:PREVIEW_CHARS]) for item in db["legacy"].find().sort("timestamp", -1)]
+            return len(html)
+
+        cursor = [None]
+
+        def new_page():
+            items, cursor[0] = store.list_lectures(after=cursor[0], limit=args.page_size)
+            return len([card(item, item["preview"]) for item in items])
+
+        print(f"{'view':<22} {'cards':>7} {'ms':>9} {'KB':>10}")
+        ms, n_bytes, n = measure(old_page)
+        print(f"{'old: all lectures':<22} {n:>7} {ms:>9.1f} {n_bytes / 1024:>10.0f}")
+        ms, n_bytes, n = measure(new_page)
+        print(f"{'new: first page':<22} {n:>7} {ms:>9.1f} {n_bytes / 1024:>10.0f}")
+        for page in range(args.pages):
+            ms, n_bytes, n = measure(new_page)
+            print(f"{f'new: load more #{page + 1}':<22} {n:>7} {ms:>9.1f} {n_bytes / 1024:>10.0f}")
+
+        plan = db["transcripts"].find().sort([("timestamp", -1), ("_id", -1)]).limit(args.page_size).explain()
+        winning = str(plan.get("queryPlanner", {}).get("winningPlan", {}))
+        print(f"\nnew query uses the timestamp index: {'IXSCAN' in winning}")
+    finally:
+        client.drop_database("hearsay_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_live_summary.py
+#
+# How long after a lecture ends its summary and flashcards are ready: generated from the saved transcript
+# (StudyArtifacts, map-reduce for long lectures) vs finished from the state LiveSummarizer folded during the lecture,
+# where only the lines after its last fold go to the LLM. Also reports the tokens each way spends in total.
+# Uses the mock LLM server of bench_map_reduce (runs offline); the live folds are replayed back to back rather
+# than a minute apart, since only their results and token counts matter here.
+# Run from the repo root:  python -m benchmarks.bench_live_summary [--minutes 30 90] [--tail-lines 6]
+
+import argparse
+import asyncio
+import time
+
+from groq import AsyncGroq, Groq
+
+from benchmarks.bench_map_reduce import MemoryChunks, lecture_lines, start_mock_llm
+from live_summary import LiveSummarizer
+from study_artifacts import StudyArtifacts
+
+
+class MemoryLectures:
+    """find_one / update_one with dotted $set paths, on a dict of lecture documents."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        for path, value in update["$set"].items():
+            doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+            *parents, leaf = path.split(".")
+            for key in parents:
+                doc = doc.setdefault(key, {})
+            doc[leaf] = value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90])
+    parser.add_argument("--tail-lines", type=int, default=6, help="lines committed after the last live fold")
+    parser.add_argument("--fold-lines", type=int, default=36, help="lines per live fold (~a minute of speech)")
+    args = parser.parse_args()
+
+    calls = []
+    server = start_mock_llm(0.3, 5000, 250, 32768, calls)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = Groq(api_key="mock", base_url=base_url, max_retries=0)
+
+    print(f"{'minutes':>7} {'strategy':<22} {'ready after end s':>18} {'calls at end':>13} {'total prompt tok':>17}")
+    try:
+        for minutes in args.minutes:
+            lines = lecture_lines(minutes)
+            transcript = "\n".join(lines)
+
+            calls.clear()
+            cold = StudyArtifacts(MemoryLectures(), client, chunks=MemoryChunks())
+            t0 = time.perf_counter()
+            cold.summary("cold", transcript)
+            cold.flashcards("cold", transcript)
+            print(f"{minutes:>7} {'from saved transcript':<22} {time.perf_counter() - t0:>18.1f} "
+                  f"{len(calls):>13} {sum(calls):>17}")
+
+            calls.clear()
+            lectures = MemoryLectures()
+            summarizer = LiveSummarizer(min_lines=1, tokens_per_minute=10**9,
+                                        on_update=lambda state: lectures.update_one(
+                                            {"_id": "live"}, {"$set": {"artifacts.live": state}}))
+
+            async def replay():
+                live_client = AsyncGroq(api_key="mock", base_url=base_url, max_retries=0)
+                committed = []
+                for line in lines[:len(lines) - args.tail_lines]:
+                    committed.append(line)
+                    if len(committed) - summarizer.lines_done >= args.fold_lines:
+                        await summarizer.fold(live_client, committed)
+                await live_client.close()
+
+            asyncio.run(replay())
+            during = sum(calls)
+            calls.clear()
+            live = StudyArtifacts(lectures, client, chunks=MemoryChunks())
+            t0 = time.perf_counter()
+            live.summary("live", transcript)
+            live.flashcards("live", transcript)
+            print(f"{minutes:>7} {'finished from live':<22} {time.perf_counter() - t0:>18.1f} "
+                  f"{len(calls):>13} {during + sum(calls):>17}")
+            print(f"{'':>7} {'':<22} live folds: {summarizer.usage['folds']}, "
+                  f"{summarizer.usage['prompt_tokens']} prompt tokens during the lecture")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/bench_map_reduce.py
+#
+# Summarizing long lectures: one prompt with the whole transcript (old summarize_lecture) vs StudyArtifacts'
+# map-reduce over token-bounded chunks, cold and after the lecture grew by --append-minutes.
+# The LLM is a local mock of the chat completions endpoint, so this runs offline: a reply takes
+# --ttft plus prompt tokens at --prefill tokens/s plus reply tokens at --decode tokens/s, and prompts over
+# --context tokens are rejected like an over-long request. Chunk replies are cached in memory here
+# (MongoDB's `study_chunks` collection in the app).
+# Run from the repo root:  python -m benchmarks.bench_map_reduce [--minutes 30 90 120] [--workers 1 4 8]
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from groq import Groq
+
+from study_artifacts import CHARS_PER_TOKEN, StudyArtifacts
+
+WORDS_PER_MINUTE = 150
+WORDS_PER_LINE = 25
+
+
+def lecture_lines(minutes, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)] + ["the", "a", "of", "and", "is", "we", "gradient", "loss"]
+    return [" ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_LINE))
+            for _ in range(minutes * WORDS_PER_MINUTE // WORDS_PER_LINE)]
+
+
+def mock_reply(prompt):
+    """Reply shaped like what the prompt asks for, with a realistic token count; different prompts, different replies."""
+    tag = zlib.crc32(prompt.encode("utf-8"))
+    if "flashcards" in prompt:
+        return json.dumps([{"Q": f"Question {tag}-{i} about the lecture?", "A": f"Answer {i}, a sentence or so long."}
+                           for i in range(5)])
+    words = 350 if "500 words" in prompt else 110
+    return "\n".join(f"- point {tag}-{i}: " + " ".join(["detail"] * 10) for i in range(words // 12))
+
+
+def start_mock_llm(ttft, prefill, decode, context, calls):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+            calls.append(prompt_tokens)
+            if prompt_tokens > context:
+                payload = {"error": {"message": f"{prompt_tokens} tokens exceeds the context of {context}",
+                                     "type": "invalid_request_error", "code": "context_length_exceeded"}}
+                status = 400
+            else:
+                content = mock_reply(prompt)
+                completion_tokens = len(content) // CHARS_PER_TOKEN
+                time.sleep(ttft + prompt_tokens / prefill + completion_tokens / decode)
+                payload = {
+                    "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }
+                status = 200
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class MemoryChunks:
+    """The two collection methods StudyArtifacts uses for its chunk cache, on a dict."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {}).update(update["$set"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90, 120], help="lecture lengths")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="map pool sizes")
+    parser.add_argument("--append-minutes", type=int, default=5)
+    parser.add_argument("--chunk-tokens", type=int, default=3000)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds before the first reply token")
+    parser.add_argument("--prefill", type=float, default=5000, help="prompt tokens per second")
+    parser.add_argument("--decode", type=float, default=250, help="reply tokens per second")
+    parser.add_argument("--context", type=int, default=32768, help="largest prompt the mock accepts, in tokens")
+    args = parser.parse_args()
+
+    calls = []
+    server = start_mock_llm(args.ttft, args.prefill, args.decode, args.context, calls)
+    client = Groq(api_key="mock", base_url=f"http://127.0.0.1:{server.server_address[1]}", max_retries=0)
+
+    def timed(fn):
+        calls.clear()
+        t0 = time.perf_counter()
+        try:
+            fn()
+            seconds = f"{time.perf_counter() - t0:.1f}"
+        except Exception:
+            seconds = "over ctx"
+        return seconds, len(calls), sum(calls)
+
+    print(f"mock LLM: {args.ttft}s first token, {args.prefill:.0f} tok/s prefill, {args.decode:.0f} tok/s decode, "
+          f"{args.context} token context; chunks of {args.chunk_tokens} tokens\n")
+    print(f"{'minutes':>7} {'tokens':>7} {'strategy':<28} {'seconds':>9} {'calls':>6} {'prompt tok':>11}")
+    try:
+        for minutes in args.minutes:
+            lines = lecture_lines(minutes)
+            transcript = "\n".join(lines)
+            grown = "\n".join(lines + lecture_lines(args.append_minutes, seed=minutes))
+            tokens = len(transcript) // CHARS_PER_TOKEN
+
+            def row(strategy, result):
+                seconds, n_calls, prompt_tokens = result
+                print(f"{minutes:>7} {tokens:>7} {strategy:<28} {seconds:>9} {n_calls:>6} {prompt_tokens:>11}")
+
+            one = StudyArtifacts(None, client, chunk_tokens=10**9)
+            row("single prompt", timed(lambda: one.summary(None, transcript)))
+            for workers in args.workers:
+                artifacts = StudyArtifacts(None, client, chunks=MemoryChunks(),
+                                           chunk_tokens=args.chunk_tokens, workers=workers)
+                row(f"map-reduce, {workers} workers", timed(lambda: artifacts.summary(None, transcript)))
+                row(f"  +{args.append_minutes} min, cached chunks", timed(lambda: artifacts.summary(None, grown)))
+            print()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_noise_tracking.py
+#
+# Segmentation under changing room noise: a silence threshold fixed at startup vs NoiseFloorTracker.
+# The synthetic lecture's background steps through --noise-dbfs (quiet room → HVAC → full room), one step per
+# equal slice; WAVs can be passed instead (reported as one phase). Chunks are fed to the Segmenter with a
+# simulated clock, so this runs much faster than real time.
+# Reports per phase: segments, mean segment length, share of urgent (no-pause) cuts and mean word wait
+# (how long a word sits in the buffer before its segment is cut, i.e. the lag segmentation adds).
+# Run from the repo root:  python -m benchmarks.bench_noise_tracking [--minutes 6] [--noise-dbfs -60 -38 -32]
+
+import argparse
+import numpy as np
+
+from benchmarks.bench_pipeline import load_wav
+from segmentation import Segmenter
+from vad import FULL_SCALE, NoiseFloorTracker
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4096
+
+
+def noisy_lecture(seconds, noise_dbfs, seed=0):
+    """Speech-level bursts (~-20 dBFS) and 0.3–1.5 s pauses over background noise stepping through `noise_dbfs`."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    levels = np.repeat([FULL_SCALE * 10 ** (db / 20) for db in noise_dbfs], -(-n // len(noise_dbfs)))[:n]
+    out = rng.normal(0, 1, size=n) * levels
+    pos, speaking = 0, True
+    while pos < n:
+        length = int((rng.uniform(1.5, 4.0) if speaking else rng.uniform(0.3, 1.5)) * SAMPLE_RATE)
+        if speaking:
+            out[pos:pos + length] += rng.normal(0, 3000, size=len(out[pos:pos + length]))
+        pos += length
+        speaking = not speaking
+    return np.clip(out, -32768, 32767).astype(np.int16).tobytes()
+
+
+def segment(pcm, adaptive, thresh, phases):
+    """Returns per phase: [segments, seconds cut, urgent cuts, word-wait seconds × audio seconds]."""
+    tracker = NoiseFloorTracker(initial_thresh=thresh) if adaptive else None
+    segmenter = Segmenter(sample_rate=SAMPLE_RATE, silence_thresh=thresh, noise_floor=tracker)
+    total = len(pcm) / (SAMPLE_RATE * 2)
+    stats = [[0, 0.0, 0, 0.0] for _ in range(phases)]
+    step = CHUNK_SIZE * 2
+    for i in range(0, len(pcm) - step + 1, step):
+        now = (i + step) / (SAMPLE_RATE * 2)
+        out = segmenter.feed(pcm[i:i + step], timestamp=i / (SAMPLE_RATE * 2), now=now)
+        if out is None:
+            continue
+        _, seg, timestamps = out
+        seconds = len(seg) / (SAMPLE_RATE * 2)
+        s = stats[min(int(timestamps[0] / total * phases), phases - 1)]
+        s[0] += 1
+        s[1] += seconds
+        s[2] += not segmenter.vad.has_trailing_silence()
+        # Audio in a segment spans [first chunk, first chunk + seconds]; each instant waits until `now`
+        s[3] += (now - timestamps[0] - seconds / 2) * seconds
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="*", help="16-bit recordings (default: a synthetic lecture)")
+    parser.add_argument("--minutes", type=float, default=6, help="length of the synthetic lecture")
+    parser.add_argument("--noise-dbfs", type=float, nargs="+", default=[-60, -38, -32],
+                        help="background noise level of each equal slice of the synthetic lecture")
+    parser.add_argument("--thresh", type=float, default=-40, help="fixed threshold, and the tracker's start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.wavs:
+        pcm, labels = b"".join(load_wav(p) for p in args.wavs), ["recording"]
+    else:
+        pcm, labels = noisy_lecture(args.minutes * 60, args.noise_dbfs, args.seed), \
+            [f"{db:g} dBFS" for db in args.noise_dbfs]
+
+    print(f"{len(pcm) / (SAMPLE_RATE * 2):.0f}s of audio, fixed threshold {args.thresh:g} dBFS\n")
+    print(f"{'mode':<9} {'noise':>10} {'segments':>9} {'mean s':>7} {'urgent':>7} {'word wait s':>12}")
+    for mode in ("fixed", "tracking"):
+        for label, (n, seconds, urgent, wait) in zip(labels, segment(pcm, mode == "tracking", args.thresh, len(labels))):
+            print(f"{mode:<9} {label:>10} {n:>9} {seconds / n if n else 0:>7.1f} {urgent / n if n else 0:>7.0%} "
+                  f"{wait / seconds if seconds else 0:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
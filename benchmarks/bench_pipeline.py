@@ -0,0 +1,242 @@
+# benchmarks/bench_pipeline.py
+#
+# End-to-end replay of the live pipeline (AssistantRuntime) with no mic, speakers or API keys.
+# Lecture WAVs (or a synthetic lecture) are fed through capture_audio's chunk interface at real time or faster;
+# Whisper, the translator and ElevenLabs are local stand-ins with configurable latency, jitter and error rate.
+# Reports segments/sec, end-to-end lag percentiles, per-stage latency, CPU and peak memory.
+# Run from the repo root:
+#   python -m benchmarks.bench_pipeline [lecture.wav ...] [--speed 4] [--stt-ms 400 --stt-error-rate 0.05]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import time
+import wave
+import numpy as np
+
+from benchmarks.bench_vad import synthetic_lecture
+from benchmarks.bench_tts_streaming import StandInTTSHandler, start_server
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4096
+WORDS_PER_SECOND = 2.5  # stand-in transcripts, and the stand-in TTS speaks them back at the same rate
+
+
+def load_wav(path):
+    """Read a WAV as 16 kHz mono int16 PCM (downmixed and linearly resampled if needed)."""
+    with wave.open(path, "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit WAVs are supported")
+    samples = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(len(samples) * SAMPLE_RATE / rate)
+        samples = np.interp(np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples)
+    return samples.astype(np.int16).tobytes()
+
+
+def replay_capture(recordings, chunk=CHUNK_SIZE, rate=SAMPLE_RATE, speed=1.0):
+    """Drop-in for capture_audio(): yields `chunk`-frame PCM blocks, paced at `speed`x real time (0 = unpaced)."""
+    step = chunk * 2
+    interval = chunk / rate / speed if speed > 0 else 0
+    next_at = time.monotonic()
+    for pcm in recordings:
+        for i in range(0, len(pcm) - step + 1, step):
+            if interval:
+                next_at += interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            yield pcm[i:i + step]
+
+
+def _delay(ms, jitter_ms, rng):
+    return max(0.0, ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+
+
+def make_standin_transcriber(ms, jitter_ms, error_rate, seed):
+    from transcription import Transcriber
+
+    class StandInTranscriber(Transcriber):
+        """Sleeps like a Whisper round trip, then 'transcribes' to one word per 0.4 s of audio."""
+
+        name = "stand-in"
+
+        def __init__(self):
+            self.rng = random.Random(seed)
+            self.errors = 0
+
+        def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+            time.sleep(_delay(ms, jitter_ms, self.rng))
+            return self._text(audio_chunk, sample_rate)
+
+        async def atranscribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+            await asyncio.sleep(_delay(ms, jitter_ms, self.rng))
+            return self._text(audio_chunk, sample_rate)
+
+        def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto",
+                                   translate=False):
+            text = self.transcribe(audio_chunk, sample_rate)
+            return [(0.0, len(audio_chunk) / (sample_rate * 2), text, [])]
+
+        def _text(self, audio_chunk, sample_rate):
+            if self.rng.random() < error_rate:
+                self.errors += 1
+                raise RuntimeError("stand-in Whisper error")
+            words = max(1, round(len(audio_chunk) / (sample_rate * 2) * WORDS_PER_SECOND))
+            return " ".join(["word"] * words)
+
+    return StandInTranscriber()
+
+
+class StandInTranslator:
+    """Blocking like deep_translator; on an injected error it returns the text untranslated, as translate_text does."""
+
+    def __init__(self, ms, jitter_ms, error_rate, seed):
+        self.ms, self.jitter_ms, self.error_rate = ms, jitter_ms, error_rate
+        self.rng = random.Random(seed + 1)
+        self.errors = 0
+
+    def __call__(self, text, target_language="es"):
+        time.sleep(_delay(self.ms, self.jitter_ms, self.rng))
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return text
+        return text.upper()
+
+
+class FaultyTTSHandler(StandInTTSHandler):
+    """StandInTTSHandler that speaks each request's text at WORDS_PER_SECOND, with jitter and HTTP 500s."""
+
+    jitter_ms = 0
+    error_rate = 0.0
+    rng = random.Random(0)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.rng.random() < self.error_rate:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        words = len(body.get("text", "").split())
+        self.send_audio(max(0.5, words / WORDS_PER_SECOND), _delay(self.first_byte_ms, self.jitter_ms, self.rng) * 1000)
+
+
+def make_player(speed):
+    """Headless speakers: reads the PCM stream and 'plays' it by sleeping for its duration / speed."""
+    async def play(tts_data, trace):
+        played = 0
+        if isinstance(tts_data, (bytes, bytearray)):
+            tts_data = _once(tts_data)
+        async for chunk in tts_data:
+            if not played:
+                trace.mark("playback_start")
+            played += len(chunk)
+            if speed > 0:
+                await asyncio.sleep(len(chunk) / (SAMPLE_RATE * 2) / speed)
+        trace.mark("playback_end")
+    return play
+
+
+async def _once(data):
+    yield data
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="*", help="16-bit lecture recordings (default: a synthetic lecture)")
+    parser.add_argument("--minutes", type=float, default=2, help="length of the synthetic lecture")
+    parser.add_argument("--speed", type=float, default=4, help="capture and playback rate vs real time (0 = unpaced)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=4)
+    parser.add_argument("--overflow", default="merge", choices=("block", "drop_oldest", "merge"))
+    parser.add_argument("--target-language", default="en", help="anything but 'en' adds the translator stage")
+    parser.add_argument("--stt-ms", type=float, default=400)
+    parser.add_argument("--stt-jitter-ms", type=float, default=150)
+    parser.add_argument("--stt-error-rate", type=float, default=0.0)
+    parser.add_argument("--translate-ms", type=float, default=150)
+    parser.add_argument("--translate-jitter-ms", type=float, default=50)
+    parser.add_argument("--translate-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=300)
+    parser.add_argument("--tts-jitter-ms", type=float, default=100)
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-speed", type=float, default=3.0, help="TTS generation speed vs real time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    FaultyTTSHandler.first_byte_ms = args.tts_first_byte_ms
+    FaultyTTSHandler.jitter_ms = args.tts_jitter_ms
+    FaultyTTSHandler.error_rate = args.tts_error_rate
+    FaultyTTSHandler.speed = args.tts_speed
+    FaultyTTSHandler.rng = random.Random(args.seed + 2)
+    server = start_server(FaultyTTSHandler)
+
+    # Point the real TTS client at the stand-in and keep the cache out of the measurement
+    os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+    os.environ.setdefault("TTS_VOICE_ID", "bench-voice")
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ["TTS_CACHE_ENABLED"] = "0"
+    os.environ["TTS_STREAMING"] = "1"
+    from runtime import AssistantRuntime
+    from tracing import Tracer, TraceSink, LogSink
+
+    recordings = [load_wav(p) for p in args.wavs] or [synthetic_lecture(args.minutes * 60, seed=args.seed)]
+    audio_seconds = sum(len(pcm) for pcm in recordings) / (SAMPLE_RATE * 2)
+
+    traces = []
+
+    class CollectingSink(TraceSink):
+        def record(self, pipeline, trace):
+            traces.append(trace.spans())
+
+    transcriber = make_standin_transcriber(args.stt_ms, args.stt_jitter_ms, args.stt_error_rate, args.seed)
+    translator = StandInTranslator(args.translate_ms, args.translate_jitter_ms, args.translate_error_rate, args.seed)
+    tracer = Tracer(pipeline="bench", sink=CollectingSink(), export_seconds=float("inf"))
+    runtime = AssistantRuntime(
+        audio_source=lambda: replay_capture(recordings, speed=args.speed),
+        target_language=args.target_language,
+        player=make_player(args.speed),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        overflow=args.overflow,
+        transcriber=transcriber,
+        translator=translator,
+        tracer=tracer,
+        name="bench"
+    )
+
+    cpu0, t0 = cpu_seconds(), time.perf_counter()
+    asyncio.run(runtime.run())
+    wall, cpu = time.perf_counter() - t0, cpu_seconds() - cpu0
+    server.shutdown()
+
+    lag = np.array([s["end_to_end"] for s in traces if "end_to_end" in s]) * 1e3
+    counts = runtime.counts
+    print(f"\n{audio_seconds:.0f}s of audio at {args.speed:g}x, {args.workers} workers, "
+          f"overflow={args.overflow}, target={args.target_language}\n")
+    print(f"wall time          {wall:8.1f} s   ({audio_seconds / wall:.1f}x real time)")
+    print(f"segments           {counts['segments']:8d}   ({counts['segments'] / wall:.2f} segments/s)")
+    print(f"played             {counts['played']:8d}   merged {counts['segments_merged']}, "
+          f"dropped {counts['segments_dropped']}, chunks shed {counts['chunks_dropped']}")
+    print(f"injected errors    stt {transcriber.errors}, translate {translator.errors}")
+    if len(lag):
+        print(f"end-to-end lag     p50 {np.percentile(lag, 50):7.0f} ms   p95 {np.percentile(lag, 95):7.0f} ms   "
+              f"p99 {np.percentile(lag, 99):7.0f} ms   max {lag.max():7.0f} ms")
+    print(f"CPU                {cpu:8.2f} s   ({cpu / wall:.0%} of one core)")
+    print(f"peak RSS           {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:8.1f} MB\n")
+    LogSink().export("bench", tracer.histograms)
+
+
+if __name__ == "__main__":
+    main()
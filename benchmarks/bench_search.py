@@ -0,0 +1,119 @@
+# benchmarks/bench_search.py
+#
+# Query latency of the lecture search (search_index) over --lectures saved lectures:
+#   semantic — VectorIndex ranking of every lecture vector (synthetic 384-d vectors; runs offline)
+#   keyword  — MongoDB text indexes over lecture_search and transcript_segments, alone and with the library cards
+#              fetched (SearchIndex.search); needs MONGO_CONNECTION, seeds a throwaway database that is dropped afterwards
+# Query embedding (sentence-transformers, CPU) is timed too when it is installed (--embed).
+# Run from the repo root:  python -m benchmarks.bench_search [--lectures 10000] [--queries 200] [--embed]
+
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from search_index import VectorIndex
+
+DIM = 384
+
+
+def percentiles(times):
+    ms = np.array(times) * 1e3
+    return f"{np.percentile(ms, 50):>8.2f} {np.percentile(ms, 95):>8.2f} {ms.max():>8.2f}"
+
+
+def timed(fn, queries):
+    times = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def bench_semantic(n, n_queries):
+    rng = np.random.default_rng(0)
+    topics = rng.normal(size=(50, DIM))  # lectures cluster around a few dozen course topics
+    index = VectorIndex(DIM)
+    t0 = time.perf_counter()
+    for i in range(n):
+        index.add(i, topics[i % 50] + rng.normal(scale=0.8, size=DIM))
+    print(f"{'semantic: load':<28} {n} vectors in {(time.perf_counter() - t0) * 1e3:.0f} ms")
+    queries = [topics[i % 50] + rng.normal(scale=1.0, size=DIM) for i in range(n_queries)]
+    print(f"{'semantic: rank':<28} {percentiles(timed(index.search, queries))}")
+
+
+def bench_embed(n_queries):
+    from search_index import Embedder
+
+    embedder = Embedder()
+    queries = [f"lecture about topic {i} and its applications" for i in range(n_queries)]
+    embedder.embed(queries[:1])  # warm up
+    print(f"{'semantic: embed query':<28} {percentiles(timed(lambda q: embedder.embed([q]), queries))}")
+
+
+def bench_keyword(n, n_queries, transcript_kb):
+    import pymongo
+
+    from search_index import SearchIndex
+    from transcript_store import TranscriptStore
+
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"))
+    db = client["hearsay_bench"]
+    try:
+        rng = random.Random(0)
+        # Zipf-ish vocabulary: a few very common words, a long tail of course terms
+        vocabulary = [f"term{i}" for i in range(20000)]
+        weights = [1 / (i + 1) for i in range(len(vocabulary))]
+        store = TranscriptStore(db)
+        index = SearchIndex(db, store=store)
+        t0 = time.perf_counter()
+        for start in range(0, n, 500):
+            lectures, transcripts = [], []
+            for i in range(start, min(n, start + 500)):
+                words = rng.choices(vocabulary, weights, k=transcript_kb * 1024 // 8)
+                lectures.append({"name": f"Lecture {i} {vocabulary[i % 2000]}", "timestamp": f"{i:08d}",
+                                 "status": "saved", "preview": " ".join(words[:25])})
+                transcripts.append(words)
+            ids = db["transcripts"].insert_many(lectures).inserted_ids
+            db["lecture_search"].insert_many([{"_id": _id, "name": lecture["name"], "image_summaries": []}
+                                              for lecture, _id in zip(lectures, ids)])
+            db["transcript_segments"].insert_many([  # ~20-word transcript lines
+                {"lecture_id": _id, "index": j, "text": " ".join(words[k:k + 20])}
+                for words, _id in zip(transcripts, ids) for j, k in enumerate(range(0, len(words), 20))
+            ])
+        store.close()
+        print(f"{'keyword: seed':<28} {n} lectures in {time.perf_counter() - t0:.0f} s")
+
+        queries = [" ".join(rng.choice(vocabulary[100:5000]) for _ in range(rng.randint(1, 3))) for _ in range(n_queries)]
+        index.keyword(queries[0])  # warm up
+        print(f"{'keyword: text index':<28} {percentiles(timed(index.keyword, queries))}")
+        print(f"{'keyword: with cards':<28} {percentiles(timed(index.search, queries))}")
+    finally:
+        client.drop_database("hearsay_bench")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lectures", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--transcript-kb", type=int, default=8, help="transcript size of the seeded lectures")
+    parser.add_argument("--embed", action="store_true", help="also time query embedding (sentence-transformers)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    print(f"{'query (ms)':<28} {'p50':>8} {'p95':>8} {'max':>8}")
+    bench_semantic(args.lectures, args.queries)
+    if args.embed:
+        bench_embed(args.queries)
+    if os.getenv("MONGO_CONNECTION"):
+        bench_keyword(args.lectures, args.queries, args.transcript_kb)
+    else:
+        print(f"{'keyword':<28} skipped (set MONGO_CONNECTION)")
+
+
+if __name__ == "__main__":
+    main()
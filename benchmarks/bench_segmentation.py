@@ -0,0 +1,73 @@
+# benchmarks/bench_segmentation.py
+#
+# Uploaded audio per minute and segment closing delay: whole-buffer flushes vs the pause-aligned Segmenter.
+# Run from the repo root:  python -m benchmarks.bench_segmentation [--minutes 10]
+
+import argparse
+import numpy as np
+
+from segmentation import Segmenter
+from vad import StreamingVAD
+from benchmarks.bench_vad import synthetic_lecture, chunks_of, SAMPLE_RATE, CHUNK_SIZE
+
+URGENT_FLUSH_SECONDS = 10
+MIN_AUDIO_DURATION_SECONDS = 1.5
+
+
+def run_whole_buffer(pcm):
+    """The previous main.processing_loop policy: flush the entire buffer on silence or the urgent timer."""
+    vad = StreamingVAD(sample_rate=SAMPLE_RATE)
+    buffered = 0
+    first_time = None
+    segments = []
+    for i, chunk in enumerate(chunks_of(pcm)):
+        now = (i + 1) * CHUNK_SIZE / SAMPLE_RATE
+        first_time = now if first_time is None else first_time
+        vad.push(chunk)
+        buffered += len(chunk)
+        seconds = buffered / (SAMPLE_RATE * 2)
+        if (vad.has_trailing_silence() or now - first_time >= URGENT_FLUSH_SECONDS) \
+                and seconds >= MIN_AUDIO_DURATION_SECONDS:
+            segments.append((seconds, now - (first_time - CHUNK_SIZE / SAMPLE_RATE)))
+            buffered = 0
+            first_time = None
+            vad.reset()
+    return segments
+
+
+def run_segmenter(pcm):
+    segmenter = Segmenter(sample_rate=SAMPLE_RATE,
+                          urgent_flush_seconds=URGENT_FLUSH_SECONDS,
+                          min_segment_seconds=MIN_AUDIO_DURATION_SECONDS)
+    segments = []
+    for i, chunk in enumerate(chunks_of(pcm)):
+        t = i * CHUNK_SIZE / SAMPLE_RATE
+        result = segmenter.feed(chunk, t, now=t + CHUNK_SIZE / SAMPLE_RATE)
+        if result:
+            _, seg_pcm, timestamps = result
+            segments.append((len(seg_pcm) / (SAMPLE_RATE * 2), t + CHUNK_SIZE / SAMPLE_RATE - timestamps[0]))
+    return segments
+
+
+def report(name, segments, minutes):
+    lengths = np.array([s for s, _ in segments])
+    waits = np.array([w for _, w in segments])
+    print(f"{name:<14} {len(segments):>8} {lengths.sum() / minutes:>12.1f} {lengths.mean():>10.2f} "
+          f"{waits.mean():>11.2f} {np.percentile(waits, 95):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    args = parser.parse_args()
+
+    pcm = synthetic_lecture(args.minutes * 60)
+    print(f"{'policy':<14} {'segments':>8} {'upload s/min':>12} {'mean len':>10} "
+          f"{'mean wait':>11} {'p95 wait':>10}")
+    report("whole buffer", run_whole_buffer(pcm), args.minutes)
+    report("segmenter", run_segmenter(pcm), args.minutes)
+    print("\n'wait' is how long the oldest audio in a segment sat in the buffer before the segment closed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/bench_sessions.py
+#
+# How one process scales from 1 to 16 concurrent sessions (lecture halls) under SessionManager.
+# Every session replays its own file-backed lecture in real time (or faster) through the full pipeline;
+# Whisper, the translator and ElevenLabs are the stand-ins from bench_pipeline, shared like the real clients.
+# Run from the repo root:  python -m benchmarks.bench_sessions [--sessions 1 2 4 8 16] [--minutes 1] [--speed 4]
+
+import argparse
+import os
+import random
+import resource
+import threading
+import time
+import numpy as np
+
+from benchmarks.bench_vad import synthetic_lecture
+from benchmarks.bench_tts_streaming import start_server
+from benchmarks.bench_pipeline import (
+    FaultyTTSHandler, StandInTranslator, load_wav, make_player, make_standin_transcriber, replay_capture, cpu_seconds
+)
+
+
+def rss_mb():
+    """Current resident set size (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def run(n, recordings, args):
+    from sessions import Session, SessionManager
+    from tracing import Tracer, TraceSink
+
+    lags = []
+
+    class LagSink(TraceSink):
+        def record(self, pipeline, trace):
+            spans = trace.spans()
+            if "end_to_end" in spans:
+                lags.append(spans["end_to_end"])
+
+    sink = LagSink()
+    transcriber = make_standin_transcriber(args.stt_ms, args.stt_jitter_ms, 0.0, args.seed)
+    manager = SessionManager(max_api_requests=args.max_api_requests, transcriber=transcriber)
+    for i in range(n):
+        pcm = recordings[i % len(recordings)]
+        manager.add(Session(
+            name=f"room-{i}",
+            audio_source=lambda pcm=pcm: replay_capture([pcm], speed=args.speed),
+            target_language=args.target_language,
+            translator=StandInTranslator(args.translate_ms, args.translate_jitter_ms, 0.0, args.seed + i),
+            player=make_player(args.speed),
+            tracer=Tracer(pipeline=f"room-{i}", sink=sink, export_seconds=float("inf"))
+        ))
+
+    peak = [rss_mb(), threading.active_count()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.1):
+            peak[0] = max(peak[0], rss_mb())
+            peak[1] = max(peak[1], threading.active_count())
+
+    threading.Thread(target=sample, daemon=True).start()
+    rss0, cpu0, t0 = rss_mb(), cpu_seconds(), time.perf_counter()
+    for name in list(manager.sessions):
+        manager.start(name)
+    manager.wait()
+    wall, cpu = time.perf_counter() - t0, cpu_seconds() - cpu0
+    done.set()
+
+    segments = sum(s.runtime.counts["segments"] for s in manager.sessions.values())
+    played = sum(s.runtime.counts["played"] for s in manager.sessions.values())
+    manager.shutdown()
+    lag = np.array(lags) * 1e3 if lags else np.zeros(1)
+    return {
+        "sessions": n, "wall": wall, "segments": segments, "played": played,
+        "seg_per_s": segments / wall, "p50": np.percentile(lag, 50), "p95": np.percentile(lag, 95),
+        "cpu": cpu / wall, "rss": peak[0] - rss0, "threads": peak[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="*", help="lecture recordings, used round-robin (default: synthetic lectures)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--minutes", type=float, default=1, help="length of each synthetic lecture")
+    parser.add_argument("--speed", type=float, default=4, help="capture and playback rate vs real time")
+    parser.add_argument("--max-api-requests", type=int, default=16)
+    parser.add_argument("--target-language", default="es")
+    parser.add_argument("--stt-ms", type=float, default=400)
+    parser.add_argument("--stt-jitter-ms", type=float, default=150)
+    parser.add_argument("--translate-ms", type=float, default=150)
+    parser.add_argument("--translate-jitter-ms", type=float, default=50)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=300)
+    parser.add_argument("--tts-jitter-ms", type=float, default=100)
+    parser.add_argument("--tts-speed", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    FaultyTTSHandler.first_byte_ms = args.tts_first_byte_ms
+    FaultyTTSHandler.jitter_ms = args.tts_jitter_ms
+    FaultyTTSHandler.speed = args.tts_speed
+    FaultyTTSHandler.rng = random.Random(args.seed + 2)
+    server = start_server(FaultyTTSHandler)
+
+    os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+    os.environ.setdefault("TTS_VOICE_ID", "bench-voice")
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ["TTS_CACHE_ENABLED"] = "0"
+    os.environ["TTS_STREAMING"] = "1"
+
+    recordings = [load_wav(p) for p in args.wavs] or [
+        synthetic_lecture(args.minutes * 60, seed=args.seed + i) for i in range(max(args.sessions))
+    ]
+
+    results = [run(n, recordings, args) for n in args.sessions]
+    server.shutdown()
+
+    print(f"\neach session: {len(recordings[0]) / 32000:.0f}s of audio at {args.speed:g}x, "
+          f"target={args.target_language}, {args.max_api_requests} shared API slots\n")
+    print(f"{'sessions':>8} {'wall s':>7} {'segments':>9} {'seg/s':>7} {'lag p50 ms':>11} {'lag p95 ms':>11} "
+          f"{'CPU':>6} {'+RSS MB':>8} {'threads':>8}")
+    for r in results:
+        print(f"{r['sessions']:>8} {r['wall']:>7.1f} {r['segments']:>9} {r['seg_per_s']:>7.2f} {r['p50']:>11.0f} "
+              f"{r['p95']:>11.0f} {r['cpu']:>6.0%} {r['rss']:>8.1f} {r['threads']:>8}")
+    print(f"\npeak RSS over all runs: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_study_artifacts.py
+#
+# Summary tab cost: calling the LLM on every render (old summarize_lecture) vs StudyArtifacts, which stores the
+# result on the lecture document and serves later renders from it. Needs GROQ_API_KEY and a MongoDB at
+# MONGO_CONNECTION; the lecture goes to a throwaway database that is dropped afterwards.
+# Reports the latency of each of --views renders and the prompt tokens sent.
+# Run from the repo root:  python -m benchmarks.bench_study_artifacts [--views 5] [--lines 300]
+
+import argparse
+import os
+import time
+
+import pymongo
+from dotenv import load_dotenv
+from groq import Groq
+
+from study_artifacts import PROMPTS, STUDY_MODEL, StudyArtifacts
+from transcript_store import TranscriptStore
+
+
+class CountingClient:
+    """Groq client that adds up the prompt tokens of every completion."""
+
+    def __init__(self, client):
+        self.client = client
+        self.chat = self
+        self.completions = self
+        self.prompt_tokens = 0
+
+    def create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        self.prompt_tokens += response.usage.prompt_tokens
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--views", type=int, default=5, help="renders of the Summary tab")
+    parser.add_argument("--lines", type=int, default=300, help="transcript lines")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"))
+    db = client["hearsay_bench"]
+    try:
+        store = TranscriptStore(db)
+        lecture_id = store.open_lecture(name="bench")
+        for index in range(args.lines):
+            store.append(lecture_id, index, f"In part {index} we derive the gradient of the loss for layer {index % 12}.")
+        store.save_lecture(lecture_id, args.lines)
+        store.close()
+        transcript = store.transcript(store.lectures.find_one({"_id": lecture_id}))
+
+        llm = CountingClient(Groq(api_key=os.getenv("GROQ_API_KEY")))
+        artifacts = StudyArtifacts(store.lectures, llm)
+
+        def uncached():
+            llm.create(model=STUDY_MODEL,
+                       messages=[{"role": "user", "content": PROMPTS["summary"][1].format(text=transcript)}])
+
+        def cached():
+            artifacts.summary(lecture_id, transcript)
+
+        print(f"{args.lines}-line lecture, {len(transcript)} chars\n")
+        print(f"{'render':<8} {'uncached ms':>12} {'cached ms':>10}")
+        totals = {}
+        for name, fn in (("uncached", uncached), ("cached", cached)):
+            llm.prompt_tokens = 0
+            times = []
+            for _ in range(args.views):
+                t0 = time.perf_counter()
+                fn()
+                times.append((time.perf_counter() - t0) * 1e3)
+            totals[name] = (times, llm.prompt_tokens)
+        for view in range(args.views):
+            print(f"{view + 1:<8} {totals['uncached'][0][view]:>12.0f} {totals['cached'][0][view]:>10.0f}")
+        print(f"\nprompt tokens: uncached {totals['uncached'][1]}, cached {totals['cached'][1]}")
+    finally:
+        client.drop_database("hearsay_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_transcribers.py
+#
+# Latency and real-time factor (processing time / audio time) per segment for each transcription backend.
+# Needs GROQ_API_KEY for "groq" and faster-whisper for "local".
+# Run from the repo root:
+#   python -m benchmarks.bench_transcribers lecture1.wav lecture2.wav [--backends groq,local] [--segment-seconds 5]
+
+import argparse
+import time
+import wave
+import numpy as np
+
+from transcription import TRANSCRIBERS
+
+
+def load_pcm(path):
+    """16-bit PCM bytes and sample rate from a WAV file (mixed down to mono if needed)."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        pcm = wf.readframes(wf.getnframes())
+        rate, channels = wf.getframerate(), wf.getnchannels()
+    if channels > 1:
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels).mean(axis=1)
+        pcm = samples.astype(np.int16).tobytes()
+    return pcm, rate
+
+
+def segments_of(pcm, rate, seconds):
+    step = int(seconds * rate) * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step) if len(pcm[i:i + step]) >= rate]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--backends", default="groq,local")
+    parser.add_argument("--segment-seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    inputs = []
+    for path in args.wavs:
+        pcm, rate = load_pcm(path)
+        inputs += [(seg, rate) for seg in segments_of(pcm, rate, args.segment_seconds)]
+    audio_seconds = sum(len(seg) / (rate * 2) for seg, rate in inputs)
+    print(f"{len(inputs)} segments, {audio_seconds:.1f}s of audio\n")
+
+    print(f"{'backend':<8} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'RTF':>6} {'empty':>6}")
+    for backend in args.backends.split(","):
+        t0 = time.perf_counter()
+        transcriber = TRANSCRIBERS[backend]()
+        load_seconds = time.perf_counter() - t0
+
+        latencies, empty = [], 0
+        for seg, rate in inputs:
+            t0 = time.perf_counter()
+            text = transcriber.transcribe(seg, sample_rate=rate)
+            latencies.append(time.perf_counter() - t0)
+            empty += not text
+
+        lat = np.array(latencies)
+        print(f"{backend:<8} {load_seconds:>7.2f} {np.percentile(lat, 50) * 1e3:>8.0f} "
+              f"{np.percentile(lat, 95) * 1e3:>8.0f} {lat.sum() / audio_seconds:>6.2f} {empty:>6}")
+
+
+if __name__ == "__main__":
+    main()
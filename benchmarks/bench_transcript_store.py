@@ -0,0 +1,94 @@
+# benchmarks/bench_transcript_store.py
+#
+# Saving a lecture: one insert_one of the whole transcript at the end (old save_transcript_to_mongo) vs
+# TranscriptStore, which bulk-writes segments while the lecture runs and only updates metadata on save.
+# Needs a MongoDB at MONGO_CONNECTION; everything goes to a throwaway database that is dropped afterwards.
+# Reports, per lecture length: time of the save click, Python memory allocated while saving, and
+# (incremental only) the total time spent in background flushes.
+# Run from the repo root:  python -m benchmarks.bench_transcript_store [--segments 100 1000 10000]
+
+import argparse
+import os
+import time
+import tracemalloc
+
+import pymongo
+from dotenv import load_dotenv
+
+from transcript_store import TranscriptStore
+
+WORDS_PER_SEGMENT = 25
+
+
+def lecture_lines(n):
+    return [" ".join(f"word{(i * WORDS_PER_SEGMENT + j) % 5000}" for j in range(WORDS_PER_SEGMENT)) for i in range(n)]
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def bench_legacy(db, lines):
+    collection = db["transcripts"]
+
+    def save():
+        collection.insert_one({
+            "name": "bench",
+            "transcript": "\n".join(lines).strip(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "voice": "bench",
+        })
+
+    return measure(save)
+
+
+def bench_incremental(db, lines, flush_segments):
+    store = TranscriptStore(db, flush_seconds=3600, flush_segments=10**9)  # flushes driven by hand below
+    lecture_id = store.open_lecture(name="bench")
+    flushing = 0.0
+    for index, line in enumerate(lines):
+        store.append(lecture_id, index, line)
+        if (index + 1) % flush_segments == 0:
+            t0 = time.perf_counter()
+            store.flush()
+            flushing += time.perf_counter() - t0
+    seconds, peak = measure(lambda: store.save_lecture(lecture_id, len(lines), name="bench", voice="bench"))
+    store.close()
+    return seconds, peak, flushing
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--flush-segments", type=int, default=50, help="segments per background bulk write")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"))
+    db = client["hearsay_bench"]
+    try:
+        print(f"{'segments':>9} {'MB text':>8} {'legacy save ms':>15} {'legacy MB':>10} "
+              f"{'incr save ms':>13} {'incr MB':>8} {'bg flush ms':>12}")
+        for n in args.segments:
+            lines = lecture_lines(n)
+            size = sum(len(line) + 1 for line in lines) / 2**20
+            if size > 15:
+                legacy = None  # past the 16 MB document limit
+            else:
+                legacy = bench_legacy(db, lines)
+            seconds, peak, flushing = bench_incremental(db, lines, args.flush_segments)
+            legacy_cols = f"{legacy[0] * 1e3:>15.1f} {legacy[1] / 2**20:>10.2f}" if legacy else f"{'too large':>15} {'-':>10}"
+            print(f"{n:>9} {size:>8.2f} {legacy_cols} {seconds * 1e3:>13.1f} {peak / 2**20:>8.2f} "
+                  f"{flushing * 1e3:>12.0f}")
+    finally:
+        client.drop_database("hearsay_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_tts_cache.py
+#
+# Hit rate, bytes saved and per-segment TTS latency with and without the TTS cache, against the
+# local stand-in ElevenLabs server from bench_tts_streaming. Segments are drawn from a phrase pool
+# with a Zipf-like popularity, mimicking a lecturer's stock phrases.
+# Run from the repo root:  python -m benchmarks.bench_tts_cache [--segments 200] [--phrases 120]
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from benchmarks.bench_tts_streaming import StandInTTSHandler, start_server
+
+
+def lecture_phrases(n_segments, n_phrases, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_phrases + 1)
+    picks = rng.choice(n_phrases, size=n_segments, p=weights / weights.sum())
+    return [f"phrase number {i}" for i in picks]
+
+
+def run(phrases, stream_audio):
+    latencies = []
+    for text in phrases:
+        t0 = time.perf_counter()
+        for _ in stream_audio(text):
+            pass
+        latencies.append(time.perf_counter() - t0)
+    return np.array(latencies) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--phrases", type=int, default=120)
+    args = parser.parse_args()
+
+    StandInTTSHandler.first_byte_ms = 150
+    StandInTTSHandler.speed = 20
+    StandInTTSHandler.audio_seconds = 1.5
+    server = start_server()
+
+    os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+    os.environ.setdefault("TTS_VOICE_ID", "bench-voice")
+    os.environ["TTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="tts-cache-bench-")
+    import tts_generation
+    from tts_cache import get_tts_cache
+
+    phrases = lecture_phrases(args.segments, args.phrases)
+
+    tts_generation.TTS_CACHE_ENABLED = False
+    uncached = run(phrases, tts_generation.stream_audio)
+    tts_generation.TTS_CACHE_ENABLED = True
+    cached = run(phrases, tts_generation.stream_audio)
+    server.shutdown()
+
+    stats = get_tts_cache().stats()
+    print(f"{args.segments} segments drawn from {args.phrases} phrases ({len(set(phrases))} distinct)\n")
+    print(f"{'':<10} {'p50 ms':>8} {'mean ms':>8} {'total s':>8}")
+    for name, t in (("no cache", uncached), ("cache", cached)):
+        print(f"{name:<10} {np.percentile(t, 50):>8.1f} {t.mean():>8.1f} {t.sum() / 1e3:>8.2f}")
+    print(f"\nhit rate {stats['hit_rate']:.1%}, {stats['bytes_saved'] / 1024:.0f} KB of audio served from cache "
+          f"({stats['memory_hits']} memory / {stats['disk_hits']} disk hits)")
+
+
+if __name__ == "__main__":
+    main()
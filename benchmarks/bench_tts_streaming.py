@@ -0,0 +1,139 @@
+# benchmarks/bench_tts_streaming.py
+#
+# Time-to-first-sound for one TTS segment: full MP3 download + decode (old path) vs streamed PCM, timed up to the
+# first write to the output stream. Streamed PCM is played through a stream opened per segment and through one
+# pre-opened PcmOutput reused across segments; without a sound device (or with --no-device) only the latter runs,
+# into a sink that discards the audio, so device open time is not included.
+# ElevenLabs is replaced by a local HTTP server that emits audio progressively, like the real /stream endpoint.
+# Run from the repo root:  python -m benchmarks.bench_tts_streaming [--first-byte-ms 300] [--speed 3] [--runs 10]
+
+import argparse
+import os
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+SAMPLE_RATE = 16000
+MP3_BYTES_PER_SECOND = 16000  # 128 kbps
+
+
+class StandInTTSHandler(BaseHTTPRequestHandler):
+    """Streams `audio_seconds` of audio, `speed`x faster than real time, after `first_byte_ms` of 'thinking'."""
+
+    first_byte_ms = 300
+    speed = 3.0
+    audio_seconds = 4.0
+    chunk_ms = 100
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_audio(self.audio_seconds, self.first_byte_ms)
+
+    def send_audio(self, audio_seconds, first_byte_ms):
+        pcm = "output_format=pcm" in self.path
+        bytes_per_second = SAMPLE_RATE * 2 if pcm else MP3_BYTES_PER_SECOND
+
+        time.sleep(first_byte_ms / 1000)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm" if pcm else "audio/mpeg")
+        self.end_headers()
+
+        n_chunks = int(audio_seconds * 1000 / self.chunk_ms)
+        chunk = os.urandom(int(bytes_per_second * self.chunk_ms / 1000))
+        for _ in range(n_chunks):
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(self.chunk_ms / 1000 / self.speed)
+
+    def log_message(self, *args):
+        pass
+
+
+class Marks:
+    """Stand-in SegmentTrace: the perf_counter time of each event's first mark."""
+
+    def __init__(self):
+        self.times = {}
+
+    def mark(self, event, t=None):
+        self.times.setdefault(event, time.perf_counter())
+
+
+class SilentOutput:
+    """PcmOutput stand-in when there is no sound device: discards the audio."""
+
+    def write(self, frames):
+        pass
+
+
+def start_server(handler=StandInTTSHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--first-byte-ms", type=float, default=300)
+    parser.add_argument("--speed", type=float, default=3.0, help="generation speed relative to real time")
+    parser.add_argument("--audio-seconds", type=float, default=4.0)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--no-device", action="store_true", help="don't open a sound device, discard the audio")
+    args = parser.parse_args()
+
+    StandInTTSHandler.first_byte_ms = args.first_byte_ms
+    StandInTTSHandler.speed = args.speed
+    StandInTTSHandler.audio_seconds = args.audio_seconds
+    server = start_server()
+
+    os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+    os.environ.setdefault("TTS_VOICE_ID", "bench-voice")
+    os.environ["TTS_CACHE_ENABLED"] = "0"  # every run must hit the stand-in
+    from tts_generation import generate_audio, stream_audio
+    from audio_playback import PcmOutput, play_pcm_stream
+
+    output = None
+    if not args.no_device:
+        try:
+            output = PcmOutput(SAMPLE_RATE).open()
+        except Exception as e:
+            print(f"[WARN] No sound device ({e}); streamed audio is discarded, device open time not included.\n")
+
+    def first_write(output):
+        """Seconds from the request to the first write of PCM to the output stream."""
+        marks = Marks()
+        t0 = time.perf_counter()
+        play_pcm_stream(stream_audio("benchmark sentence"), sample_rate=SAMPLE_RATE, trace=marks, output=output)
+        return marks.times["playback_start"] - t0
+
+    old, per_segment, reused = [], [], []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        data = generate_audio("benchmark sentence")
+        assert data
+        old.append(time.perf_counter() - t0)
+        if output is not None:
+            per_segment.append(first_write(None))
+        reused.append(first_write(output or SilentOutput()))
+
+    server.shutdown()
+    if output is not None:
+        output.close()
+    print(f"stand-in: first byte {args.first_byte_ms:g} ms, {args.audio_seconds:g}s of audio at "
+          f"{args.speed:g}x real time, {args.runs} runs\n")
+    print(f"{'path':<36} {'p50 ms':>8} {'max ms':>8}")
+    for label, times in [("MP3: full download (old)", old),
+                         ("PCM: stream opened per segment", per_segment),
+                         ("PCM: pre-opened stream (new)", reused)]:
+        if times:
+            ms = np.array(times) * 1e3
+            print(f"{label:<36} {np.median(ms):>8.0f} {ms.max():>8.0f}")
+    if shutil.which("ffmpeg") is None:
+        print("\nffmpeg not found: the old path's MP3 decode time (pydub) comes on top of the download.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_vad.py
+#
+# Per-chunk cost of silence detection over a long recording.
+# Run from the repo root:  python -m benchmarks.bench_vad [--minutes 10] [--legacy-seconds 20]
+
+import argparse
+import time
+import numpy as np
+
+from vad import StreamingVAD
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4096
+
+
+def synthetic_lecture(seconds, seed=0):
+    """Noise bursts (~-20 dBFS) separated by short quiet gaps (~-60 dBFS), as int16 PCM."""
+    rng = np.random.default_rng(seed)
+    out = np.empty(int(seconds * SAMPLE_RATE), dtype=np.int16)
+    pos = 0
+    speaking = True
+    while pos < len(out):
+        length = int((rng.uniform(1.5, 4.0) if speaking else rng.uniform(0.3, 1.0)) * SAMPLE_RATE)
+        level = 3000 if speaking else 30
+        seg = rng.normal(0, level, size=min(length, len(out) - pos))
+        out[pos:pos + len(seg)] = np.clip(seg, -32768, 32767).astype(np.int16)
+        pos += len(seg)
+        speaking = not speaking
+    return out.tobytes()
+
+
+def chunks_of(pcm):
+    step = CHUNK_SIZE * 2
+    for i in range(0, len(pcm) - step + 1, step):
+        yield pcm[i:i + step]
+
+
+def bench_streaming(pcm):
+    """Worst case: the buffer is never flushed, so the VAD sees the whole recording as one segment."""
+    vad = StreamingVAD(sample_rate=SAMPLE_RATE)
+    per_minute = {}
+    for i, chunk in enumerate(chunks_of(pcm)):
+        t0 = time.perf_counter()
+        vad.push(chunk)
+        vad.has_trailing_silence()
+        elapsed = time.perf_counter() - t0
+        minute = int(i * CHUNK_SIZE / SAMPLE_RATE // 60)
+        per_minute.setdefault(minute, []).append(elapsed)
+    return per_minute
+
+
+def bench_legacy(pcm, seconds):
+    """The old approach: rebuild an AudioSegment from the whole buffer and rescan it every chunk."""
+    from pydub import AudioSegment, silence
+
+    buffer = bytearray()
+    results = []
+    for i, chunk in enumerate(chunks_of(pcm[:int(seconds * SAMPLE_RATE) * 2])):
+        buffer += chunk
+        t0 = time.perf_counter()
+        audio = AudioSegment(data=bytes(buffer), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+        silence.detect_silence(audio, min_silence_len=700, silence_thresh=-40)
+        results.append((len(buffer) / (SAMPLE_RATE * 2), time.perf_counter() - t0))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--legacy-seconds", type=float, default=0,
+                        help="also time the old pydub full-rescan path over this many seconds")
+    args = parser.parse_args()
+
+    pcm = synthetic_lecture(args.minutes * 60)
+
+    print(f"StreamingVAD, {args.minutes:g} min without flushing, {CHUNK_SIZE}-sample chunks")
+    print(f"{'minute':>6} {'chunks':>7} {'mean µs':>9} {'p99 µs':>9}")
+    for minute, times in sorted(bench_streaming(pcm).items()):
+        t = np.array(times) * 1e6
+        print(f"{minute:>6} {len(t):>7} {t.mean():>9.1f} {np.percentile(t, 99):>9.1f}")
+
+    if args.legacy_seconds:
+        print(f"\nLegacy pydub detect_silence over the growing buffer")
+        print(f"{'buffer s':>8} {'ms/chunk':>9}")
+        for buffer_s, elapsed in bench_legacy(pcm, args.legacy_seconds)[::10]:
+            print(f"{buffer_s:>8.1f} {elapsed * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_wav_encoding.py
+#
+# Per-segment cost of preparing a Whisper upload: temp WAV file (old path) vs in-memory header.
+# Run from the repo root:  python -m benchmarks.bench_wav_encoding [--seconds 5] [--runs 500]
+
+import argparse
+import io
+import os
+import tempfile
+import time
+import wave
+import numpy as np
+
+from audio_encoding import wav_upload
+
+SAMPLE_RATE = 16000
+
+
+def via_tempfile(pcm):
+    """What transcribe_audio used to do before handing the file to Groq."""
+    tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+    tmp_path = tmp_file.name
+    tmp_file.close()
+    try:
+        with wave.open(tmp_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(pcm)
+        with open(tmp_path, "rb") as audio_file:
+            return audio_file.read()
+    finally:
+        os.remove(tmp_path)
+
+
+def via_memory(pcm):
+    return wav_upload(pcm, SAMPLE_RATE)[1]
+
+
+def time_it(fn, pcm, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(pcm)
+        times.append(time.perf_counter() - t0)
+    return np.array(times) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5, help="segment length")
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-3000, 3000, int(args.seconds * SAMPLE_RATE), dtype=np.int16).tobytes()
+
+    # Both paths must produce a file the wave module reads back identically
+    assert via_memory(pcm) == via_tempfile(pcm)
+    with wave.open(io.BytesIO(via_memory(pcm))) as wf:
+        assert wf.readframes(wf.getnframes()) == pcm
+
+    tmpdir = tempfile.gettempdir()
+    before = set(os.listdir(tmpdir))
+    memory = time_it(via_memory, pcm, args.runs)
+    created = set(os.listdir(tmpdir)) - before
+    disk = time_it(via_tempfile, pcm, args.runs)
+
+    print(f"{args.seconds:g}s segment ({len(pcm)} PCM bytes), {args.runs} runs")
+    print(f"{'path':<10} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for name, t in (("tempfile", disk), ("memory", memory)):
+        print(f"{name:<10} {t.mean():>9.1f} {np.percentile(t, 50):>9.1f} {np.percentile(t, 99):>9.1f}")
+    print(f"\nFiles created in {tmpdir} by the in-memory path: {len(created)}")
+
+
+if __name__ == "__main__":
+    main()
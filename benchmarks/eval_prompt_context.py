@@ -0,0 +1,113 @@
+# benchmarks/eval_prompt_context.py
+#
+# Word error rate vs segment length, with and without the rolling prompt (PromptContext).
+# Cuts a recorded lecture into fixed-length segments, transcribes each with the configured engine
+# (TRANSCRIBER_BACKEND), and scores the joined transcript against a reference text file.
+# With --batched, segments go through BatchingTranscriber the way the pipeline sends them (--workers in flight,
+# prompt read at dispatch, committed on completion), so short segments are coalesced as in the app.
+# Needs a real engine: a Groq key or a local Whisper model.
+# Run from the repo root:  python -m benchmarks.eval_prompt_context lecture.wav lecture.txt [--lengths 1 2 3 5]
+#                          [--glossary "eigenvalue, Lagrangian"] [--language en] [--batched [--workers 4]]
+
+import argparse
+import asyncio
+import re
+import time
+
+from benchmarks.bench_pipeline import load_wav
+from prompt_context import PromptContext, parse_glossary
+from transcription import get_transcriber
+from transcription_batching import BatchingTranscriber
+
+SAMPLE_RATE = 16000
+
+
+def normalize(text: str) -> list:
+    """Lowercase words without punctuation, so WER counts recognition errors rather than formatting."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """Word-level Levenshtein distance (substitutions + insertions + deletions)."""
+    prev = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        cur = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ref_word != hyp_word))
+        prev = cur
+    return prev[-1]
+
+
+def transcribe_segments(transcriber, pcm, seconds, language, context=None):
+    step = int(seconds * SAMPLE_RATE) * 2
+    texts = []
+    for offset in range(0, len(pcm), step):
+        prompt = context.prompt() if context is not None else ""
+        text = transcriber.transcribe(pcm[offset:offset + step], SAMPLE_RATE, prompt, language) or ""
+        if context is not None:
+            context.commit(text)
+        texts.append(text)
+    return " ".join(texts)
+
+
+async def transcribe_segments_batched(transcriber, pcm, seconds, language, context=None, workers=4):
+    step = int(seconds * SAMPLE_RATE) * 2
+    pieces = [pcm[offset:offset + step] for offset in range(0, len(pcm), step)]
+    texts = [""] * len(pieces)
+    queue = asyncio.Queue()
+    for i in range(len(pieces)):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            prompt = context.prompt() if context is not None else ""
+            texts[i] = await transcriber.atranscribe(pieces[i], SAMPLE_RATE, prompt, language) or ""
+            if context is not None:
+                context.commit(texts[i])
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await transcriber.aclose()  # its HTTP clients are bound to this loop
+    return " ".join(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wav", help="recorded lecture")
+    parser.add_argument("reference", help="reference transcript (.txt)")
+    parser.add_argument("--lengths", type=float, nargs="+", default=[1, 2, 3, 5], help="segment lengths in seconds")
+    parser.add_argument("--glossary", default="", help="comma-separated course terms")
+    parser.add_argument("--language", default="auto")
+    parser.add_argument("--batched", action="store_true", help="send segments through BatchingTranscriber")
+    parser.add_argument("--workers", type=int, default=4, help="segments in flight with --batched")
+    args = parser.parse_args()
+
+    pcm = load_wav(args.wav)
+    with open(args.reference, encoding="utf-8") as f:
+        reference = normalize(f.read())
+    transcriber = get_transcriber()
+    if args.batched and not isinstance(transcriber, BatchingTranscriber):
+        transcriber = BatchingTranscriber(transcriber)
+    glossary = parse_glossary(args.glossary)
+
+    def run(seconds, context=None):
+        if args.batched:
+            return asyncio.run(transcribe_segments_batched(transcriber, pcm, seconds, args.language, context,
+                                                           args.workers))
+        return transcribe_segments(transcriber, pcm, seconds, args.language, context)
+
+    print(f"{args.wav}: {len(pcm) / (SAMPLE_RATE * 2):.0f}s, {len(reference)} reference words, "
+          f"engine={transcriber.name}, glossary={len(glossary)} terms\n")
+    print(f"{'segment s':>9} {'WER no prompt':>14} {'WER prompt':>11} {'time s':>7}")
+    for seconds in args.lengths:
+        t0 = time.perf_counter()
+        plain = normalize(run(seconds))
+        prompted = normalize(run(seconds, PromptContext(glossary)))
+        print(f"{seconds:>9g} {word_errors(reference, plain) / len(reference):>14.1%} "
+              f"{word_errors(reference, prompted) / len(reference):>11.1%} {time.perf_counter() - t0:>7.0f}")
+    if args.batched:
+        print(f"\nbatching: {transcriber.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# blob_store.py
+
+import hashlib
+import io
+import os
+import threading
+from abc import ABC, abstractmethod
+
+BLOB_STORE = os.getenv("BLOB_STORE", "gridfs")  # gridfs | local
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hearsay", "blobs"))
+THUMBNAIL_PX = int(os.getenv("THUMBNAIL_PX", "320"))
+
+
+def blob_key(data: bytes) -> str:
+    """Content address of a blob: identical uploads are stored once."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """Content-addressed binary storage; documents keep only the returned key."""
+
+    @abstractmethod
+    def put(self, data: bytes, content_type: str = "application/octet-stream") -> str:
+        """Store `data` and return its key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """The blob stored under `key`, or None."""
+
+
+class GridFSBlobStore(BlobStore):
+    """Blobs in a GridFS bucket of the lecture database, filed under their key."""
+
+    def __init__(self, db=None, bucket: str = "lecture_images"):
+        import gridfs
+
+        if db is None:
+            from transcript_store import mongo_database
+
+            db = mongo_database()
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket)
+        self._files = db[f"{bucket}.files"]
+
+    def put(self, data, content_type="application/octet-stream"):
+        key = blob_key(data)
+        if self._files.find_one({"filename": key}, {"_id": 1}) is None:
+            self.bucket.upload_from_stream(key, data, metadata={"content_type": content_type})
+        return key
+
+    def get(self, key):
+        import gridfs
+
+        try:
+            return self.bucket.open_download_stream_by_name(key).read()
+        except gridfs.errors.NoFile:
+            return None
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, fanned out by the first two hex digits of the key."""
+
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data, content_type="application/octet-stream"):
+        key = blob_key(data)
+        path = self._path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return key
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+BLOB_STORES = {
+    "gridfs": GridFSBlobStore,
+    "local": LocalBlobStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Shared store selected by BLOB_STORE, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if BLOB_STORE not in BLOB_STORES:
+                raise ValueError(f"Unknown BLOB_STORE '{BLOB_STORE}', expected one of {sorted(BLOB_STORES)}")
+            _store = BLOB_STORES[BLOB_STORE]()
+        return _store
+
+
+# ─── Images ─────────────────────────────────────────────────────────────────────
+
+def make_thumbnail(data: bytes, max_px: int = THUMBNAIL_PX) -> tuple[bytes, int, int]:
+    """JPEG thumbnail no larger than max_px on its long side; returns (jpeg bytes, width, height) of the original."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    size = image.size
+    image.thumbnail((max_px, max_px))
+    out = io.BytesIO()
+    image.convert("RGB").save(out, format="JPEG", quality=80, optimize=True)
+    return out.getvalue(), *size
+
+
+def store_image(data: bytes, content_type: str = "image/png", store: BlobStore | None = None) -> dict:
+    """
+    Store an uploaded image and its thumbnail; returns the reference a lecture
+    document keeps: {"image", "thumbnail", "content_type", "bytes", "width", "height"}.
+    """
+    store = store or get_blob_store()
+    thumbnail, width, height = make_thumbnail(data)
+    return {
+        "image": store.put(data, content_type),
+        "thumbnail": store.put(thumbnail, "image/jpeg"),
+        "content_type": content_type,
+        "bytes": len(data),
+        "width": width,
+        "height": height,
+    }
@@ -0,0 +1,111 @@
+# http_client.py
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.3"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = {}  # event loop -> httpx.AsyncClient
+
+
+def session() -> requests.Session:
+    """
+    Process-wide keep-alive session: connections to each host are pooled and
+    reused, so only the first request pays the TCP + TLS handshake. 429/5xx
+    responses and connection errors are retried with exponential backoff
+    (Retry-After is honoured), POST included.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_MAX_RETRIES,
+                backoff_factor=HTTP_BACKOFF_SECONDS,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based): Retry-After if given, else jittered exponential."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return HTTP_BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def with_retries(fn, *args, retry_on=(Exception,), retries: int = HTTP_MAX_RETRIES, **kwargs):
+    """Call fn(*args, **kwargs), retrying with backoff on `retry_on` exceptions (for clients we don't own)."""
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except retry_on:
+            if attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+# ─── Async ──────────────────────────────────────────────────────────────────────
+
+def async_client() -> httpx.AsyncClient:
+    """
+    Pooled keep-alive httpx.AsyncClient for the running event loop
+    (httpx clients can't be shared across loops, so there is one per loop).
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        # Streamed TTS holds its connection until playback finishes, so only idle connections are capped;
+        # callers bound concurrency themselves (e.g. the session manager's API semaphore)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=HTTP_POOL_SIZE),
+            timeout=HTTP_TIMEOUT_SECONDS,
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_MAX_RETRIES)  # connection errors only
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def async_request(method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    async_client().request() with the same 429/5xx retry policy as the sync session.
+    With stream=True the body is not read: iterate it and aclose() the response.
+    """
+    client = async_client()
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        resp = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        if resp.status_code not in RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+            return resp
+        await resp.aclose()
+        await asyncio.sleep(backoff_delay(attempt, resp.headers.get("Retry-After")))
+
+
+async def close_async_client() -> None:
+    """Close the current loop's client (call before the loop shuts down)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
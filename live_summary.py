@@ -0,0 +1,136 @@
+# live_summary.py
+
+import asyncio
+import os
+import time
+from collections import deque
+
+from groq import AsyncGroq
+
+from study_artifacts import (PROMPTS, STUDY_CHUNK_TOKENS, STUDY_MODEL, estimate_tokens, fold_text, part_cards,
+                             text_hash)
+
+LIVE_SUMMARY = os.getenv("LIVE_SUMMARY", "1") == "1"
+LIVE_SUMMARY_SECONDS = float(os.getenv("LIVE_SUMMARY_SECONDS", "60"))   # shortest gap between two folds
+LIVE_SUMMARY_MIN_LINES = int(os.getenv("LIVE_SUMMARY_MIN_LINES", "8"))   # new lines needed before folding
+LIVE_SUMMARY_TPM = int(os.getenv("LIVE_SUMMARY_TPM", "20000"))           # prompt tokens it may send per minute
+LIVE_CARDS_MAX = 30                                                      # candidate flashcards kept
+
+
+class LiveSummarizer:
+    """
+    Background stage of a running session. Every `interval` seconds, once at
+    least `min_lines` new transcript lines are committed, it folds them into a
+    running summary and mines them for candidate flashcards (two concurrent LLM
+    calls). A fold takes at most `chunk_tokens` of new transcript, so a backlog
+    is worked off over several folds; prompt tokens are capped by a sliding
+    one-minute budget, and a fold that would exceed it waits.
+
+    After each fold `on_update(state)` runs in a worker thread with what to
+    persist (the lecture's artifacts.live, from which StudyArtifacts finishes
+    the summary and flashcards once the lecture is saved). Cancelling the task
+    that runs run() abandons the request in flight; the state keeps the last
+    completed fold.
+    """
+
+    def __init__(self,
+                 model: str = STUDY_MODEL,
+                 interval: float = LIVE_SUMMARY_SECONDS,
+                 min_lines: int = LIVE_SUMMARY_MIN_LINES,
+                 tokens_per_minute: int = LIVE_SUMMARY_TPM,
+                 chunk_tokens: int = STUDY_CHUNK_TOKENS,
+                 on_update=None,
+                 client=None):
+        """`client` is an AsyncGroq-compatible client; by default one is opened per run() on its loop."""
+        self.model = model
+        self.interval = interval
+        self.min_lines = min_lines
+        self.tokens_per_minute = tokens_per_minute
+        self.chunk_tokens = chunk_tokens
+        self.on_update = on_update
+        self.client = client
+
+        self.summary = ""
+        self.flashcards = []   # [question, answer] candidates, newest last
+        self.lines_done = 0    # transcript lines folded in so far
+        self.usage = {"folds": 0, "failures": 0, "throttled": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._spent = deque()  # (monotonic time, estimated prompt tokens) of the last minute
+
+    async def run(self, lines: list) -> None:
+        """Fold `lines` (a list the pipeline appends to) until cancelled."""
+        client = self.client or AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if len(lines) - self.lines_done < self.min_lines:
+                    continue
+                try:
+                    await self.fold(client, lines)
+                except Exception as e:
+                    self.usage["failures"] += 1
+                    print(f"[WARN] Live summary fold failed, will retry: {e}")
+        finally:
+            if self.client is None:
+                await client.close()
+
+    async def fold(self, client, lines: list) -> None:
+        """Fold the next up-to-`chunk_tokens` of unseen lines into the summary and candidate cards."""
+        end, tokens = self.lines_done, 0
+        while end < len(lines) and (end == self.lines_done or tokens + estimate_tokens(lines[end]) <= self.chunk_tokens):
+            tokens += estimate_tokens(lines[end])
+            end += 1
+        new_text = "\n".join(lines[self.lines_done:end])
+        kind, text = ("summary_fold", fold_text(self.summary, new_text)) if self.summary else ("summary", new_text)
+        await self._reserve(estimate_tokens(text) + tokens)
+
+        summary, cards = await asyncio.gather(
+            self._complete(client, kind, text),
+            self._complete(client, "flashcards_part", new_text)
+        )
+        self.summary = summary.strip()
+        self.flashcards = (self.flashcards + part_cards(cards))[-LIVE_CARDS_MAX:]
+        self.lines_done = end
+        self.usage["folds"] += 1
+        if self.on_update is not None:
+            try:
+                await asyncio.to_thread(self.on_update, self.state(lines))
+            except Exception as e:
+                print(f"[WARN] Could not persist live summary: {e}")
+
+    def state(self, lines: list) -> dict:
+        """What StudyArtifacts needs to finish from here: the lines covered (count and hash) and the results."""
+        return {
+            "lines": self.lines_done,
+            "text": text_hash("\n".join(lines[:self.lines_done])),
+            "model": self.model,
+            "prompt": PROMPTS["summary_fold"][0],
+            "summary": self.summary,
+            "flashcards": self.flashcards,
+        }
+
+    async def _reserve(self, tokens):
+        while True:
+            now = time.monotonic()
+            while self._spent and now - self._spent[0][0] >= 60:
+                self._spent.popleft()
+            if not self._spent or sum(t for _, t in self._spent) + tokens <= self.tokens_per_minute:
+                break
+            self.usage["throttled"] += 1
+            await asyncio.sleep(60 - (now - self._spent[0][0]))
+        self._spent.append((now, tokens))
+
+    async def _complete(self, client, kind, text):
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": PROMPTS[kind][1].format(text=text)}]
+        )
+        if response.usage is not None:
+            self.usage["prompt_tokens"] += response.usage.prompt_tokens
+            self.usage["completion_tokens"] += response.usage.completion_tokens
+        return response.choices[0].message.content
+
+    def print_stats(self, name: str = "") -> None:
+        u = self.usage
+        print(f"[INFO] {name}: live summary covers {self.lines_done} lines in {u['folds']} folds "
+              f"({u['failures']} failed, {u['throttled']} throttled), "
+              f"{u['prompt_tokens']} prompt + {u['completion_tokens']} completion tokens")
@@ -1,25 +1,22 @@
 import streamlit as st
 st.set_page_config(page_title="Live Assistant 🎙️")
-import threading
 import time
 import re
+import uuid
 from assistant_backend import (
     start_assistant,
     stop_assistant,
-    current_transcript_lines,
+    set_voice,
+    set_glossary,
+    get_session,
     save_transcript_to_mongo,
     list_audio_devices,
-    summarize_image,
-    image_summaries,
-    uploaded_images
+    add_slide
 )
-from groq import Groq
+from study_artifacts import get_study_artifacts
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-MODEL_NAME = "llama-3.3-70b-versatile"
 
 # Hero Section
 st.markdown("""
@@ -44,7 +41,20 @@ voice_option = st.sidebar.selectbox(
     ("Voice 1", "Voice 2", "Voice 3")
 )
 
+# Each browser session drives its own assistant session (mic, transcript, slides)
+if "session_name" not in st.session_state:
+    st.session_state["session_name"] = uuid.uuid4().hex
+session_name = st.session_state["session_name"]
+session = get_session(session_name)
+current_transcript_lines = session.transcript_lines
+
 st.session_state["chosen_voice"] = voice_option
+set_voice(voice_option, session_name)
+
+glossary = st.sidebar.text_area("Lecture Glossary 📚", placeholder="Course terms, comma separated",
+                                help="Helps the transcriber spell names and jargon consistently.")
+set_glossary(glossary, session_name)
+
 st.session_state["input_device"] = input_device
 st.session_state["output_device"] = output_device
 
@@ -59,18 +69,25 @@ if "assistant_running" not in st.session_state:
     st.session_state["assistant_running"] = False
 
 if start_button and not st.session_state["assistant_running"]:
-    threading.Thread(target=start_assistant, args=(input_device, output_device), daemon=True).start()
+    start_assistant(input_device, output_device, session_name)
     st.session_state["assistant_running"] = True
     st.success("🟢 Assistant is now running!")
 
 if stop_button and st.session_state["assistant_running"]:
-    stop_assistant()
+    stop_assistant(session_name)
     st.session_state["assistant_running"] = False
     st.warning("🔴 Assistant has been stopped.")
 
 # Live Transcription
 st.header("📄 Live Transcription")
 transcript_display = st.empty()
+summary_display = st.empty()
+
+def show_live_summary():
+    # Folded in by the session's LiveSummarizer every minute or so
+    summarizer = session.summarizer
+    if summarizer is not None and summarizer.summary:
+        summary_display.markdown(f"#### 📝 Summary so far ({summarizer.lines_done} lines)\n\n{summarizer.summary}")
 
 N_BRIGHT = 2
 if st.session_state["assistant_running"]:
@@ -92,9 +109,11 @@ if st.session_state["assistant_running"]:
                 html_output += f'<span style="background-color: #ffeb3b; color: black; font-weight: bold;">{sentences[-1]} </span>'
 
         transcript_display.markdown(f'<div style="height: 300px; overflow-y: auto;">{html_output}</div>', unsafe_allow_html=True)
+        show_live_summary()
         time.sleep(1)
 else:
     transcript_display.markdown("🔴 Assistant not running.")
+    show_live_summary()
 
 st.divider()
 
@@ -110,9 +129,7 @@ if uploaded_files:
     for uploaded_file in uploaded_files:
         if st.button(f"Summarize {uploaded_file.name}"):
             with st.spinner(f"Analyzing {uploaded_file.name}..."):
-                description = summarize_image(uploaded_file)
-                image_summaries.append(description)
-                uploaded_images.append(uploaded_file)
+                add_slide(uploaded_file, session_name)
             st.success(f"✅ {uploaded_file.name} summarized!")
 
 st.divider()
@@ -122,12 +139,8 @@ st.header("💾 Save Transcript")
 
 def generate_title_from_transcript(text):
     try:
-        excerpt = text[:300]
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": f"Generate a short academic title from this excerpt:\n\n{excerpt}"}]
-        )
-        return response.choices[0].message.content.strip()
+        # Cached on the live lecture document, so asking again for the same opening is free
+        return get_study_artifacts().title(session.lecture_id, text)
     except Exception as e:
         print(f"[ERROR] Title generation failed: {e}")
         return "Untitled Lecture"
@@ -149,7 +162,8 @@ if current_transcript_lines:
         save_success = save_transcript_to_mongo(
             full_text,
             chosen_voice=st.session_state.get("chosen_voice", "Unknown"),
-            lecture_name=lecture_name
+            lecture_name=lecture_name,
+            session_name=session_name
         )
         if save_success:
             st.success("✅ Saved to MongoDB!")
@@ -3,59 +3,45 @@ from dotenv import load_dotenv
 import pymongo
 import os
 import sys
-import json
-import re
 from bson import ObjectId
-from groq import Groq
+from transcript_store import get_transcript_store
+from blob_store import get_blob_store
+from study_artifacts import get_study_artifacts
+from search_index import SEARCH_SEMANTIC, get_search_index
 
 # Load environment
 load_dotenv()
-api_key = os.getenv("GROQ_API_KEY")
 MONGO_CONNECTION = os.getenv("MONGO_CONNECTION")
 
-# Configure Groq
-groq_client = Groq(api_key=api_key)
-MODEL_NAME = "llama-3.3-70b-versatile"
-
-# MongoDB setup
+# MongoDB setup: lecture metadata in `transcripts`, their text in `transcript_segments`
 try:
-    client = pymongo.MongoClient(MONGO_CONNECTION)
-    db = client["materials"]
-    collection = db["transcripts"]
+    store = get_transcript_store()
+    collection = store.lectures
 except pymongo.errors.ConfigurationError:
     print("Invalid Mongo URI.")
     sys.exit(1)
 
-# --- Helper: Generate Flashcards from Transcript ---
-def generate_flashcards(transcript):
-    response = groq_client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[
-            {"role": "user", "content": f"Create 5 flashcards (Q&A format only) from this lecture in JSON. Each card must have 'Q' and 'A' keys:\n\n{transcript}"}
-        ]
-    )
-    cleaned = re.sub(r"```(\w+)?\n?", "", response.choices[0].message.content).strip()
-    flashcards_json = json.loads(cleaned)
-    return [(card["Q"].strip(), card["A"].strip()) for card in flashcards_json]
-
-# --- Helper: Summarize Lecture Transcript ---
-def summarize_lecture(transcript):
-    response = groq_client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[
-            {"role": "user", "content": f"Summarize this lecture in 500 words using Markdown bullet points. List 3 key terms and 3 key learnings:\n\n{transcript}"}
-        ]
-    )
-    return response.choices[0].message.content
+# Summaries, flashcards and titles are cached on the lecture document (see study_artifacts.py)
+artifacts = get_study_artifacts()
 
 # --- Flashcard Viewer ---
-def flashcard_viewer(transcript):
-    if st.button("🔮 Generate Flashcards"):
+def flashcard_viewer(lecture_id, transcript):
+    def show(flashcards):
+        st.session_state['flashcards'] = flashcards
+        st.session_state['flashcards_lecture'] = lecture_id
+        st.session_state['index'] = 0
+        st.session_state['show_answer'] = False
+
+    if st.session_state.get('flashcards_lecture') != lecture_id:
+        cached = artifacts.cached(lecture_id, "flashcards", transcript)
+        if cached is not None:
+            show(cached)
+        else:
+            st.session_state.pop('flashcards', None)
+
+    if 'flashcards' not in st.session_state and st.button("🔮 Generate Flashcards"):
         with st.spinner('Creating flashcards...'):
-            flashcards = generate_flashcards(transcript)
-            st.session_state['flashcards'] = flashcards
-            st.session_state['index'] = 0
-            st.session_state['show_answer'] = False
+            show(artifacts.flashcards(lecture_id, transcript))
 
     if 'flashcards' in st.session_state:
         flashcards = st.session_state['flashcards']
@@ -82,24 +68,45 @@ def flashcard_viewer(transcript):
                     st.session_state['index'] = (index + 1) % len(flashcards)
                     st.session_state['show_answer'] = False
 
+# --- Lecture Card ---
+def lecture_card(item):
+    with st.container():
+        st.markdown(f"""
+            <div style="border: 1px solid #333; padding: 20px; border-radius: 16px; margin-bottom: 20px; background-color: #1a1d26; transition: background-color 0.3s;">
+                <h3>📖 {item['name']}{" 🔴" if item.get("status") == "live" else ""}</h3>
+                <p><strong>🕒 {item['timestamp']}</strong></p>
+                <div style="overflow: hidden; text-overflow: ellipsis;">
+                    <p>{item.get('preview') or store.preview(item)}...</p>
+                </div>
+                <a href="?page=lecture&id={item['_id']}&tab=overview" style="text-decoration: none; color: #636efa;">🔗 View Details</a>
+            </div>
+        """, unsafe_allow_html=True)
+
 # --- Show All Lectures (Main Page) ---
 def show_all_lectures():
     st.title("📚 Lecture Library")
 
-    items = collection.find().sort("timestamp", -1)
-
-    for item in items:
-        with st.container():
-            st.markdown(f"""
-                <div style="border: 1px solid #333; padding: 20px; border-radius: 16px; margin-bottom: 20px; background-color: #1a1d26; transition: background-color 0.3s;">
-                    <h3>📖 {item['name']}</h3>
-                    <p><strong>🕒 {item['timestamp']}</strong></p>
-                    <div style="overflow: hidden; text-overflow: ellipsis;">
-                        <p>{item['transcript'][:150]}...</p>
-                    </div>
-                    <a href="?page=lecture&id={item['_id']}&tab=overview" style="text-decoration: none; color: #636efa;">🔗 View Details</a>
-                </div>
-            """, unsafe_allow_html=True)
+    query = st.text_input("🔍 Search lectures", placeholder="Topic, term or slide content")
+    semantic = SEARCH_SEMANTIC and st.checkbox("Search by meaning", help="Find lectures about the topic even without the exact words.")
+    if query.strip():
+        results = get_search_index().search(query, semantic=semantic)
+        st.caption(f"{len(results)} matching lectures")
+        for item in results:
+            lecture_card(item)
+        return
+
+    # Loaded pages live in session_state, so reruns (e.g. a button click) don't query again
+    refresh = st.button("🔄 Refresh")
+    if refresh or "library_items" not in st.session_state:
+        st.session_state["library_items"], st.session_state["library_cursor"] = store.list_lectures()
+
+    for item in st.session_state["library_items"]:
+        lecture_card(item)
+
+    if st.session_state["library_cursor"] is not None and st.button("⬇️ Load more"):
+        items, st.session_state["library_cursor"] = store.list_lectures(after=st.session_state["library_cursor"])
+        st.session_state["library_items"] += items
+        st.rerun()
 
 # --- Show Individual Lecture (Detail View) ---
 def show_lecture_detail():
@@ -126,9 +133,32 @@ def show_lecture_detail():
         if tab == "📖 Full Transcript":
             st.subheader("📝 Full Transcript")
             st.write(f"**🕒 Time:** {item['timestamp']}")
-            st.write(item['transcript'])
+            if item.get("status") == "live":
+                st.info("🔴 Still recording (or not saved yet) — showing what has been persisted so far.")
+            # Stream the transcript a paragraph at a time instead of loading it whole
+            paragraph = []
+            for line in store.iter_segments(item):
+                paragraph.append(line)
+                if len(paragraph) == 20:
+                    st.write(" ".join(paragraph))
+                    paragraph = []
+            if paragraph:
+                st.write(" ".join(paragraph))
+
+            if item.get('images'):
+                st.divider()
+                st.subheader("🖼️ Uploaded Lecture Images")
+                # Thumbnails by default; full-size slides are fetched from the blob store only on request
+                full_size = st.checkbox("Show full-size images")
+                blobs = get_blob_store()
+                for idx, (ref, summary) in enumerate(zip(item['images'], item.get('image_summaries', [])), start=1):
+                    # ref is None when the image could not be stored; its summary was kept
+                    data = blobs.get(ref['image'] if full_size else ref['thumbnail']) if ref else None
+                    if data is not None:
+                        st.image(data, caption=f"Lecture Image {idx}", use_column_width=full_size)
+                    st.markdown(f"**Summary {idx}:** {summary}")
 
-            if 'uploaded_images_base64' in item and item['uploaded_images_base64']:
+            elif 'uploaded_images_base64' in item and item['uploaded_images_base64']:
                 st.divider()
                 st.subheader("🖼️ Uploaded Lecture Images")
                 for idx, (img_b64, summary) in enumerate(zip(item['uploaded_images_base64'], item.get('image_summaries', [])), start=1):
@@ -137,11 +167,16 @@ def show_lecture_detail():
 
         elif tab == "🎴 Flashcards":
             st.subheader(f"🎴 Flashcards")
-            flashcard_viewer(item['transcript'])
+            flashcard_viewer(item['_id'], store.transcript(item))
 
         elif tab == "📝 Summary":
             st.subheader("📝 Lecture Summary")
-            st.markdown(summarize_lecture(item['transcript']))
+            transcript = store.transcript(item)
+            summary = artifacts.cached(item['_id'], "summary", transcript)
+            if summary is None:
+                with st.spinner('Summarizing lecture...'):
+                    summary = artifacts.summary(item['_id'], transcript)
+            st.markdown(summary)
 
     else:
         st.error("No lecture ID provided.")
@@ -0,0 +1,87 @@
+# prompt_context.py
+
+import os
+import re
+import threading
+from collections import deque
+
+# Whisper reads at most 224 prompt tokens; ~1.3 tokens per English word leaves headroom at 120 words
+WHISPER_PROMPT_WORDS = int(os.getenv("WHISPER_PROMPT_WORDS", "120"))
+WHISPER_GLOSSARY = os.getenv("WHISPER_GLOSSARY", "")  # comma-separated terms, e.g. "eigenvalue, Lagrangian"
+
+
+def parse_glossary(text: str) -> list:
+    """'a, b\\nc' -> ['a', 'b', 'c']"""
+    return [t.strip() for t in re.split(r"[,\n]", text or "") if t.strip()]
+
+
+def glossary_terms(glossary) -> list:
+    """Terms from a list or comma/newline-separated text; None or blank text means WHISPER_GLOSSARY."""
+    if glossary is None or (isinstance(glossary, str) and not glossary.strip()):
+        return parse_glossary(WHISPER_GLOSSARY)
+    return parse_glossary(glossary) if isinstance(glossary, str) else list(glossary)
+
+
+def split_prompt(prompt: str) -> tuple:
+    """PromptContext.prompt() text -> (glossary terms, transcript tail)."""
+    match = re.match(r"Glossary: (.*?)\.(?: (.*))?$", prompt or "", re.S)
+    if match is None:
+        return [], prompt or ""
+    return parse_glossary(match.group(1)), match.group(2) or ""
+
+
+def merge_prompts(prompts: list, max_words: int = WHISPER_PROMPT_WORDS) -> str:
+    """
+    One prompt for pieces of several lectures sent in one request: the glossary
+    terms of all of them (first seen first), then the first non-empty
+    transcript tail, trimmed so the whole stays within `max_words`.
+    """
+    terms, tail = [], ""
+    for prompt in prompts:
+        glossary, context = split_prompt(prompt)
+        terms += [t for t in glossary if t not in terms]
+        tail = tail or context
+    glossary = ", ".join(terms)
+    budget = max_words - len(glossary.split())
+    words = tail.split()[-budget:] if budget > 0 else []
+    if glossary and words:
+        return f"Glossary: {glossary}. {' '.join(words)}"
+    return f"Glossary: {glossary}." if glossary else " ".join(words)
+
+
+class PromptContext:
+    """
+    Rolling Whisper prompt for one lecture: the glossary terms, then the tail of
+    the transcript committed so far, trimmed to `max_words`. Feeding it as the
+    prompt lets Whisper continue a sentence cut at a segment boundary and spell
+    course vocabulary consistently, so segments can be shorter.
+    """
+
+    def __init__(self, glossary=None, max_words: int = WHISPER_PROMPT_WORDS):
+        self.max_words = max_words
+        self.glossary = glossary_terms(glossary)
+        self._words = deque(maxlen=max_words)
+        self._lock = threading.Lock()
+
+    def set_glossary(self, terms) -> None:
+        with self._lock:
+            self.glossary = glossary_terms(terms)
+
+    def commit(self, text: str) -> None:
+        """Append a finished segment's transcript."""
+        if text:
+            with self._lock:
+                self._words.extend(text.split())
+
+    def prompt(self) -> str:
+        with self._lock:
+            glossary = ", ".join(self.glossary)
+            budget = self.max_words - len(glossary.split())
+            tail = list(self._words)[-budget:] if budget > 0 else []
+        if glossary and tail:
+            return f"Glossary: {glossary}. {' '.join(tail)}"
+        return f"Glossary: {glossary}." if glossary else " ".join(tail)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._words.clear()
@@ -0,0 +1,97 @@
+# reorder.py
+
+import threading
+import time
+
+
+class ReorderBuffer:
+    """
+    Releases (seq, item) pairs strictly in sequence order.
+
+    Producers call put(seq, item) in any order, or skip(seq) for a sequence id
+    that will never produce an item (e.g. no transcript). If the next expected
+    id is still missing `timeout` seconds after a later one arrived, it is given
+    up on so one lost segment can't stall playback forever.
+    """
+
+    def __init__(self, timeout: float = 8.0, first_seq: int = 0):
+        self.timeout = timeout
+        self.next_seq = first_seq
+        self._items = {}        # seq -> item, or _SKIPPED
+        self._gap_since = None  # when we started waiting on next_seq with later items present
+        self._cond = threading.Condition()
+        self.released = 0
+        self.timed_out = 0
+
+    def put(self, seq: int, item) -> None:
+        with self._cond:
+            if seq < self.next_seq:
+                print(f"[WARN] Segment {seq} arrived after it was skipped, dropping it.")
+                return
+            self._items[seq] = item
+            self._cond.notify_all()
+
+    def skip(self, seq: int) -> None:
+        self.put(seq, _SKIPPED)
+
+    def pop_ready(self, now: float | None = None) -> list:
+        """Non-blocking: return every (seq, item) that can be released right now, in order."""
+        now = time.time() if now is None else now
+        ready = []
+        with self._cond:
+            while (entry := self._pop_one(now)) is not None:
+                ready.append(entry)
+        return ready
+
+    def _pop_one(self, now):
+        while True:
+            if self.next_seq in self._items:
+                seq, item = self.next_seq, self._items.pop(self.next_seq)
+                self.next_seq += 1
+                self._gap_since = None
+                if item is _SKIPPED:
+                    continue
+                self.released += 1
+                return seq, item
+
+            if not self._items:
+                return None
+
+            # Something later is waiting on a gap: start (or check) the gap clock
+            if self._gap_since is None:
+                self._gap_since = now
+            if now - self._gap_since < self.timeout:
+                return None
+
+            lowest = min(self._items)
+            print(f"[WARN] Segments {self.next_seq}..{lowest - 1} never arrived after "
+                  f"{self.timeout:.1f}s, skipping.")
+            self.timed_out += lowest - self.next_seq
+            self.next_seq = lowest
+            self._gap_since = None
+
+    def get(self, timeout: float | None = None):
+        """Block until the next in-order (seq, item) is available. Raises TimeoutError after `timeout`."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                entry = self._pop_one(now)
+                if entry is not None:
+                    return entry
+
+                waits = []
+                if deadline is not None:
+                    if now >= deadline:
+                        raise TimeoutError
+                    waits.append(deadline - now)
+                if self._gap_since is not None:
+                    waits.append(self._gap_since + self.timeout - now)
+                self._cond.wait(timeout=max(min(waits), 0.01) if waits else None)
+
+    def __len__(self):
+        with self._cond:
+            return sum(1 for item in self._items.values() if item is not _SKIPPED)
+
+
+_SKIPPED = object()
@@ -0,0 +1,451 @@
+# runtime.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_capture import capture_audio
+from audio_playback import PcmOutput, aplay_tts
+from http_client import close_async_client
+from reorder import ReorderBuffer
+from prompt_context import PromptContext
+from segment_control import ADAPTIVE_SEGMENTS, SegmentLengthController
+from segmentation import MIN_SEGMENT_SECONDS, URGENT_FLUSH_SECONDS, Segmenter
+from tracing import Tracer
+from vad import ADAPTIVE_SILENCE, NoiseFloorTracker
+from transcription import get_transcriber
+from translation import translate_text
+from tts_generation import asynthesize, TTS_SAMPLE_RATE
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4096
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "merge")
+
+
+class AssistantRuntime:
+    """
+    The live pipeline as asyncio stages joined by bounded queues:
+
+        capture → audio_q → segment → segment_q → N workers → reorder → playback
+                                                 (transcribe → translate → TTS)
+
+    The blocking mic read runs in an executor; Whisper and ElevenLabs calls use
+    async clients, so several segments can be in flight on one thread. Playback
+    is strictly in segment order (see ReorderBuffer).
+
+    When segment_q is full, `overflow` applies: "block" stalls segmentation,
+    "drop_oldest" discards the oldest queued segment, "merge" (default) holds
+    new segments back and concatenates them until a slot frees up.
+
+    Use `await run()` inside an event loop, or start()/stop() to run it on a
+    background thread. If the audio source runs out, the pipeline drains
+    (every buffered segment is transcribed and played) and run() returns.
+    """
+
+    def __init__(self,
+                 audio_source=None,
+                 input_device_index: int | None = None,
+                 input_language: str = "auto",
+                 target_language: str = "en",
+                 voice_id_fn=None,
+                 on_transcript=None,
+                 player=None,
+                 silence_thresh: float = -40,
+                 adaptive_silence: bool = ADAPTIVE_SILENCE,
+                 min_silence_ms: int = 700,
+                 urgent_flush_seconds: float = URGENT_FLUSH_SECONDS,
+                 min_segment_seconds: float = MIN_SEGMENT_SECONDS,
+                 adaptive_segments: bool = ADAPTIVE_SEGMENTS,
+                 workers: int = 2,
+                 max_pending: int = 4,
+                 overflow: str = "merge",
+                 reorder_timeout: float = 8.0,
+                 transcriber=None,
+                 translator=None,
+                 blocking_pool=None,
+                 api_slots: asyncio.Semaphore | None = None,
+                 tracer: Tracer | None = None,
+                 glossary=None,
+                 close_clients: bool = True,
+                 name: str = "assistant"):
+        """
+        audio_source:  callable returning an iterator of 16-bit mono PCM chunks
+                       (default: the mic at `input_device_index` via capture_audio)
+        voice_id_fn:   callable returning the ElevenLabs voice id, read per segment
+        on_transcript: callable(seq, text) for every transcribed segment
+        translator:    blocking callable(text, target_language) (default: translate_text)
+        player:        async callable(tts_data, trace) (default: aplay_tts to the speakers, through
+                       one output stream opened when run() starts and closed when it ends);
+                       may mark "decode" / "playback_start" / "playback_end" on the trace
+        blocking_pool / api_slots: executor for blocking calls and a semaphore
+                       bounding in-flight API requests, shareable across runtimes
+        tracer:        collects per-segment SegmentTraces (default: Tracer on the TRACE_SINK sink)
+        adaptive_silence: track the noise floor of the captured audio and move the silence
+                       threshold with it, starting from `silence_thresh` (see NoiseFloorTracker)
+        adaptive_segments: let a SegmentLengthController move urgent_flush_seconds (starting
+                       from the value given) with the observed backend latency and queue depth
+        glossary:      course terms for the Whisper prompt (default: WHISPER_GLOSSARY); the prompt
+                       also carries the tail of this runtime's transcript (see PromptContext)
+        close_clients: close the transcriber's and HTTP async clients when run() ends; False when
+                       they are shared with other runtimes on the same loop (see sessions.py)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+
+        self.audio_source = audio_source or (lambda: capture_audio(
+            chunk=CHUNK_SIZE, rate=SAMPLE_RATE, input_device_index=input_device_index))
+        self.input_language = input_language
+        self.target_language = target_language
+        self.voice_id_fn = voice_id_fn or (lambda: None)
+        self.on_transcript = on_transcript
+        self.output = None if player else PcmOutput(sample_rate=TTS_SAMPLE_RATE)
+        self.player = player or (lambda tts, trace: aplay_tts(tts, trace=trace, output=self.output))
+        self.workers = workers
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.reorder_timeout = reorder_timeout
+        self.transcriber = transcriber or get_transcriber()
+        self.translator = translator or translate_text
+        self.blocking_pool = blocking_pool
+        self.api_slots = api_slots
+        self.name = name
+        self.tracer = tracer or Tracer(pipeline=name)
+        self.close_clients = close_clients
+        self.context = PromptContext(glossary)
+        self.controller = SegmentLengthController(workers=workers, initial_seconds=urgent_flush_seconds) \
+            if adaptive_segments else None
+        self._min_segment_seconds = min_segment_seconds
+
+        self.segmenter = Segmenter(
+            sample_rate=SAMPLE_RATE,
+            silence_thresh=silence_thresh,
+            min_silence_ms=min_silence_ms,
+            urgent_flush_seconds=urgent_flush_seconds,
+            min_segment_seconds=min_segment_seconds,
+            noise_floor=NoiseFloorTracker(initial_thresh=silence_thresh) if adaptive_silence else None
+        )
+        self._logged_thresh = silence_thresh
+        if self.controller is not None:
+            self._set_segment_length(self.controller.target_seconds)
+
+        self.counts = {"chunks": 0, "chunks_dropped": 0, "segments": 0, "segments_dropped": 0,
+                       "segments_merged": 0, "played": 0}
+
+        self._thread = None
+        self._loop = None
+        self._stopping = None
+        self._stop_requested = threading.Event()
+
+    # ─── Lifecycle ──────────────────────────────────────────────────────────────
+
+    async def run(self) -> None:
+        """Run until stop() is called or the audio source is exhausted and drained."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self._stop_requested.is_set():
+            self._stopping.set()
+
+        self.audio_q = asyncio.Queue(maxsize=64)
+        self.segment_q = asyncio.Queue(maxsize=self.max_pending)
+        self.playback = ReorderBuffer(timeout=self.reorder_timeout)
+        self._playback_ready = asyncio.Event()
+        self._held = None
+        self._workers_left = self.workers
+        if self.output is not None:
+            try:
+                await asyncio.to_thread(self.output.open)
+            except Exception as e:
+                print(f"[WARN] {self.name}: could not open the audio output, will retry per segment: {e}")
+
+        capture = asyncio.create_task(self._capture_stage(), name=f"{self.name}-capture")
+        stages = [
+            asyncio.create_task(self._segment_stage(), name=f"{self.name}-segment"),
+            *(asyncio.create_task(self._worker(i), name=f"{self.name}-worker-{i}") for i in range(self.workers)),
+        ]
+        playback = asyncio.create_task(self._playback_stage(), name=f"{self.name}-playback")
+        stop_wait = asyncio.create_task(self._stopping.wait())
+
+        try:
+            await asyncio.wait([stop_wait, playback], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._stopping.set()
+            # The capture stage notices the stop flag after at most one chunk
+            await asyncio.wait([capture], timeout=2)
+            for task in [capture, *stages, playback, stop_wait]:
+                task.cancel()
+            await asyncio.gather(capture, *stages, playback, stop_wait, return_exceptions=True)
+            if self.output is not None:
+                await asyncio.to_thread(self.output.close)
+            if self.close_clients:
+                await self.transcriber.aclose()
+                await close_async_client()
+            self.tracer.export()
+
+    def start(self) -> None:
+        """Run the pipeline on its own event loop in a background thread."""
+        self._stop_requested.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True,
+                                        name=f"{self.name}-runtime")
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop capture, cancel in-flight work and wait for the background thread to exit."""
+        self._stop_requested.set()
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ─── Stages ─────────────────────────────────────────────────────────────────
+
+    async def _capture_stage(self):
+        loop = asyncio.get_running_loop()
+        source = iter(self.audio_source())
+        # The mic read blocks for a whole chunk, so it gets a thread of its own rather than one from blocking_pool
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-capture")
+        try:
+            while not self._stopping.is_set():
+                chunk = await loop.run_in_executor(reader, next, source, None)
+                if chunk is None:
+                    break
+                self.counts["chunks"] += 1
+                if self.audio_q.full():
+                    # Never block the mic: shed the oldest chunk instead
+                    self.audio_q.get_nowait()
+                    self.counts["chunks_dropped"] += 1
+                self.audio_q.put_nowait((chunk, time.time()))
+        finally:
+            if hasattr(source, "close"):
+                try:
+                    source.close()
+                except ValueError:
+                    pass  # still executing in the executor thread after a cancel
+            reader.shutdown(wait=False)
+            if self.audio_q.full():
+                self.audio_q.get_nowait()
+            self.audio_q.put_nowait(None)
+
+    async def _segment_stage(self):
+        while True:
+            item = await self.audio_q.get()
+            if item is None:
+                await self._submit(self.segmenter.flush())
+                if self._held is not None:
+                    await self.segment_q.put(self._held)
+                for _ in range(self.workers):
+                    await self.segment_q.put(None)
+                return
+
+            chunk, timestamp = item
+            t0 = time.perf_counter()
+            segment = self.segmenter.feed(chunk, timestamp, now=time.time())
+            self.tracer.observe("vad", time.perf_counter() - t0)
+            self._log_threshold()
+
+            if self._held is not None and not self.segment_q.full():
+                self.segment_q.put_nowait(self._held)
+                self._held = None
+            await self._submit(segment)
+
+    async def _submit(self, segment):
+        if segment is None:
+            return
+        seq, pcm, timestamps = segment
+        trace = self.tracer.start(seq, timestamps)
+        trace.mark("flush")
+        segment = (seq, pcm, timestamps, trace)
+        self.counts["segments"] += 1
+        print(f"[INFO] Flushing segment #{seq} ({len(pcm) / (SAMPLE_RATE * 2):.2f}s, "
+              f"{self.segmenter.buffered_seconds:.2f}s carried over)...")
+
+        if self.overflow == "block":
+            await self.segment_q.put(segment)
+        elif self._held is None and not self.segment_q.full():
+            self.segment_q.put_nowait(segment)
+        elif self.overflow == "merge":
+            if self._held is None:
+                self._held = segment
+            else:
+                held_seq, held_pcm, held_times, held_trace = self._held
+                if timestamps:
+                    held_trace.marks["capture_end"] = timestamps[-1]
+                self._held = (held_seq, held_pcm + pcm, held_times + timestamps, held_trace)
+                self.playback.skip(seq)
+                self.counts["segments_merged"] += 1
+                print(f"[WARN] Pipeline backed up, merged segment #{seq} into #{held_seq}")
+        else:
+            oldest = self.segment_q.get_nowait()
+            self.playback.skip(oldest[0])
+            self.counts["segments_dropped"] += 1
+            print(f"[WARN] Pipeline backed up, dropped segment #{oldest[0]}")
+            self.segment_q.put_nowait(segment)
+
+    async def _worker(self, index):
+        try:
+            while True:
+                segment = await self.segment_q.get()
+                if segment is None:
+                    return
+                seq, pcm, timestamps, trace = segment
+                try:
+                    tts_data = await self._process(seq, pcm, timestamps, trace)
+                except Exception as e:
+                    print(f"[ERROR] Processing segment #{seq} failed: {e}")
+                    tts_data = None
+                self._adapt_segment_length(trace)
+
+                if tts_data:
+                    self.playback.put(seq, (tts_data, trace))
+                else:
+                    self.playback.skip(seq)
+                    self.tracer.finish(trace)
+                self._playback_ready.set()
+        finally:
+            self._workers_left -= 1
+            self._playback_ready.set()
+
+    async def _process(self, seq, pcm, timestamps, trace):
+        """Transcribe → (translate) → TTS for one segment. Returns TTS audio (bytes or async iterator) or None."""
+        print(f"\n🛠️ Processing audio chunk #{seq}...")
+        if timestamps:
+            print(f"🕒 Current lag: {time.time() - timestamps[0]:.2f}s")
+
+        use_translate = self.target_language == "en" and self.input_language != "en"
+        async with self._api_slot():
+            trace.mark("upload")
+            raw_text = await self.transcriber.atranscribe(
+                pcm, sample_rate=SAMPLE_RATE, prompt=self.context.prompt(), language=self.input_language,
+                translate=use_translate)
+        trace.mark("transcript")
+
+        if not raw_text:
+            print("[WARN] No transcription text generated.")
+            return None
+        print(f"[Transcript] {raw_text}")
+        # Completion order, which with several workers can run a segment ahead; close enough for a prompt
+        self.context.commit(raw_text)
+        if self.on_transcript:
+            self.on_transcript(seq, raw_text)
+
+        text = raw_text
+        if self.target_language != "en":
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self.blocking_pool, self.translator, raw_text, self.target_language)
+            trace.mark("translation")
+            print(f"[Translated → {self.target_language}] {text}")
+
+        async with self._api_slot():
+            trace.mark("tts_request")
+            tts_data = await asynthesize(text, voice_id=self.voice_id_fn())
+        if not tts_data:
+            print("[WARN] No TTS data generated.")
+            return None
+        # For a stream, "first byte" is the response head; the body is timed as playback consumes it
+        trace.mark("tts_first_byte")
+        if isinstance(tts_data, (bytes, bytearray)):
+            trace.mark("tts_last_byte")
+            return tts_data
+        return _mark_exhausted(tts_data, trace)
+
+    async def _playback_stage(self):
+        while True:
+            ready = self.playback.pop_ready()
+            if not ready:
+                if self._workers_left == 0 and len(self.playback) == 0:
+                    return
+                self._playback_ready.clear()
+                try:
+                    # Wake up on new results, or in time to skip a segment that never arrives
+                    await asyncio.wait_for(self._playback_ready.wait(), timeout=min(self.reorder_timeout, 0.5))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for seq, (tts_data, trace) in ready:
+                started = time.time()
+                try:
+                    await self.player(tts_data, trace)
+                    self.counts["played"] += 1
+                except Exception as e:
+                    print(f"[ERROR] Playback of segment #{seq} failed: {e}")
+                # Fallbacks for players that don't mark the trace themselves
+                trace.mark("playback_start", started)
+                trace.mark("playback_end")
+                self.tracer.finish(trace)
+
+    def _log_threshold(self):
+        vad = self.segmenter.vad
+        if abs(vad.silence_thresh - self._logged_thresh) >= 3:
+            self._logged_thresh = vad.silence_thresh
+            print(f"[INFO] {self.name}: noise floor {vad.noise_floor.floor:.1f} dBFS → "
+                  f"silence threshold {vad.silence_thresh:.1f} dBFS")
+
+    # ─── Segment length ─────────────────────────────────────────────────────────
+
+    def _adapt_segment_length(self, trace):
+        """Feed one segment's service time (upload → first TTS byte, or → transcript) to the controller."""
+        if self.controller is None:
+            return
+        marks = trace.marks
+        end = marks.get("tts_first_byte", marks.get("transcript"))
+        if end is None or "upload" not in marks or "capture_start" not in marks:
+            return
+        # Results waiting for the speakers count too: shorter segments can't help a backed-up player
+        backlog = self.segment_q.qsize() + (self._held is not None) + len(self.playback)
+        target = self.controller.observe(end - marks["upload"], marks["capture_end"] - marks["capture_start"], backlog)
+        self.tracer.observe("segment_target", self.controller.target_seconds)
+        if target is not None:
+            self._set_segment_length(target)
+            print(f"[INFO] {self.name}: segment length → {target:.1f}s "
+                  f"(utilization {self.controller.utilization:.0%}, backlog {backlog})")
+
+    def _set_segment_length(self, seconds):
+        self.segmenter.urgent_flush_seconds = seconds
+        # Short utterances are held for at most a third of the segment length
+        self.segmenter.min_segment_seconds = min(self._min_segment_seconds, seconds / 3)
+
+    # ─── Metrics ────────────────────────────────────────────────────────────────
+
+    def _api_slot(self):
+        return self.api_slots if self.api_slots is not None else _NO_LIMIT
+
+    def stage_latency(self) -> dict:
+        """p50/p95/max seconds per traced span (see tracing.SPANS) so far."""
+        return self.tracer.summary()
+
+    def print_stats(self) -> None:
+        """Segment counters; latency histograms go to the tracer's sink."""
+        print(f"[INFO] {self.name}: {self.counts}")
+        noise_floor = self.segmenter.vad.noise_floor
+        if noise_floor is not None and noise_floor.floor is not None:
+            print(f"[INFO] {self.name}: noise floor {noise_floor.floor:.1f} dBFS, "
+                  f"silence threshold {noise_floor.threshold:.1f} dBFS")
+        if self.controller is not None:
+            s = self.controller.stats()
+            print(f"[INFO] {self.name}: segment length {s['target_seconds']:.1f}s, utilization {s['utilization']:.0%}, "
+                  f"{s['lengthened']} lengthened / {s['shortened']} shortened over {s['samples']} segments")
+
+
+async def _mark_exhausted(chunks, trace):
+    """Pass an async PCM stream through, marking tts_last_byte once it has been fully read."""
+    async for chunk in chunks:
+        yield chunk
+    trace.mark("tts_last_byte")
+
+
+class _NoLimit:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NO_LIMIT = _NoLimit()
@@ -0,0 +1,225 @@
+# search_index.py
+
+import os
+import threading
+
+import numpy as np
+import pymongo
+from bson import Binary
+
+from study_artifacts import pack
+from transcript_store import LIBRARY_FIELDS, get_transcript_store
+
+SEARCH_SEMANTIC = os.getenv("SEARCH_SEMANTIC", "0") == "1"
+SEARCH_EMBEDDING_MODEL = os.getenv("SEARCH_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")   # stemming and stop words of the text index
+SEARCH_RESULTS = 20
+EMBED_CHUNK_TOKENS = 200                                     # MiniLM reads 256 word pieces at most
+
+
+class VectorIndex:
+    """
+    Unit vectors in one float32 matrix (grown by doubling) with a parallel list
+    of keys; a query is one matrix-vector product and a partial sort. 10k
+    lectures of 384 dimensions are 15 MB.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.keys = []
+        self._rows = {}   # key -> row
+        self._matrix = np.zeros((1024, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, vector) -> None:
+        """Insert or replace the vector of `key`."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self._matrix):
+                self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+            self.keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vector / norm
+
+    def search(self, vector, k: int = SEARCH_RESULTS) -> list[tuple]:
+        """The k keys most similar to `vector` (cosine), best first, as (key, score)."""
+        if not self.keys:
+            return []
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        scores = self._matrix[:len(self.keys)] @ (vector / (np.linalg.norm(vector) or 1))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+
+class Embedder:
+    """
+    Sentence embeddings on the CPU via sentence-transformers.
+    Needs `pip install sentence-transformers`; the model is downloaded on first use.
+    """
+
+    def __init__(self, model_name: str = SEARCH_EMBEDDING_MODEL):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError("SEARCH_SEMANTIC=1 requires sentence-transformers (pip install sentence-transformers)") from e
+
+        print(f"[INFO] Loading embedding model '{model_name}'...")
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+
+    def embed_lecture(self, lines: list[str], extra: list[str]) -> np.ndarray:
+        """One vector per lecture: the mean of its ~200-token transcript chunks and slide summaries."""
+        texts = pack(lines, EMBED_CHUNK_TOKENS) + [t for t in extra if t]
+        return self.embed(texts or [""]).mean(axis=0)
+
+
+class SearchIndex:
+    """
+    Search over saved lectures. Each lecture has one small document in
+    `lecture_search` (name, slide summaries and, with semantic search on, an
+    embedding) written when it is saved; its transcript is searched where it
+    already lives, through a text index on `transcript_segments`.
+
+    A keyword query adds up the text scores of a lecture's search document
+    (name weighted 5, slide summaries 2) and of its matching segments (1
+    each). Semantic queries embed the query and rank every lecture vector in
+    an in-memory VectorIndex, loaded from the collection on first use and
+    updated as lectures are indexed. Results come back as library cards
+    (LIBRARY_FIELDS) plus a `score`.
+    """
+
+    def __init__(self, db=None, embedder=None, store=None):
+        self.store = store or get_transcript_store()
+        if db is None:
+            db = self.store.lectures.database
+        self.docs = db["lecture_search"]
+        self.lectures = db["transcripts"]
+        self.segments = db["transcript_segments"]
+        # `transcript` is set only for lectures saved before segments had their own collection
+        self.docs.create_index(
+            [("name", pymongo.TEXT), ("image_summaries", pymongo.TEXT), ("transcript", pymongo.TEXT)],
+            weights={"name": 5, "image_summaries": 2, "transcript": 1},
+            default_language=SEARCH_LANGUAGE,
+            name="lecture_text"
+        )
+        self.segments.create_index([("text", pymongo.TEXT)], default_language=SEARCH_LANGUAGE, name="segment_text")
+        self.embedder = embedder
+        self._vectors = None
+        self._lock = threading.Lock()
+
+    # ─── Indexing ───────────────────────────────────────────────────────────────
+
+    def index_lecture(self, lecture_id) -> None:
+        """(Re)index one lecture from its saved document (and, for the embedding, its segments)."""
+        lecture = self.lectures.find_one({"_id": lecture_id}, {"artifacts": 0})
+        if lecture is None:
+            return
+        summaries = lecture.get("image_summaries", [])
+        doc = {
+            "name": lecture.get("name", ""),
+            "timestamp": lecture.get("timestamp"),
+            "image_summaries": summaries,
+        }
+        if "transcript" in lecture:
+            doc["transcript"] = lecture["transcript"]  # inline transcript: no segments to search
+        vector = None
+        if self.embedder is not None:
+            lines = list(self.store.iter_segments(lecture))
+            vector = self.embedder.embed_lecture(lines, [doc["name"]] + summaries).astype(np.float32)
+            doc["vector"] = Binary(vector.tobytes())
+        self.docs.replace_one({"_id": lecture_id}, doc, upsert=True)
+        with self._lock:
+            if self._vectors is not None and vector is not None:
+                self._vectors.add(lecture_id, vector)
+
+    def reindex(self, missing_only: bool = True) -> int:
+        """Index saved lectures (by default only those not indexed yet, e.g. saved before search existed)."""
+        indexed = set(self.docs.distinct("_id")) if missing_only else set()
+        count = 0
+        for lecture in self.lectures.find({"status": {"$ne": "live"}}, {"_id": 1}):
+            if lecture["_id"] not in indexed:
+                self.index_lecture(lecture["_id"])
+                count += 1
+        return count
+
+    def _vector_index(self) -> VectorIndex:
+        with self._lock:
+            if self._vectors is None:
+                vectors = VectorIndex(self.embedder.dim)
+                for doc in self.docs.find({"vector": {"$exists": True}}, {"vector": 1}):
+                    vectors.add(doc["_id"], np.frombuffer(doc["vector"], dtype=np.float32))
+                self._vectors = vectors
+            return self._vectors
+
+    # ─── Queries ────────────────────────────────────────────────────────────────
+
+    def keyword(self, query: str, limit: int = SEARCH_RESULTS) -> list[tuple]:
+        """(lecture_id, text score) of the best keyword matches, best first."""
+        scores = {}
+        for doc in self.docs.find({"$text": {"$search": query}}, {"score": {"$meta": "textScore"}}):
+            scores[doc["_id"]] = doc["score"]
+        # Segments of indexed (saved) lectures only; live lectures have segments but no search document
+        for hit in self.segments.aggregate([
+            {"$match": {"$text": {"$search": query}}},
+            {"$project": {"lecture_id": 1, "score": {"$meta": "textScore"}}},
+            {"$group": {"_id": "$lecture_id", "score": {"$sum": "$score"}}},
+            {"$lookup": {"from": self.docs.name, "localField": "_id", "foreignField": "_id", "as": "doc"}},
+            {"$match": {"doc": {"$ne": []}}},
+            {"$project": {"score": 1}},
+        ]):
+            scores[hit["_id"]] = scores.get(hit["_id"], 0) + hit["score"]
+        return sorted(scores.items(), key=lambda hit: -hit[1])[:limit]
+
+    def semantic(self, query: str, limit: int = SEARCH_RESULTS) -> list[tuple]:
+        """(lecture_id, cosine similarity) of the lectures closest in meaning, best first."""
+        if self.embedder is None:
+            raise RuntimeError("semantic search needs an embedder (SEARCH_SEMANTIC=1)")
+        return self._vector_index().search(self.embedder.embed([query])[0], limit)
+
+    def search(self, query: str, semantic: bool = False, limit: int = SEARCH_RESULTS) -> list[dict]:
+        """Library cards of the best matches, best first, each with its `score`."""
+        hits = (self.semantic if semantic else self.keyword)(query, limit)
+        if not hits:
+            return []
+        scores = dict(hits)
+        cards = {card["_id"]: card for card in self.lectures.aggregate([
+            {"$match": {"_id": {"$in": list(scores)}}},
+            {"$project": LIBRARY_FIELDS},
+        ])}
+        return [{**cards[i], "score": scores[i]} for i, _ in hits if i in cards]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Shared index on MONGO_CONNECTION (semantic if SEARCH_SEMANTIC=1), created on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex(embedder=Embedder() if SEARCH_SEMANTIC else None)
+        return _index
+
+
+if __name__ == "__main__":
+    # Index lectures saved before search existed:  python search_index.py
+    # Rewrite every search document (e.g. to drop transcripts copied by older versions):  python search_index.py --all
+    import sys
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    print(f"[INFO] Indexed {get_search_index().reindex(missing_only='--all' not in sys.argv)} lectures.")
@@ -0,0 +1,79 @@
+# segment_control.py
+
+import os
+
+ADAPTIVE_SEGMENTS = os.getenv("ADAPTIVE_SEGMENTS", "1") == "1"
+SEGMENT_SECONDS_MIN = float(os.getenv("SEGMENT_SECONDS_MIN", "3"))    # shortest urgent-flush length it will pick
+SEGMENT_SECONDS_MAX = float(os.getenv("SEGMENT_SECONDS_MAX", "10"))   # longest (the VAD ring holds 30 s)
+SEGMENT_TARGET_UTILIZATION = float(os.getenv("SEGMENT_TARGET_UTILIZATION", "0.6"))
+
+
+class SegmentLengthController:
+    """
+    Picks the segment length (the Segmenter's urgent-flush time; the runtime
+    caps the short-utterance minimum at a third of it) from how busy the
+    backend is.
+
+    Each finished segment reports its service time (upload → first TTS byte)
+    and its captured length; with `workers` segments in flight, utilization is
+    roughly service / (workers × length). Above `target_utilization`, or with
+    segments queueing, the length grows by 25%; below half the target with an
+    empty queue it shrinks by 10%. Growing faster than it shrinks keeps a slow
+    backend from building a backlog, while a fast one still cuts lag.
+    """
+
+    def __init__(self,
+                 workers: int = 2,
+                 initial_seconds: float = SEGMENT_SECONDS_MAX,
+                 min_seconds: float = SEGMENT_SECONDS_MIN,
+                 max_seconds: float = SEGMENT_SECONDS_MAX,
+                 target_utilization: float = SEGMENT_TARGET_UTILIZATION,
+                 smoothing: float = 0.3):
+        self.workers = workers
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.target_utilization = target_utilization
+        self.smoothing = smoothing
+        self.target_seconds = min(max(initial_seconds, min_seconds), max_seconds)
+
+        self.service_seconds = None   # EWMA
+        self.segment_seconds = None   # EWMA
+        self.counts = {"samples": 0, "lengthened": 0, "shortened": 0}
+
+    @property
+    def utilization(self) -> float:
+        if not self.service_seconds or not self.segment_seconds:
+            return 0.0
+        return self.service_seconds / (self.workers * self.segment_seconds)
+
+    def observe(self, service_seconds: float, segment_seconds: float, backlog: int = 0) -> float | None:
+        """Fold in one finished segment; returns the new target length if it changed, else None."""
+        self.service_seconds = _ewma(self.service_seconds, service_seconds, self.smoothing)
+        self.segment_seconds = _ewma(self.segment_seconds, max(segment_seconds, 0.1), self.smoothing)
+        self.counts["samples"] += 1
+
+        utilization = self.utilization
+        if backlog > 0 or utilization > self.target_utilization:
+            target = min(self.target_seconds * 1.25, self.max_seconds)
+        elif utilization < self.target_utilization / 2:
+            target = max(self.target_seconds * 0.9, self.min_seconds)
+        else:
+            return None
+        if target == self.target_seconds:
+            return None
+
+        self.counts["lengthened" if target > self.target_seconds else "shortened"] += 1
+        self.target_seconds = target
+        return target
+
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "target_seconds": self.target_seconds,
+            "service_seconds": self.service_seconds or 0.0,
+            "utilization": self.utilization,
+        }
+
+
+def _ewma(current, sample, alpha):
+    return sample if current is None else current + alpha * (sample - current)
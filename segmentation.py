@@ -0,0 +1,158 @@
+# segmentation.py
+
+import os
+
+from vad import NoiseFloorTracker, StreamingVAD
+
+URGENT_FLUSH_SECONDS = float(os.getenv("URGENT_FLUSH_SECONDS", "10"))   # cut even without a pause after this long
+MIN_SEGMENT_SECONDS = float(os.getenv("MIN_SEGMENT_SECONDS", "1.5"))    # hold shorter utterances for more speech
+
+
+class Segmenter:
+    """
+    Accumulates mic chunks and closes segments at natural pauses.
+
+    - When the speaker has been quiet for `min_silence_ms`, the segment is cut
+      just after the last speech frame, so trailing silence is never uploaded.
+    - When `urgent_flush_seconds` pass without such a pause, the segment is cut
+      in the middle of the latest short pause instead of mid-word; the audio
+      after the cut (plus a small overlap) is carried into the next segment.
+    - Leading silence is trimmed down to a short pre-roll, and buffers that
+      contain no speech at all are dropped instead of being sent to Whisper.
+    - With a `noise_floor` tracker, what counts as silence follows the room's
+      noise level as it changes (HVAC, a filling room).
+
+    Every segment gets a monotonically increasing sequence id when it is cut,
+    which downstream stages use to put results back in capture order.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 silence_thresh: float = -40,
+                 min_silence_ms: int = 700,
+                 min_pause_ms: int = 200,
+                 urgent_flush_seconds: float = URGENT_FLUSH_SECONDS,
+                 min_segment_seconds: float = MIN_SEGMENT_SECONDS,
+                 pre_roll_ms: int = 200,
+                 hangover_ms: int = 150,
+                 overlap_ms: int = 100,
+                 noise_floor: NoiseFloorTracker | None = None):
+        self.vad = StreamingVAD(
+            sample_rate=sample_rate,
+            silence_thresh=silence_thresh,
+            min_silence_ms=min_silence_ms,
+            min_pause_ms=min_pause_ms,
+            capacity_seconds=max(30, urgent_flush_seconds * 3),
+            noise_floor=noise_floor
+        )
+        self.sample_rate = sample_rate
+        self.urgent_flush_seconds = urgent_flush_seconds
+        self.min_segment_seconds = min_segment_seconds
+        self.pre_roll_frames = pre_roll_ms // self.vad.frame_ms
+        self.hangover_frames = hangover_ms // self.vad.frame_ms
+        self.overlap_frames = overlap_ms // self.vad.frame_ms
+
+        self.buffer = bytearray()
+        self.chunk_times = []  # (byte offset into buffer, capture timestamp)
+        self.next_seq = 0
+
+    @property
+    def buffered_seconds(self) -> float:
+        return len(self.buffer) / (self.sample_rate * 2)
+
+    def feed(self, chunk: bytes, timestamp: float, now: float | None = None):
+        """
+        Add one mic chunk. Returns (seq, pcm_bytes, capture_timestamps) when a
+        segment is ready to be transcribed, otherwise None.
+        """
+        self.chunk_times.append((len(self.buffer), timestamp))
+        self.buffer += chunk
+        self.vad.push(chunk)
+
+        now = timestamp if now is None else now
+        silence_detected = self.vad.has_trailing_silence()
+        urgent_flush_needed = (now - self.chunk_times[0][1]) >= self.urgent_flush_seconds
+        if not (silence_detected or urgent_flush_needed):
+            return None
+
+        speech = self.vad.speech_bounds()
+        if speech is None:
+            # Nothing but silence: keep only a pre-roll so the next word onset isn't clipped
+            self._drop_front(self.vad.segment_frames - self.pre_roll_frames)
+            return None
+
+        speech_start, speech_end = speech
+        start = max(speech_start - self.pre_roll_frames, 0)
+
+        if silence_detected:
+            cut = min(speech_end + self.hangover_frames, self.vad.segment_frames)
+            if (cut - start) * self.vad.frame_ms / 1000 < self.min_segment_seconds and not urgent_flush_needed:
+                print(f"[INFO] Holding short utterance ({self.buffered_seconds:.2f}s buffered), waiting...")
+                return None
+            carry_from = cut
+        else:
+            pause = self.vad.last_pause()
+            min_frames = int(self.min_segment_seconds * 1000 / self.vad.frame_ms)
+            if pause and (pause[0] + pause[1]) // 2 - start >= min_frames:
+                cut = (pause[0] + pause[1]) // 2
+                carry_from = max(cut - self.overlap_frames, start)
+            else:
+                # No usable pause: ship everything, including any partial frame
+                cut = carry_from = None
+
+        return self._cut(start, cut, carry_from)
+
+    def flush(self):
+        """
+        Close out whatever speech is still buffered (e.g. when the audio source
+        ends). Returns (seq, pcm_bytes, capture_timestamps) or None.
+        """
+        speech = self.vad.speech_bounds()
+        if speech is None:
+            self.buffer.clear()
+            self.chunk_times.clear()
+            self.vad.reset()
+            return None
+        start = max(speech[0] - self.pre_roll_frames, 0)
+        cut = min(speech[1] + self.hangover_frames, self.vad.segment_frames)
+        seq, segment, timestamps = self._cut(start, cut, cut)
+        self.buffer.clear()
+        self.chunk_times.clear()
+        self.vad.reset()
+        return seq, segment, timestamps
+
+    def _cut(self, start, cut, carry_from):
+        fb = self.vad.frame_bytes
+        start_byte = start * fb
+        cut_byte = len(self.buffer) if cut is None else cut * fb
+        with memoryview(self.buffer) as view:
+            segment = view[start_byte:cut_byte].tobytes()  # one copy, not slice + bytes()
+        timestamps = [t for offset, t in self._times_from(start_byte) if offset < cut_byte]
+
+        if cut is None:
+            self.buffer.clear()
+            self.chunk_times.clear()
+            self.vad.reset()
+        else:
+            self._drop_front(carry_from)
+
+        seq = self.next_seq
+        self.next_seq += 1
+        return seq, segment, timestamps
+
+    def _drop_front(self, n_frames):
+        if n_frames <= 0:
+            return
+        n_bytes = n_frames * self.vad.frame_bytes
+        self.chunk_times = [(offset - n_bytes, t) for offset, t in self._times_from(n_bytes)]
+        del self.buffer[:n_bytes]
+        self.vad.consume(n_frames)
+
+    def _times_from(self, byte_offset):
+        """Chunk timestamps overlapping buffer[byte_offset:], with offsets clamped to byte_offset."""
+        kept = []
+        for i, (offset, t) in enumerate(self.chunk_times):
+            next_offset = self.chunk_times[i + 1][0] if i + 1 < len(self.chunk_times) else len(self.buffer)
+            if next_offset > byte_offset:
+                kept.append((max(offset, byte_offset), t))
+        return kept
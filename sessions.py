@@ -0,0 +1,218 @@
+# sessions.py
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import close_async_client
+from runtime import AssistantRuntime
+from transcription import get_transcriber
+
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "8"))      # translator and other blocking calls, all sessions
+MAX_API_REQUESTS = int(os.getenv("MAX_API_REQUESTS", "16"))     # in-flight Whisper + TTS requests, all sessions
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))  # stopped sessions unused this long are dropped
+
+
+class Session:
+    """
+    One assistant instance, e.g. one lecture hall: its mic, settings, pipeline
+    and transcript. Sessions don't share state with each other; run them with
+    a SessionManager so they share API clients and worker threads.
+    """
+
+    def __init__(self,
+                 name: str,
+                 input_device_index: int | None = None,
+                 audio_source=None,
+                 input_language: str = "auto",
+                 target_language: str = "en",
+                 voice_id: str | None = None,
+                 **runtime_options):
+        """`runtime_options` go to AssistantRuntime (silence_thresh, workers, overflow, player, tracer, ...)."""
+        self.name = name
+        self.input_device_index = input_device_index
+        self.audio_source = audio_source
+        self.input_language = input_language
+        self.target_language = target_language
+        self.voice_id = voice_id
+        self.runtime_options = runtime_options
+
+        self.transcript_lines = []
+        self.image_refs = []        # one blob_store.store_image reference per uploaded slide
+        self.image_summaries = []   # one generated summary per uploaded slide
+        self.on_line = None         # callable(index, text) per new transcript line, e.g. to persist it
+        self.lecture_id = None      # where on_line persists to, if anywhere (see transcript_store.py)
+        self.summarizer = None      # live_summary.LiveSummarizer run alongside the pipeline, if any
+        self.runtime = None
+        self.last_used = time.monotonic()   # see touch() and SessionManager.prune
+        self._future = None
+        self._summary_future = None
+
+    def build_runtime(self, **shared) -> AssistantRuntime:
+        """A fresh pipeline for this session; `shared` carries the manager's clients and pools."""
+        options = {**self.runtime_options, **shared}
+        self.runtime = AssistantRuntime(
+            audio_source=self.audio_source,
+            input_device_index=self.input_device_index,
+            input_language=self.input_language,
+            target_language=self.target_language,
+            voice_id_fn=lambda: self.voice_id,
+            on_transcript=self._on_transcript,
+            name=self.name,
+            **options
+        )
+        return self.runtime
+
+    def set_glossary(self, terms) -> None:
+        """Course vocabulary for the Whisper prompt (list, or comma/newline-separated text; blank keeps WHISPER_GLOSSARY); applies live."""
+        self.runtime_options["glossary"] = terms
+        if self.runtime is not None:
+            self.runtime.context.set_glossary(terms)
+
+    def _on_transcript(self, seq, text):
+        self.transcript_lines.append(text.strip())
+        if self.on_line is not None:
+            self.on_line(len(self.transcript_lines) - 1, self.transcript_lines[-1])
+
+    def touch(self) -> None:
+        """Mark the session as in use, e.g. on every page load of the browser tab driving it."""
+        self.last_used = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def transcript(self, sep: str = "\n") -> str:
+        return sep.join(self.transcript_lines)
+
+
+class SessionManager:
+    """
+    Runs any number of Sessions concurrently on one event loop (one background
+    thread), so they share one transcriber, one pooled HTTP client, one
+    executor for blocking calls and one semaphore bounding API requests.
+    """
+
+    def __init__(self,
+                 blocking_workers: int = BLOCKING_WORKERS,
+                 max_api_requests: int = MAX_API_REQUESTS,
+                 transcriber=None):
+        self.blocking_workers = blocking_workers
+        self.max_api_requests = max_api_requests
+        self.transcriber = transcriber
+        self.blocking_pool = None
+        self.api_slots = None
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self.blocking_pool = ThreadPoolExecutor(max_workers=self.blocking_workers, thread_name_prefix="sessions")
+            self.api_slots = asyncio.Semaphore(self.max_api_requests)
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="sessions-loop")
+            self._thread.start()
+            if self.transcriber is None:
+                self.transcriber = get_transcriber()
+        return self._loop
+
+    # ─── Sessions ───────────────────────────────────────────────────────────────
+
+    def add(self, session: Session) -> Session:
+        with self._lock:
+            if session.name in self.sessions:
+                raise ValueError(f"Session '{session.name}' already exists")
+            self.sessions[session.name] = session
+        return session
+
+    def get(self, name: str) -> Session | None:
+        return self.sessions.get(name)
+
+    def _snapshot(self) -> list:
+        """(name, session) pairs; page reruns add and remove sessions from other threads."""
+        with self._lock:
+            return list(self.sessions.items())
+
+    def start(self, name: str) -> Session:
+        """Start a registered session's pipeline (no-op if it is already running)."""
+        session = self.sessions[name]
+        with self._lock:
+            if session.running:
+                return session
+            loop = self._ensure_loop()
+            runtime = session.build_runtime(
+                transcriber=self.transcriber,
+                blocking_pool=self.blocking_pool,
+                api_slots=self.api_slots,
+                close_clients=False
+            )
+            session._future = asyncio.run_coroutine_threadsafe(runtime.run(), loop)
+            if session.summarizer is not None:
+                session._summary_future = asyncio.run_coroutine_threadsafe(
+                    session.summarizer.run(session.transcript_lines), loop
+                )
+        print(f"[INFO] Session '{name}' started ({self.running_count()} running).")
+        return session
+
+    def stop(self, name: str, timeout: float = 5) -> None:
+        """Stop a session's pipeline and wait for it to wind down. Its transcript is kept."""
+        session = self.sessions.get(name)
+        if session is None or session.runtime is None:
+            return
+        session.runtime.stop()
+        if session._summary_future is not None:
+            session._summary_future.cancel()  # abandons a fold in flight; the last completed one is kept
+            session._summary_future = None
+        if session._future is not None:
+            try:
+                session._future.result(timeout)
+            except Exception as e:
+                print(f"[WARN] Session '{name}' did not stop cleanly: {e}")
+        session.runtime.print_stats()
+        if session.summarizer is not None:
+            session.summarizer.print_stats(session.name)
+        print(f"[INFO] Session '{name}' stopped.")
+
+    def remove(self, name: str) -> None:
+        self.stop(name)
+        with self._lock:
+            self.sessions.pop(name, None)
+
+    def prune(self, idle_seconds: float = SESSION_IDLE_SECONDS) -> list[str]:
+        """Remove sessions that are not running and were not touched for `idle_seconds`; returns their names."""
+        now = time.monotonic()
+        idle = [name for name, s in self._snapshot() if not s.running and now - s.last_used > idle_seconds]
+        for name in idle:
+            self.remove(name)
+        if idle:
+            print(f"[INFO] Removed {len(idle)} idle session(s), {len(self.sessions)} left.")
+        return idle
+
+    def running_count(self) -> int:
+        return sum(1 for _, s in self._snapshot() if s.running)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until every started session has finished (e.g. file-backed sources ran out)."""
+        for _, session in self._snapshot():
+            if session._future is not None:
+                session._future.result(timeout)
+
+    def shutdown(self) -> None:
+        """Stop every session, close the shared clients and the loop."""
+        for name, _ in self._snapshot():
+            self.stop(name)
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close_clients(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+            self._loop.close()
+            self._loop = None
+            self.blocking_pool.shutdown(wait=False)
+
+    async def _close_clients(self):
+        await self.transcriber.aclose()
+        await close_async_client()
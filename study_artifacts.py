@@ -0,0 +1,265 @@
+# study_artifacts.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+STUDY_MODEL = os.getenv("STUDY_MODEL", "llama-3.3-70b-versatile")
+STUDY_CHUNK_TOKENS = int(os.getenv("STUDY_CHUNK_TOKENS", "3000"))
+STUDY_WORKERS = int(os.getenv("STUDY_WORKERS", "4"))
+CHARS_PER_TOKEN = 4  # rough English average; chunk budgets don't need a real tokenizer
+
+# Bump a version whenever its prompt or parsing changes: cached results from the old one are then regenerated
+PROMPTS = {
+    "summary": (1, "Summarize this lecture in 500 words using Markdown bullet points. List 3 key terms and 3 key learnings:\n\n{text}"),
+    "flashcards": (1, "Create 5 flashcards (Q&A format only) from this lecture in JSON. Each card must have 'Q' and 'A' keys:\n\n{text}"),
+    "title": (1, "Generate a short academic title from this excerpt:\n\n{text}"),
+    # Long transcripts: map over chunks, then merge (see StudyArtifacts._map_reduce)
+    "summary_part": (1, "Summarize this part of a lecture as concise Markdown bullet points. Keep key terms, definitions and results:\n\n{text}"),
+    "summary_merge": (1, "These are notes on consecutive parts of one lecture. Summarize the whole lecture in 500 words using Markdown bullet points. List 3 key terms and 3 key learnings:\n\n{text}"),
+    "flashcards_part": (1, "Create up to 5 flashcards (Q&A format only) from this part of a lecture in JSON. Each card must have 'Q' and 'A' keys:\n\n{text}"),
+    "flashcards_merge": (1, "These are candidate flashcards from consecutive parts of one lecture, in JSON. Choose the 5 that best cover the whole lecture and return them in JSON. Each card must have 'Q' and 'A' keys:\n\n{text}"),
+    # During the lecture: fold each new part into a running summary (see live_summary.py)
+    "summary_fold": (1, "Below is a running summary of a lecture so far, then the next part of its transcript. Rewrite the summary so it covers both, in at most 500 words using Markdown bullet points. List 3 key terms and 3 key learnings:\n\n{text}"),
+}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_flashcards(content: str) -> list[list[str]]:
+    cleaned = re.sub(r"```(\w+)?\n?", "", content).strip()
+    return [[card["Q"].strip(), card["A"].strip()] for card in json.loads(cleaned)]
+
+
+def merge_cards(cards: list) -> str:
+    return json.dumps([{"Q": q, "A": a} for q, a in cards], ensure_ascii=False)
+
+
+def fold_text(summary: str, new_text: str) -> str:
+    return f"Summary so far:\n{summary}\n\nNext part of the transcript:\n{new_text}"
+
+
+def part_cards(content: str) -> list[list[str]]:
+    """Flashcards of one part of a lecture; a reply that doesn't parse contributes none."""
+    try:
+        return parse_flashcards(content)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return []
+
+
+def cards_json(content: str) -> str:
+    """Flashcards of a chunk as clean JSON for the merge prompt."""
+    return merge_cards(part_cards(content))
+
+
+PARSERS = {
+    "summary": str,
+    "flashcards": parse_flashcards,
+    "title": str.strip,
+}
+
+# How a map (or intermediate merge) reply is passed on to the next merge
+PART_TEXT = {
+    "summary": str.strip,
+    "flashcards": cards_json,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack(pieces: list[str], max_tokens: int, sep: str = "\n") -> list[str]:
+    """
+    Join consecutive pieces into chunks of at most max_tokens (a piece larger
+    than that is a chunk of its own). Packing is greedy from the start, so
+    appending pieces only changes the last chunk and adds new ones.
+    """
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and size + tokens > max_tokens:
+            chunks.append(sep.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        chunks.append(sep.join(current))
+    return chunks
+
+
+class StudyArtifacts:
+    """
+    LLM-generated study material (summaries, flashcards, titles) stored on the
+    lecture document under `artifacts.<kind>`, together with what it was made
+    from: the hash of the input text, the model and the prompt version. A view
+    whose inputs match is served from the document; anything else (a lecture
+    that grew, a new model or prompt) is generated once and stored again.
+    Lectures without an id (nothing persisted yet) are generated uncached.
+
+    Summaries and flashcards of transcripts longer than `chunk_tokens` are
+    map-reduced: the transcript is packed into line-aligned chunks, each is
+    summarized (or mined for cards) on a pool of `workers` threads, and the
+    partial results are merged, level by level while they are still too long
+    for one prompt. Every chunk call is cached in `chunks` by (prompt, model,
+    text), so re-summarizing a lecture that grew only sends the new chunks.
+    """
+
+    def __init__(self,
+                 lectures,
+                 client,
+                 model: str = STUDY_MODEL,
+                 chunks=None,
+                 chunk_tokens: int = STUDY_CHUNK_TOKENS,
+                 workers: int = STUDY_WORKERS):
+        self.lectures = lectures
+        self.client = client
+        self.model = model
+        self.chunks = chunks
+        self.chunk_tokens = chunk_tokens
+        self.workers = workers
+        self.counts = {"hits": 0, "misses": 0, "chunk_hits": 0, "chunk_calls": 0}
+        self._lock = threading.Lock()
+
+    def _inputs(self, kind, text):
+        return {"text": text_hash(text), "model": self.model, "prompt": PROMPTS[kind][0]}
+
+    def cached(self, lecture_id, kind: str, text: str):
+        """The stored artifact if it was made from exactly these inputs, else None."""
+        if lecture_id is None:
+            return None
+        doc = self.lectures.find_one({"_id": lecture_id}, {f"artifacts.{kind}": 1})
+        entry = ((doc or {}).get("artifacts") or {}).get(kind)
+        if entry and entry.get("inputs") == self._inputs(kind, text):
+            self.counts["hits"] += 1
+            return entry["value"]
+        return None
+
+    def get(self, lecture_id, kind: str, text: str):
+        """Cached artifact for these inputs, generating and storing it on a miss."""
+        value = self.cached(lecture_id, kind, text)
+        if value is not None:
+            return value
+        self.counts["misses"] += 1
+        live = self._live(lecture_id, text) if kind in PART_TEXT else None
+        if live is not None:
+            value = PARSERS[kind](self._finish_live(kind, *live))
+        elif kind in PART_TEXT and estimate_tokens(text) > self.chunk_tokens:
+            value = PARSERS[kind](self._map_reduce(kind, text))
+        else:
+            value = PARSERS[kind](self._complete(kind, text))
+        if lecture_id is not None:
+            try:
+                self.lectures.update_one(
+                    {"_id": lecture_id},
+                    {"$set": {f"artifacts.{kind}": {"inputs": self._inputs(kind, text), "value": value,
+                                                    "created": time.strftime("%Y-%m-%d %H:%M:%S")}}}
+                )
+            except Exception as e:
+                print(f"[WARN] Could not cache {kind} for lecture {lecture_id}: {e}")
+        return value
+
+    def _live(self, lecture_id, text):
+        """
+        (running state, lines it has not seen) if the lecture's live summary
+        (artifacts.live, written by LiveSummarizer) covers a prefix of `text`
+        and the rest fits one prompt; otherwise None.
+        """
+        if lecture_id is None:
+            return None
+        doc = self.lectures.find_one({"_id": lecture_id}, {"artifacts.live": 1})
+        live = ((doc or {}).get("artifacts") or {}).get("live")
+        if not live or not live.get("lines") or live.get("model") != self.model \
+                or live.get("prompt") != PROMPTS["summary_fold"][0]:
+            return None
+        lines = text.splitlines()
+        rest = "\n".join(lines[live["lines"]:])
+        if text_hash("\n".join(lines[:live["lines"]])) != live["text"] or estimate_tokens(rest) > self.chunk_tokens:
+            return None
+        return live, rest
+
+    def _finish_live(self, kind, live, rest):
+        """Raw reply for the whole lecture from its live state: only the unseen tail goes to the LLM."""
+        if kind == "summary":
+            return self._complete("summary_fold", fold_text(live["summary"], rest)) if rest else live["summary"]
+        cards = live["flashcards"] + (part_cards(self._complete("flashcards_part", rest)) if rest else [])
+        return self._complete("flashcards_merge", merge_cards(cards)) if len(cards) > 5 else merge_cards(cards)
+
+    # ─── Completions ────────────────────────────────────────────────────────────
+
+    def _complete(self, prompt: str, text: str) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": PROMPTS[prompt][1].format(text=text)}]
+        )
+        return response.choices[0].message.content
+
+    def _complete_cached(self, prompt: str, text: str) -> str:
+        """_complete, remembered in the `chunks` collection by (prompt and version, model, text)."""
+        if self.chunks is None:
+            with self._lock:
+                self.counts["chunk_calls"] += 1
+            return self._complete(prompt, text)
+        key = text_hash(json.dumps([prompt, PROMPTS[prompt][0], self.model, text], ensure_ascii=False))
+        doc = self.chunks.find_one({"_id": key}, {"content": 1})
+        if doc is not None:
+            with self._lock:
+                self.counts["chunk_hits"] += 1
+            return doc["content"]
+        with self._lock:
+            self.counts["chunk_calls"] += 1
+        content = self._complete(prompt, text)
+        try:
+            self.chunks.update_one({"_id": key}, {"$set": {"content": content, "prompt": prompt}}, upsert=True)
+        except Exception as e:
+            print(f"[WARN] Could not cache {prompt} chunk: {e}")
+        return content
+
+    def _map_reduce(self, kind: str, text: str) -> str:
+        """Raw reply of the final merge for a transcript too long for one prompt."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="study") as pool:
+            def run(prompt, chunks):
+                return [PART_TEXT[kind](reply) for reply in pool.map(lambda c: self._complete_cached(prompt, c), chunks)]
+
+            parts = run(f"{kind}_part", pack(text.splitlines(), self.chunk_tokens))
+            while len(parts) > 1 and estimate_tokens("\n\n".join(parts)) > self.chunk_tokens:
+                groups = pack(parts, self.chunk_tokens, sep="\n\n")
+                if len(groups) == len(parts):
+                    break  # every part fills a prompt on its own; merge what we have
+                parts = run(f"{kind}_merge", groups)
+        return self._complete_cached(f"{kind}_merge", "\n\n".join(parts))
+
+    # ─── Artifacts ──────────────────────────────────────────────────────────────
+
+    def summary(self, lecture_id, transcript: str) -> str:
+        return self.get(lecture_id, "summary", transcript)
+
+    def flashcards(self, lecture_id, transcript: str) -> list[list[str]]:
+        return self.get(lecture_id, "flashcards", transcript)
+
+    def title(self, lecture_id, transcript: str) -> str:
+        return self.get(lecture_id, "title", transcript[:300])
+
+
+_artifacts = None
+_artifacts_lock = threading.Lock()
+
+
+def get_study_artifacts() -> StudyArtifacts:
+    """Shared artifact cache on the lecture collection, created on first use."""
+    global _artifacts
+    with _artifacts_lock:
+        if _artifacts is None:
+            from groq import Groq
+            from transcript_store import get_transcript_store
+
+            lectures = get_transcript_store().lectures
+            _artifacts = StudyArtifacts(lectures, Groq(api_key=os.getenv("GROQ_API_KEY")),
+                                        chunks=lectures.database["study_chunks"])
+        return _artifacts
@@ -0,0 +1,284 @@
+# tracing.py
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+TRACE_SINK = os.getenv("TRACE_SINK", "log")  # log | jsonl | prometheus | none
+TRACE_PATH = os.getenv("TRACE_PATH", "")      # jsonl / prometheus output file
+TRACE_EXPORT_SECONDS = float(os.getenv("TRACE_EXPORT_SECONDS", "60"))
+
+# Timeline of one segment, in the order they normally happen
+EVENTS = (
+    "capture_start", "capture_end", "flush", "upload", "transcript", "translation",
+    "tts_request", "tts_first_byte", "tts_last_byte", "decode", "playback_start", "playback_end",
+)
+
+# span name -> (from event, to event); a span is observed only when both events were marked
+SPANS = {
+    "capture": ("capture_start", "capture_end"),
+    "vad_wait": ("capture_end", "flush"),
+    "queue_wait": ("flush", "upload"),
+    "transcribe": ("upload", "transcript"),
+    "translate": ("transcript", "translation"),
+    "tts_first_byte": ("tts_request", "tts_first_byte"),
+    "tts_download": ("tts_first_byte", "tts_last_byte"),
+    "decode": ("tts_last_byte", "decode"),
+    "playback_wait": ("tts_first_byte", "playback_start"),
+    "playback": ("playback_start", "playback_end"),
+    "end_to_end": ("capture_end", "playback_start"),
+}
+
+# Histogram upper bounds in seconds (Prometheus-style, plus +Inf)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class SegmentTrace:
+    """Wall-clock timestamps of one segment's trip through the pipeline."""
+
+    __slots__ = ("seq", "marks")
+
+    def __init__(self, seq: int, capture_start: float | None = None, capture_end: float | None = None):
+        self.seq = seq
+        self.marks = {}
+        if capture_start is not None:
+            self.marks["capture_start"] = capture_start
+        if capture_end is not None:
+            self.marks["capture_end"] = capture_end
+
+    def mark(self, event: str, t: float | None = None) -> None:
+        """Record `event` now (or at `t`). The first mark wins, so callers can mark defensively."""
+        if event not in self.marks:
+            self.marks[event] = time.time() if t is None else t
+
+    def spans(self) -> dict:
+        out = {}
+        for name, (start, end) in SPANS.items():
+            if start in self.marks and end in self.marks:
+                out[name] = self.marks[end] - self.marks[start]
+        return out
+
+    def to_dict(self) -> dict:
+        origin = self.marks.get("capture_start", min(self.marks.values(), default=0))
+        return {
+            "seq": self.seq,
+            "start": origin,
+            "marks": {e: round(t - origin, 4) for e, t in self.marks.items()},
+            "spans": {k: round(v, 4) for k, v in self.spans().items()},
+        }
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: O(log buckets) per observation, constant memory."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+        }
+
+
+# ─── Sinks ──────────────────────────────────────────────────────────────────────
+
+class TraceSink:
+    """Where finished traces and histogram snapshots go. Both hooks default to no-ops."""
+
+    def record(self, pipeline: str, trace: SegmentTrace) -> None:
+        pass
+
+    def export(self, pipeline: str, histograms: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LogSink(TraceSink):
+    """Prints a p50/p95/max table on every export."""
+
+    def export(self, pipeline, histograms):
+        print(f"[INFO] {pipeline} latency:")
+        for name, h in histograms.items():
+            if h.count:
+                s = h.summary()
+                print(f"[INFO]   {name:<15} n={s['count']:<5} p50 {s['p50'] * 1e3:8.1f} ms   "
+                      f"p95 {s['p95'] * 1e3:8.1f} ms   max {s['max'] * 1e3:8.1f} ms")
+
+
+class JSONLinesSink(TraceSink):
+    """Appends one JSON object per finished segment (marks relative to capture start, plus spans)."""
+
+    def __init__(self, path: str = "traces.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def record(self, pipeline, trace):
+        line = json.dumps({"pipeline": pipeline, **trace.to_dict()})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusSink(TraceSink):
+    """
+    Writes every pipeline's histograms to a node_exporter textfile-collector file,
+    replaced atomically on each export.
+    """
+
+    def __init__(self, path: str = "hearsay.prom"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._latest = {}  # pipeline -> {span: Histogram}
+
+    def export(self, pipeline, histograms):
+        with self._lock:
+            self._latest[pipeline] = histograms
+            lines = [
+                "# HELP hearsay_stage_seconds Per-segment latency of each pipeline stage.",
+                "# TYPE hearsay_stage_seconds histogram",
+            ]
+            for name, spans in sorted(self._latest.items()):
+                for span, h in spans.items():
+                    labels = f'pipeline="{name}",stage="{span}"'
+                    cumulative = 0
+                    for bound, n in zip((*BUCKETS, "+Inf"), h.counts):
+                        cumulative += n
+                        lines.append(f'hearsay_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"hearsay_stage_seconds_sum{{{labels}}} {h.sum}")
+                    lines.append(f"hearsay_stage_seconds_count{{{labels}}} {h.count}")
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, self.path)
+
+
+SINKS = {
+    "none": TraceSink,
+    "log": LogSink,
+    "jsonl": JSONLinesSink,
+    "prometheus": PrometheusSink,
+}
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink() -> TraceSink:
+    """Shared sink selected by TRACE_SINK (and TRACE_PATH), created on first use."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            kind = TRACE_SINK.lower()
+            if kind not in SINKS:
+                raise ValueError(f"Unknown TRACE_SINK '{TRACE_SINK}', expected one of {sorted(SINKS)}")
+            _sink = SINKS[kind](TRACE_PATH) if TRACE_PATH and kind in ("jsonl", "prometheus") else SINKS[kind]()
+        return _sink
+
+
+# ─── Tracer ─────────────────────────────────────────────────────────────────────
+
+class Tracer:
+    """
+    Folds finished SegmentTraces into one histogram per span, forwards each
+    trace to the sink, and exports histogram snapshots every `export_seconds`.
+    Marking is a dict insert and finishing a handful of bisects, so it stays on
+    in production.
+    """
+
+    def __init__(self, pipeline: str = "assistant", sink: TraceSink | None = None,
+                 export_seconds: float = TRACE_EXPORT_SECONDS):
+        self.pipeline = pipeline
+        self.sink = sink or get_sink()
+        self.export_seconds = export_seconds
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._last_export = time.monotonic()
+
+    def start(self, seq: int, timestamps=None) -> SegmentTrace:
+        """New trace for a segment; `timestamps` are its chunks' capture times."""
+        if timestamps:
+            return SegmentTrace(seq, capture_start=timestamps[0], capture_end=timestamps[-1])
+        return SegmentTrace(seq)
+
+    def observe(self, span: str, seconds: float) -> None:
+        """Record a timing that isn't part of a segment trace (e.g. per-chunk VAD cost)."""
+        with self._lock:
+            self._histogram(span).observe(seconds)
+
+    def finish(self, trace: SegmentTrace) -> None:
+        spans = trace.spans()
+        with self._lock:
+            for name, seconds in spans.items():
+                self._histogram(name).observe(seconds)
+            due = time.monotonic() - self._last_export >= self.export_seconds
+        try:
+            self.sink.record(self.pipeline, trace)
+        except Exception as e:
+            print(f"[WARN] Trace sink failed: {e}")
+        if due:
+            self.export()
+
+    def export(self) -> None:
+        with self._lock:
+            self._last_export = time.monotonic()
+            snapshot = {name: _copy(h) for name, h in self.histograms.items()}
+        try:
+            self.sink.export(self.pipeline, snapshot)
+        except Exception as e:
+            print(f"[WARN] Trace export failed: {e}")
+
+    def summary(self) -> dict:
+        """{span: {count, mean, p50, p95, max}} for every span observed so far."""
+        with self._lock:
+            return {name: h.summary() for name, h in self.histograms.items() if h.count}
+
+    def _histogram(self, name):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Histogram()
+        return h
+
+
+def _copy(h):
+    c = Histogram()
+    c.counts = list(h.counts)
+    c.count, c.sum, c.max = h.count, h.sum, h.max
+    return c
@@ -0,0 +1,208 @@
+# transcript_store.py
+
+import os
+import threading
+import time
+
+import pymongo
+from bson import ObjectId
+from pymongo import UpdateOne
+
+TRANSCRIPT_FLUSH_SECONDS = float(os.getenv("TRANSCRIPT_FLUSH_SECONDS", "2"))
+TRANSCRIPT_FLUSH_SEGMENTS = int(os.getenv("TRANSCRIPT_FLUSH_SEGMENTS", "50"))
+LIBRARY_PAGE_SIZE = int(os.getenv("LIBRARY_PAGE_SIZE", "20"))
+PREVIEW_CHARS = 150
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "3000"))          # server selection; pymongo's default is 30 s
+MONGO_RETRY_SECONDS = float(os.getenv("MONGO_RETRY_SECONDS", "60"))   # after a failed connect, fail fast this long
+
+# What a library card needs; documents saved before `preview` existed get one cut from their inline transcript
+LIBRARY_FIELDS = {
+    "name": 1,
+    "timestamp": 1,
+    "status": 1,
+    "preview": {"$ifNull": ["$preview", {"$substrCP": [{"$ifNull": ["$transcript", ""]}, 0, PREVIEW_CHARS]}]},
+}
+
+
+def mongo_database():
+    """The lecture database on MONGO_CONNECTION; operations fail after MONGO_TIMEOUT_MS if no server answers."""
+    # Read here rather than at import: pages call load_dotenv() after their imports
+    client = pymongo.MongoClient(os.getenv("MONGO_CONNECTION"), serverSelectionTimeoutMS=MONGO_TIMEOUT_MS)
+    return client[os.getenv("MONGO_DATABASE", "materials")]
+
+
+class TranscriptStore:
+    """
+    Lectures persisted while they happen. The `transcripts` collection holds one
+    small metadata document per lecture; its text lives in `transcript_segments`,
+    one document per transcript line keyed by (lecture_id, index).
+
+    append() only queues the line, so it is safe on the pipeline's event loop; a
+    background thread writes queued lines with one unordered bulk_write every
+    `flush_seconds`, or sooner once `flush_segments` are waiting. Writes are
+    upserts, so a batch that failed is simply retried on the next flush. A crash
+    loses at most the last flush interval, and saving a lecture only updates
+    its metadata document (including a precomputed `preview` for the library).
+    """
+
+    def __init__(self,
+                 db=None,
+                 flush_seconds: float = TRANSCRIPT_FLUSH_SECONDS,
+                 flush_segments: int = TRANSCRIPT_FLUSH_SEGMENTS):
+        if db is None:
+            db = mongo_database()
+        self.lectures = db["transcripts"]
+        self.segments = db["transcript_segments"]
+        self.segments.create_index([("lecture_id", pymongo.ASCENDING), ("index", pymongo.ASCENDING)], unique=True)
+        # Newest-first library pages; _id breaks ties between lectures saved in the same second
+        self.lectures.create_index([("timestamp", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)])
+        self.flush_seconds = flush_seconds
+        self.flush_segments = flush_segments
+
+        self._pending = []   # UpdateOne operations not yet written
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # one write at a time; flush() returns once earlier lines are written
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name="transcript-store")
+        self._flusher.start()
+
+    # ─── Writing ────────────────────────────────────────────────────────────────
+
+    def open_lecture(self, name: str = "Unnamed", voice: str = "Unknown") -> ObjectId:
+        """Create the metadata document of a lecture that is being recorded."""
+        return self.lectures.insert_one({
+            "name": name,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "voice": voice,
+            "status": "live",
+            "segment_count": 0,
+        }).inserted_id
+
+    def append(self, lecture_id: ObjectId, index: int, text: str) -> None:
+        """Queue transcript line `index` of a lecture; written by the next flush."""
+        op = UpdateOne(
+            {"lecture_id": lecture_id, "index": index},
+            {"$set": {"text": text, "t": time.time()}},
+            upsert=True
+        )
+        with self._lock:
+            self._pending.append(op)
+            full = len(self._pending) >= self.flush_segments
+        if full:
+            self._wake.set()
+
+    def flush(self) -> bool:
+        """
+        Write every queued line now, after waiting for a flush already in
+        progress. Returns False (and keeps them queued) if the write failed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return True
+            try:
+                self.segments.bulk_write(batch, ordered=False)
+                return True
+            except Exception as e:
+                print(f"[WARN] Transcript flush of {len(batch)} segments failed, will retry: {e}")
+                with self._lock:
+                    self._pending[:0] = batch
+                return False
+
+    def save_lecture(self, lecture_id: ObjectId, segment_count: int, **fields) -> None:
+        """Flush queued lines and mark the lecture saved, updating metadata (name, voice, slides, ...)."""
+        if not self.flush():
+            raise RuntimeError("transcript segments could not be written")
+        self.lectures.update_one(
+            {"_id": lecture_id},
+            {"$set": {**fields, "status": "saved", "segment_count": segment_count,
+                      "preview": self.preview({"_id": lecture_id})}}
+        )
+
+    def save_live_state(self, lecture_id: ObjectId, state: dict) -> None:
+        """Store a running lecture's live summary state (see live_summary.py) as artifacts.live."""
+        self.lectures.update_one({"_id": lecture_id}, {"$set": {"artifacts.live": state}})
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(5)
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    # ─── Reading ────────────────────────────────────────────────────────────────
+
+    def list_lectures(self, after: tuple | None = None, limit: int = LIBRARY_PAGE_SIZE) -> tuple[list, tuple | None]:
+        """
+        One newest-first page of library cards (_id, name, timestamp, status, preview).
+        Pass the returned cursor as `after` for the next page; it is None after the last one.
+        """
+        match = {}
+        if after is not None:
+            timestamp, lecture_id = after
+            match = {"$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "_id": {"$lt": lecture_id}}]}
+        items = list(self.lectures.aggregate([
+            {"$match": match},
+            {"$sort": {"timestamp": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {"$project": LIBRARY_FIELDS},
+        ]))
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, (items[-1]["timestamp"], items[-1]["_id"])
+
+    def iter_segments(self, lecture: dict, batch_size: int = 200):
+        """Transcript lines of a lecture document in order, fetched `batch_size` at a time."""
+        if "transcript" in lecture:
+            # Saved before segments had their own collection
+            yield from lecture["transcript"].splitlines()
+            return
+        cursor = self.segments.find(
+            {"lecture_id": lecture["_id"]}, {"_id": 0, "text": 1}
+        ).sort("index", pymongo.ASCENDING).batch_size(batch_size)
+        for segment in cursor:
+            yield segment["text"]
+
+    def transcript(self, lecture: dict, sep: str = "\n") -> str:
+        return sep.join(self.iter_segments(lecture))
+
+    def preview(self, lecture: dict, chars: int = PREVIEW_CHARS) -> str:
+        """The start of a lecture's transcript, reading only as many segments as needed."""
+        text = ""
+        for line in self.iter_segments(lecture, batch_size=5):
+            text = f"{text} {line}" if text else line
+            if len(text) >= chars:
+                break
+        return text[:chars]
+
+
+_store = None
+_store_failed = None   # monotonic time of the last failed connect
+_store_lock = threading.Lock()
+
+
+def get_transcript_store() -> TranscriptStore:
+    """
+    Shared store on MONGO_CONNECTION, created on first use. After a failed
+    connect, calls raise at once for MONGO_RETRY_SECONDS instead of waiting
+    for the server again.
+    """
+    global _store, _store_failed
+    with _store_lock:
+        if _store is None:
+            if _store_failed is not None and time.monotonic() - _store_failed < MONGO_RETRY_SECONDS:
+                raise RuntimeError("MongoDB was unreachable moments ago; not retrying yet")
+            try:
+                _store = TranscriptStore()
+            except Exception:
+                _store_failed = time.monotonic()
+                raise
+        return _store
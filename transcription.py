@@ -1,15 +1,265 @@
+import asyncio
+import io
 import os
-import wave
-import tempfile
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq
+
+from audio_encoding import wav_upload, pcm_to_wav_bytes
 
 # Load your Groq API key from .env
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# Initialize the Groq client
-client = Groq(api_key=GROQ_API_KEY)
+# Which engine transcribe_audio uses: "groq" (cloud) or "local" (faster-whisper on CPU)
+TRANSCRIBER_BACKEND = os.getenv("TRANSCRIBER_BACKEND", "groq")
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+
+# Coalesce short segments into one Whisper request (async callers only)
+WHISPER_BATCHING = os.getenv("WHISPER_BATCHING", "1") == "1"
+
+
+class Transcriber(ABC):
+    """Speech-to-text engine. Implementations load their model/client once and are reused across segments."""
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self,
+                   audio_chunk: bytes,
+                   sample_rate: int = 16000,
+                   prompt: str = "",
+                   language: str = "auto",
+                   translate: bool = False) -> str | None:
+        """Text of one PCM segment, or None if the engine failed."""
+
+    async def atranscribe(self,
+                          audio_chunk: bytes,
+                          sample_rate: int = 16000,
+                          prompt: str = "",
+                          language: str = "auto",
+                          translate: bool = False) -> str | None:
+        """Async variant. Engines without a native async client run transcribe() in a worker thread."""
+        return await asyncio.to_thread(self.transcribe, audio_chunk, sample_rate, prompt, language, translate)
+
+    @abstractmethod
+    def transcribe_timestamped(self,
+                               audio_chunk: bytes,
+                               sample_rate: int = 16000,
+                               prompt: str = "",
+                               language: str = "auto",
+                               translate: bool = False) -> list | None:
+        """
+        Like transcribe(), but returns [(start_s, end_s, text, words)] per Whisper
+        segment, where words is [(start_s, end_s, word)] (empty if the engine
+        only has segment times). Used to split batched requests (see transcription_batching.py).
+        """
+
+    async def atranscribe_timestamped(self,
+                                      audio_chunk: bytes,
+                                      sample_rate: int = 16000,
+                                      prompt: str = "",
+                                      language: str = "auto",
+                                      translate: bool = False) -> list | None:
+        return await asyncio.to_thread(self.transcribe_timestamped, audio_chunk, sample_rate, prompt, language, translate)
+
+    async def aclose(self) -> None:
+        """Release async resources bound to the running event loop."""
+
+
+class GroqTranscriber(Transcriber):
+    """Groq-hosted Whisper (whisper-large-v3-turbo, or whisper-large-v3 for translation)."""
+
+    name = "groq"
+
+    def __init__(self, api_key: str | None = None):
+        self.api_key = api_key or GROQ_API_KEY
+        self.client = Groq(api_key=self.api_key)
+        self._async_clients = {}  # event loop -> AsyncGroq (its HTTP pool is bound to one loop)
+
+    @staticmethod
+    def _request(audio_chunk, sample_rate, prompt, language, translate, timestamped=False):
+        """(is_translation, create() kwargs) for one segment."""
+        # Select model based on translate flag
+        kwargs = {
+            # Wrap the PCM in a WAV header in memory; no temp file round trip
+            "file": wav_upload(audio_chunk, sample_rate),
+            "model": "whisper-large-v3" if translate else "whisper-large-v3-turbo",
+            "prompt": prompt,
+            "response_format": "verbose_json" if timestamped else "text",
+            "temperature": 0.0,
+        }
+        if not translate:
+            kwargs["language"] = None if language == "auto" else language
+            if timestamped:
+                kwargs["timestamp_granularities"] = ["segment", "word"]
+        return translate, kwargs
+
+    @staticmethod
+    def _text(result):
+        # Handle the response
+        if isinstance(result, str):
+            return result.strip()
+        else:
+            return getattr(result, "text", str(result)).strip()
+
+    @staticmethod
+    def _segments(result):
+        """verbose_json response → [(start, end, text, words)]; words are spread over segments by time."""
+        def field(obj, name):
+            return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+        words = [(field(w, "start"), field(w, "end"), field(w, "word").strip()) for w in field(result, "words") or []]
+        segments = []
+        for seg in field(result, "segments") or []:
+            start, end = field(seg, "start"), field(seg, "end")
+            inside = [w for w in words if start <= (w[0] + w[1]) / 2 <= end]
+            segments.append((start, end, field(seg, "text").strip(), inside))
+        return segments
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = AsyncGroq(api_key=self.api_key)
+        return client
+
+    def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        try:
+            translate, kwargs = self._request(audio_chunk, sample_rate, prompt, language, translate)
+            audio = self.client.audio.translations if translate else self.client.audio.transcriptions
+            return self._text(audio.create(**kwargs))
+
+        except Exception as e:
+            print(f"[ERROR] Groq Transcription failed: {e}")
+            return None
+
+    async def atranscribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        client = self._async_client()
+        try:
+            translate, kwargs = self._request(audio_chunk, sample_rate, prompt, language, translate)
+            audio = client.audio.translations if translate else client.audio.transcriptions
+            return self._text(await audio.create(**kwargs))
+
+        except Exception as e:
+            print(f"[ERROR] Groq Transcription failed: {e}")
+            return None
+
+    def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        try:
+            translate, kwargs = self._request(audio_chunk, sample_rate, prompt, language, translate, timestamped=True)
+            audio = self.client.audio.translations if translate else self.client.audio.transcriptions
+            return self._segments(audio.create(**kwargs))
+
+        except Exception as e:
+            print(f"[ERROR] Groq Transcription failed: {e}")
+            return None
+
+    async def atranscribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto",
+                                      translate=False):
+        client = self._async_client()
+        try:
+            translate, kwargs = self._request(audio_chunk, sample_rate, prompt, language, translate, timestamped=True)
+            audio = client.audio.translations if translate else client.audio.transcriptions
+            return self._segments(await audio.create(**kwargs))
+
+        except Exception as e:
+            print(f"[ERROR] Groq Transcription failed: {e}")
+            return None
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class LocalWhisperTranscriber(Transcriber):
+    """
+    Offline Whisper on the CPU via faster-whisper (CTranslate2, int8 by default).
+    Needs `pip install faster-whisper`; the model is downloaded on first use.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size: str = LOCAL_WHISPER_MODEL, compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("TRANSCRIBER_BACKEND=local requires faster-whisper (pip install faster-whisper)") from e
+
+        print(f"[INFO] Loading local Whisper model '{model_size}' ({compute_type})...")
+        self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type)
+
+    def _run(self, audio_chunk, sample_rate, prompt, language, translate, word_timestamps=False):
+        if sample_rate == 16000:
+            audio = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        else:
+            # Let faster-whisper decode and resample a WAV instead
+            audio = io.BytesIO(pcm_to_wav_bytes(audio_chunk, sample_rate))
+
+        segments, _ = self.model.transcribe(
+            audio,
+            language=None if language == "auto" else language,
+            task="translate" if translate else "transcribe",
+            initial_prompt=prompt or None,
+            temperature=0.0,
+            beam_size=1,
+            word_timestamps=word_timestamps
+        )
+        return segments
+
+    def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        try:
+            segments = self._run(audio_chunk, sample_rate, prompt, language, translate)
+            return " ".join(s.text.strip() for s in segments).strip()
+
+        except Exception as e:
+            print(f"[ERROR] Local Transcription failed: {e}")
+            return None
+
+    def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        try:
+            segments = self._run(audio_chunk, sample_rate, prompt, language, translate, word_timestamps=True)
+            return [(s.start, s.end, s.text.strip(), [(w.start, w.end, w.word.strip()) for w in s.words or []])
+                    for s in segments]
+
+        except Exception as e:
+            print(f"[ERROR] Local Transcription failed: {e}")
+            return None
+
+
+TRANSCRIBERS = {
+    "groq": GroqTranscriber,
+    "local": LocalWhisperTranscriber,
+}
+
+_transcriber = None
+_transcriber_backend = None
+_transcriber_lock = threading.Lock()
+
+
+def get_transcriber(backend: str | None = None) -> Transcriber:
+    """
+    Shared transcriber for the configured backend, created on first call.
+    Call it at startup so model loading doesn't land on the first segment.
+    With WHISPER_BATCHING=1, short segments are coalesced (see transcription_batching.py).
+    """
+    global _transcriber, _transcriber_backend
+    backend = backend or TRANSCRIBER_BACKEND
+    with _transcriber_lock:
+        if _transcriber is None or _transcriber_backend != backend:
+            if backend not in TRANSCRIBERS:
+                raise ValueError(f"Unknown TRANSCRIBER_BACKEND '{backend}', expected one of {list(TRANSCRIBERS)}")
+            _transcriber = TRANSCRIBERS[backend]()
+            _transcriber_backend = backend
+            if WHISPER_BATCHING:
+                from transcription_batching import BatchingTranscriber
+                _transcriber = BatchingTranscriber(_transcriber)
+        return _transcriber
+
 
 def transcribe_audio(audio_chunk: bytes,
                      sample_rate: int = 16000,
@@ -17,7 +267,7 @@ def transcribe_audio(audio_chunk: bytes,
                      language: str = "auto",
                      translate: bool = False) -> str | None:
     """
-    Transcribes or translates audio using Groq's Whisper API.
+    Transcribes or translates audio with the configured backend (see TRANSCRIBER_BACKEND).
     Parameters:
         audio_chunk (bytes): Raw PCM audio data.
         sample_rate (int): Sampling rate of the audio.
@@ -27,53 +277,4 @@ def transcribe_audio(audio_chunk: bytes,
     Returns:
         str | None: Transcribed or translated text.
     """
-    tmp_path = None
-    try:
-        # Create a temporary WAV file
-        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        tmp_path = tmp_file.name
-        tmp_file.close()
-
-        # Write audio data to the WAV file
-        with wave.open(tmp_path, "wb") as wf:
-            wf.setnchannels(1)             # mono
-            wf.setsampwidth(2)             # 16-bit PCM
-            wf.setframerate(sample_rate)   # e.g., 16000 Hz
-            wf.writeframes(audio_chunk)
-
-        # Select model based on translate flag
-        model_name = "whisper-large-v3" if translate else "whisper-large-v3-turbo"
-
-        # Open the temp file and send to Groq
-        with open(tmp_path, "rb") as audio_file:
-            if translate:
-                result = client.audio.translations.create(
-                    file=audio_file,
-                    model=model_name,
-                    prompt=prompt,
-                    response_format="text",
-                    temperature=0.0
-                )
-            else:
-                result = client.audio.transcriptions.create(
-                    file=audio_file,
-                    model=model_name,
-                    prompt=prompt,
-                    response_format="text",
-                    temperature=0.0,
-                    language=None if language == "auto" else language
-                )
-
-        # Handle the response
-        if isinstance(result, str):
-            return result.strip()
-        else:
-            return getattr(result, "text", str(result)).strip()
-
-    except Exception as e:
-        print(f"[ERROR] Groq Transcription failed: {e}")
-        return None
-
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
\ No newline at end of file
+    return get_transcriber().transcribe(audio_chunk, sample_rate, prompt, language, translate)
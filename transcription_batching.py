@@ -0,0 +1,183 @@
+# transcription_batching.py
+
+import asyncio
+import os
+
+from prompt_context import merge_prompts
+from transcription import Transcriber
+
+WHISPER_BATCH_WINDOW_MS = float(os.getenv("WHISPER_BATCH_WINDOW_MS", "150"))
+WHISPER_BATCH_MAX_SEGMENT_SECONDS = float(os.getenv("WHISPER_BATCH_MAX_SEGMENT_SECONDS", "2.0"))
+WHISPER_BATCH_MAX_SECONDS = float(os.getenv("WHISPER_BATCH_MAX_SECONDS", "30"))
+WHISPER_BATCH_MARKER_MS = float(os.getenv("WHISPER_BATCH_MARKER_MS", "1000"))
+
+
+def split_by_spans(segments: list, spans: list, tolerance: float = 0.25) -> list:
+    """
+    Distribute a timestamped transcript of concatenated audio back to its pieces.
+
+    segments: [(start, end, text, words)] from Transcriber.transcribe_timestamped
+    spans:    [(start, end)] of each piece inside the concatenated audio
+    A segment lying within one span (± tolerance) goes to it whole, keeping its
+    punctuation; one straddling a marker gap is split by word midpoints. Text
+    whose midpoint falls in a gap (e.g. Whisper hallucinating over silence) is dropped.
+    """
+    def owner(start, end):
+        mid = (start + end) / 2
+        for i, (s, e) in enumerate(spans):
+            if s <= mid <= e:
+                return i
+        return None
+
+    parts = [[] for _ in spans]
+    for start, end, text, words in segments:
+        i = owner(start, end)
+        if i is not None and start >= spans[i][0] - tolerance and end <= spans[i][1] + tolerance:
+            parts[i].append(text)
+            continue
+        for w_start, w_end, word in words:
+            j = owner(w_start, w_end)
+            if j is not None:
+                parts[j].append(word)
+        if not words and i is not None:
+            parts[i].append(text)
+    return [" ".join(p).strip() for p in parts]
+
+
+class _Batch:
+    __slots__ = ("items", "seconds", "timer")
+
+    def __init__(self):
+        self.items = []   # (pcm, prompt, future)
+        self.seconds = 0.0
+        self.timer = None
+
+
+class BatchingTranscriber(Transcriber):
+    """
+    Coalesces short segments arriving within `window_ms` of each other, from
+    any session on the same event loop, into one Whisper request: the pieces
+    are joined with marker silence and the timestamped result is split back
+    per piece (split_by_spans). Each session's rolling prompt (PromptContext)
+    differs, so a batch sends one merged prompt: every piece's glossary terms
+    plus the first piece's transcript tail (merge_prompts); a piece that ends
+    up alone keeps its own. Longer segments and sync calls go straight to the
+    wrapped engine. If a batch fails, its pieces are retried one by one.
+    """
+
+    def __init__(self,
+                 inner: Transcriber,
+                 window_ms: float = WHISPER_BATCH_WINDOW_MS,
+                 max_segment_seconds: float = WHISPER_BATCH_MAX_SEGMENT_SECONDS,
+                 max_batch_seconds: float = WHISPER_BATCH_MAX_SECONDS,
+                 marker_ms: float = WHISPER_BATCH_MARKER_MS):
+        self.inner = inner
+        self.name = f"{inner.name}+batching"
+        self.window = window_ms / 1000
+        self.max_segment_seconds = max_segment_seconds
+        self.max_batch_seconds = max_batch_seconds
+        self.marker_seconds = marker_ms / 1000
+        self._pending = {}  # event loop -> {(sample_rate, language, translate): _Batch}
+        self.counts = {"requests": 0, "batched_segments": 0, "direct_segments": 0, "fallbacks": 0}
+
+    def transcribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        return self.inner.transcribe(audio_chunk, sample_rate, prompt, language, translate)
+
+    def transcribe_timestamped(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        return self.inner.transcribe_timestamped(audio_chunk, sample_rate, prompt, language, translate)
+
+    async def atranscribe(self, audio_chunk, sample_rate=16000, prompt="", language="auto", translate=False):
+        seconds = len(audio_chunk) / (sample_rate * 2)
+        if seconds > self.max_segment_seconds:
+            self.counts["requests"] += 1
+            self.counts["direct_segments"] += 1
+            return await self.inner.atranscribe(audio_chunk, sample_rate, prompt, language, translate)
+
+        loop = asyncio.get_running_loop()
+        key = (sample_rate, language, translate)
+        batches = self._pending.setdefault(loop, {})
+        batch = batches.get(key)
+        if batch is None:
+            batch = batches[key] = _Batch()
+            batch.timer = loop.call_later(self.window, self._flush, loop, key)
+
+        future = loop.create_future()
+        batch.items.append((audio_chunk, prompt, future))
+        batch.seconds += seconds + self.marker_seconds
+        if batch.seconds >= self.max_batch_seconds:
+            batch.timer.cancel()
+            self._flush(loop, key)
+        return await future
+
+    def _flush(self, loop, key):
+        batch = self._pending.get(loop, {}).pop(key, None)
+        if batch is not None:
+            loop.create_task(self._run(batch, *key))
+
+    async def _run(self, batch, sample_rate, language, translate):
+        items = [item for item in batch.items if not item[2].done()]  # callers may have been cancelled
+        if not items:
+            return
+        self.counts["requests"] += 1
+        if len(items) == 1:
+            pcm, prompt, future = items[0]
+            self.counts["direct_segments"] += 1
+            _resolve(future, self.inner.atranscribe(pcm, sample_rate, prompt, language, translate))
+            return
+
+        marker = b"\x00" * (int(self.marker_seconds * sample_rate) * 2)
+        spans, pieces, offset = [], [], 0.0
+        for pcm, _, _ in items:
+            duration = len(pcm) / (sample_rate * 2)
+            spans.append((offset, offset + duration))
+            pieces.append(pcm)
+            offset += duration + self.marker_seconds
+        audio = marker.join(pieces)
+        prompt = merge_prompts([p for _, p, _ in items])
+
+        try:
+            segments = await self.inner.atranscribe_timestamped(audio, sample_rate, prompt, language, translate)
+        except Exception as e:
+            print(f"[WARN] Batched transcription failed: {e}")
+            segments = None
+
+        if segments is None:
+            # Don't lose the segments: fall back to one request each
+            self.counts["fallbacks"] += 1
+            self.counts["requests"] += len(items)
+            for pcm, prompt, future in items:
+                _resolve(future, self.inner.atranscribe(pcm, sample_rate, prompt, language, translate))
+            return
+
+        self.counts["batched_segments"] += len(items)
+        for (_, _, future), text in zip(items, split_by_spans(segments, spans)):
+            if not future.done():
+                future.set_result(text or None)
+
+    async def aclose(self):
+        for batch in self._pending.pop(asyncio.get_running_loop(), {}).values():
+            batch.timer.cancel()
+            for _, _, future in batch.items:
+                future.cancel()
+        await self.inner.aclose()
+
+    def stats(self) -> dict:
+        segments = self.counts["batched_segments"] + self.counts["direct_segments"]
+        return {**self.counts, "segments_per_request": segments / self.counts["requests"] if self.counts["requests"] else 0.0}
+
+
+def _resolve(future, coro):
+    """Run coro as a task and copy its outcome into future."""
+    task = asyncio.ensure_future(coro)
+
+    def done(t):
+        if future.done():
+            return
+        if t.cancelled():
+            future.cancel()
+        elif t.exception() is not None:
+            future.set_exception(t.exception())
+        else:
+            future.set_result(t.result())
+
+    task.add_done_callback(done)
@@ -1,10 +1,36 @@
 # translation.py
 
+import threading
+
+import requests
 from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests
+
+from http_client import with_retries
+
+# Transient failures worth retrying; anything else (bad language, empty text) fails fast
+RETRYABLE_ERRORS = (RequestError, TooManyRequests, requests.RequestException)
+
+_local = threading.local()
+
+
+def get_translator(target_language: str, source_language: str = "auto") -> GoogleTranslator:
+    """
+    One GoogleTranslator per language pair and thread, built on first use. translate()
+    keeps the text in the instance's request parameters, so an instance must not be
+    shared by threads. (deep_translator issues its own requests.get calls, so it
+    can't share http_client's pool.)
+    """
+    translators = _local.__dict__.setdefault("translators", {})
+    key = (target_language, source_language)
+    if key not in translators:
+        translators[key] = GoogleTranslator(source=source_language, target=target_language)
+    return translators[key]
+
 
 def translate_text(text: str, target_language: str = "es") -> str:
     try:
-        return GoogleTranslator(source='auto', target=target_language).translate(text)
+        return with_retries(get_translator(target_language).translate, text, retry_on=RETRYABLE_ERRORS)
     except Exception as e:
         print(f"[ERROR] Translation failed: {e}")
-        return text
\ No newline at end of file
+        return text
@@ -0,0 +1,173 @@
+# tts_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hearsay", "tts"))
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", "32"))
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "512"))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace and Unicode variants so trivially different transcripts share an entry.
+    Case and punctuation are kept: they change how the voice reads the line.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(text: str, voice_id: str, model_id: str, voice_settings: dict, output_format: str) -> str:
+    """Content address of one synthesized clip."""
+    payload = json.dumps(
+        [normalize_text(text), voice_id, model_id, voice_settings, output_format],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache for synthesized audio: an in-memory LRU bounded by bytes, in
+    front of an on-disk directory (one file per key) also bounded by bytes and
+    evicted least-recently-used first. Disk hits are promoted into memory.
+    """
+
+    def __init__(self,
+                 disk_dir: str | None = TTS_CACHE_DIR,
+                 max_memory_bytes: int = int(TTS_CACHE_MEMORY_MB * 1024 * 1024),
+                 max_disk_bytes: int = int(TTS_CACHE_DISK_MB * 1024 * 1024)):
+        self.disk_dir = disk_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()  # key -> bytes, least recently used first
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # key -> size on disk, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bytes_saved": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if os.path.isfile(path) and not name.endswith(".tmp"):
+                st = os.stat(path)
+                entries.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_bytes += size
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    # ─── Lookup / store ─────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                self._counts["bytes_saved"] += len(data)
+                return data
+            on_disk = self.disk_dir and key in self._disk
+
+        data = None
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                data = None
+
+        with self._lock:
+            if data is None:
+                self._counts["misses"] += 1
+                return None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._counts["disk_hits"] += 1
+            self._counts["bytes_saved"] += len(data)
+            self._remember(key, data)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, data)
+            if not self.disk_dir or key in self._disk or len(data) > self.max_disk_bytes:
+                return
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            evicted = self._evict_disk()
+
+        try:
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"[WARN] TTS cache write failed: {e}")
+        for old in evicted:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _evict_disk(self):
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    # ─── Metrics ────────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._counts["memory_hits"] + self._counts["disk_hits"]
+            lookups = hits + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "entries": len(self._disk) if self.disk_dir else len(self._memory),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Shared cache instance, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache()
+        return _cache
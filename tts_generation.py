@@ -1,51 +1,180 @@
 # tts_generation.py
 
+import asyncio
 import os
-import requests
 from dotenv import load_dotenv
 
+from http_client import session, async_request, HTTP_TIMEOUT_SECONDS
+from tts_cache import get_tts_cache, cache_key
+
 load_dotenv()
 
 ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 DEFAULT_VOICE_ID = os.getenv("TTS_VOICE_ID")
 TARGET_LANGUAGE = os.getenv("TARGET_LANGUAGE", "en")
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")
+
+# Stream raw PCM and start playback on the first bytes instead of downloading and decoding a whole MP3
+TTS_STREAMING = os.getenv("TTS_STREAMING", "1") == "1"
+TTS_SAMPLE_RATE = 16000
+TTS_MODEL_ID = "eleven_flash_v2_5"
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.7
+}
+
+# Reuse audio for repeated phrases instead of paying ElevenLabs again (see tts_cache.py)
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") == "1"
 
 if not ELEVEN_API_KEY:
     raise RuntimeError("ELEVENLABS_API_KEY not set in .env")
 if not DEFAULT_VOICE_ID:
     raise RuntimeError("TTS_VOICE_ID not set in .env")
 
-def generate_audio(text: str, voice_id: str = None) -> bytes | None:
-    """
-    Send polished text to ElevenLabs and return the full audio container as bytes.
-    Dynamically accepts voice_id for flexibility.
-    Falls back to language-specific mapping if not provided.
-    """
-    # Use provided voice_id, or select based on language map
+def _tts_request(text: str, voice_id: str = None):
+    """(url, headers, json body) for an ElevenLabs streaming TTS call."""
     if voice_id is None:
         voice_id = DEFAULT_VOICE_ID
 
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
+    url = f"{ELEVENLABS_BASE_URL}/v1/text-to-speech/{voice_id}/stream"
     headers = {
         "xi-api-key": ELEVEN_API_KEY,
         "Content-Type": "application/json"
     }
     body = {
         "text": text,
-        "model_id": "eleven_flash_v2_5",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.7
-        }
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": TTS_VOICE_SETTINGS
     }
+    return url, headers, body
+
+
+def _cache_key(text: str, voice_id: str, output_format: str) -> str | None:
+    if not TTS_CACHE_ENABLED:
+        return None
+    return cache_key(text, voice_id or DEFAULT_VOICE_ID, TTS_MODEL_ID, TTS_VOICE_SETTINGS, output_format)
+
+
+def generate_audio(text: str, voice_id: str = None) -> bytes | None:
+    """
+    Send polished text to ElevenLabs and return the full audio container as bytes.
+    Dynamically accepts voice_id for flexibility.
+    Falls back to language-specific mapping if not provided.
+    """
+    key = _cache_key(text, voice_id, "mp3")
+    if key and (cached := get_tts_cache().get(key)):
+        return cached
+
+    url, headers, body = _tts_request(text, voice_id)
 
     try:
-        resp = requests.post(url, headers=headers, json=body, timeout=10)
+        resp = session().post(url, headers=headers, json=body, timeout=HTTP_TIMEOUT_SECONDS)
         if resp.status_code == 200:
+            if key:
+                get_tts_cache().put(key, resp.content)
             return resp.content
         else:
             print(f"[ERROR] TTS failed {resp.status_code}: {resp.text}")
             return None
     except Exception as e:
         print(f"[ERROR] TTS exception: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def stream_audio(text: str, voice_id: str = None, chunk_size: int = 4096):
+    """
+    Start an ElevenLabs streaming request for 16 kHz 16-bit mono PCM and return an
+    iterator over the audio bytes as they arrive, or None if the request failed.
+    The request is sent (and its status checked) before this returns, so callers
+    can kick it off early and hand the iterator to playback later.
+    """
+    key = _cache_key(text, voice_id, f"pcm_{TTS_SAMPLE_RATE}")
+    if key and (cached := get_tts_cache().get(key)):
+        return (cached[i:i + chunk_size] for i in range(0, len(cached), chunk_size))
+
+    url, headers, body = _tts_request(text, voice_id)
+
+    try:
+        resp = session().post(url, headers=headers, json=body, params={"output_format": f"pcm_{TTS_SAMPLE_RATE}"},
+                              stream=True, timeout=HTTP_TIMEOUT_SECONDS)
+        if resp.status_code != 200:
+            print(f"[ERROR] TTS failed {resp.status_code}: {resp.text}")
+            resp.close()
+            return None
+    except Exception as e:
+        print(f"[ERROR] TTS exception: {e}")
+        return None
+
+    def chunks():
+        received = bytearray()
+        try:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    received += chunk
+                    yield chunk
+            # Only complete clips are cached; an interrupted stream is never stored
+            if key:
+                get_tts_cache().put(key, bytes(received))
+        except Exception as e:
+            print(f"[ERROR] TTS stream interrupted: {e}")
+        finally:
+            resp.close()
+
+    return chunks()
+
+
+async def astream_audio(text: str, voice_id: str = None, chunk_size: int = 4096):
+    """
+    Async twin of stream_audio on the pooled httpx client: returns an async
+    iterator over PCM bytes once the response status is known, or None.
+    429/5xx responses are retried with backoff (async_request).
+    """
+    key = _cache_key(text, voice_id, f"pcm_{TTS_SAMPLE_RATE}")
+    if key and (cached := get_tts_cache().get(key)):
+        async def cached_chunks():
+            for i in range(0, len(cached), chunk_size):
+                yield cached[i:i + chunk_size]
+        return cached_chunks()
+
+    url, headers, body = _tts_request(text, voice_id)
+
+    try:
+        resp = await async_request("POST", url, stream=True, headers=headers, json=body,
+                                   params={"output_format": f"pcm_{TTS_SAMPLE_RATE}"})
+        if resp.status_code != 200:
+            await resp.aread()
+            print(f"[ERROR] TTS failed {resp.status_code}: {resp.text}")
+            await resp.aclose()
+            return None
+    except Exception as e:
+        print(f"[ERROR] TTS exception: {e}")
+        return None
+
+    async def chunks():
+        received = bytearray()
+        try:
+            async for chunk in resp.aiter_bytes(chunk_size):
+                received += chunk
+                yield chunk
+            if key:
+                get_tts_cache().put(key, bytes(received))
+        except Exception as e:
+            print(f"[ERROR] TTS stream interrupted: {e}")
+        finally:
+            await resp.aclose()
+
+    return chunks()
+
+
+def synthesize(text: str, voice_id: str = None):
+    """TTS in whichever form TTS_STREAMING selects: a PCM chunk iterator, or full MP3 bytes."""
+    if TTS_STREAMING:
+        return stream_audio(text, voice_id=voice_id)
+    return generate_audio(text, voice_id=voice_id)
+
+
+async def asynthesize(text: str, voice_id: str = None):
+    """Async synthesize(): an async PCM chunk iterator, or full MP3 bytes when TTS_STREAMING=0."""
+    if TTS_STREAMING:
+        return await astream_audio(text, voice_id=voice_id)
+    return await asyncio.to_thread(generate_audio, text, voice_id)
@@ -0,0 +1,267 @@
+# vad.py
+
+import os
+
+import numpy as np
+
+FULL_SCALE = 32768.0  # max amplitude of 16-bit PCM, same reference pydub uses for dBFS
+
+ADAPTIVE_SILENCE = os.getenv("ADAPTIVE_SILENCE", "1") == "1"
+NOISE_WINDOW_SECONDS = float(os.getenv("NOISE_WINDOW_SECONDS", "10"))
+NOISE_PERCENTILE = float(os.getenv("NOISE_PERCENTILE", "10"))    # quietest 10% of frames ≈ the room, not the speaker
+NOISE_MARGIN_DB = float(os.getenv("NOISE_MARGIN_DB", "10"))      # silence threshold = noise floor + margin
+SILENCE_THRESH_MIN_DBFS = float(os.getenv("SILENCE_THRESH_MIN_DBFS", "-65"))
+SILENCE_THRESH_MAX_DBFS = float(os.getenv("SILENCE_THRESH_MAX_DBFS", "-25"))
+
+
+def frame_dbfs(frames: np.ndarray) -> np.ndarray:
+    """
+    Per-row loudness in dBFS for a 2D int16 array of shape (n_frames, frame_samples).
+    Digital silence comes back as -inf, matching pydub's AudioSegment.dBFS.
+    """
+    samples = frames.astype(np.float32)
+    mean_square = np.mean(samples * samples, axis=1)
+    with np.errstate(divide="ignore"):
+        return 10.0 * np.log10(mean_square / (FULL_SCALE * FULL_SCALE))
+
+
+class NoiseFloorTracker:
+    """
+    Running noise-floor estimate from the frame energies the VAD already
+    computes: the `percentile`-th percentile of the last `window_seconds` of
+    frames, kept as a 1 dB histogram plus a ring of each frame's bin, so adding
+    a frame and expiring the oldest is O(1) and the percentile is a scan of
+    ~100 bins per chunk. The silence threshold follows at floor + `margin_db`,
+    clamped to [min_thresh, max_thresh]; until one second has been seen it
+    stays at `initial_thresh`.
+    """
+
+    LOW_DBFS = -100.0  # energies below (including digital silence) land in the first bin
+
+    def __init__(self,
+                 initial_thresh: float = -40,
+                 frame_ms: int = 10,
+                 window_seconds: float = NOISE_WINDOW_SECONDS,
+                 percentile: float = NOISE_PERCENTILE,
+                 margin_db: float = NOISE_MARGIN_DB,
+                 min_thresh: float = SILENCE_THRESH_MIN_DBFS,
+                 max_thresh: float = SILENCE_THRESH_MAX_DBFS):
+        self.quantile = percentile / 100
+        self.margin_db = margin_db
+        self.min_thresh = min_thresh
+        self.max_thresh = max_thresh
+        self.warmup_frames = 1000 // frame_ms
+        self.threshold = initial_thresh
+        self.floor = None
+
+        self._window = max(int(window_seconds * 1000 // frame_ms), 1)
+        self._ring = np.zeros(self._window, dtype=np.int16)
+        self._hist = np.zeros(int(-self.LOW_DBFS) + 1, dtype=np.int64)
+        self._seen = 0
+
+    def update(self, energies: np.ndarray) -> float:
+        """Fold in frame energies (dBFS, oldest first); returns the current silence threshold."""
+        for start in range(0, len(energies), self._window):
+            self._add(energies[start:start + self._window])
+        if self._seen < self.warmup_frames:
+            return self.threshold
+
+        rank = self.quantile * min(self._seen, self._window)
+        self.floor = self.LOW_DBFS + int(np.searchsorted(np.cumsum(self._hist), rank)) + 0.5
+        self.threshold = min(max(self.floor + self.margin_db, self.min_thresh), self.max_thresh)
+        return self.threshold
+
+    def _add(self, energies):
+        bins = np.clip(energies - self.LOW_DBFS, 0, len(self._hist) - 1).astype(np.int16)
+        n = len(bins)
+        slots = np.arange(self._seen, self._seen + n) % self._window
+        # A slot only holds an expiring frame once the window has filled past it
+        expiring = np.arange(self._seen, self._seen + n) >= self._window
+        np.subtract.at(self._hist, self._ring[slots[expiring]], 1)
+        np.add.at(self._hist, bins, 1)
+        self._ring[slots] = bins
+        self._seen += n
+
+
+class StreamingVAD:
+    """
+    Incremental silence detector for 16-bit mono PCM.
+
+    Each pushed chunk is cut into fixed frames (10 ms by default) whose dBFS is
+    written into a preallocated NumPy ring buffer. The length of the current run
+    of silent frames is kept as a counter, so asking "has the speaker paused for
+    MIN_SILENCE_MS?" costs O(chunk) no matter how long the buffer has grown.
+
+    Frame positions are absolute (counted since the VAD was created). `origin`
+    marks where the current segment starts; the speech/pause queries below
+    return frame offsets relative to it, and `consume()` moves it forward once
+    the caller has cut audio off the front of its buffer.
+
+    With a NoiseFloorTracker, `silence_thresh` follows the room's noise floor
+    instead of staying at the value it was created with.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 silence_thresh: float = -40,
+                 min_silence_ms: int = 700,
+                 min_pause_ms: int = 200,
+                 frame_ms: int = 10,
+                 capacity_seconds: float = 30,
+                 noise_floor: NoiseFloorTracker | None = None):
+        self.sample_rate = sample_rate
+        self.silence_thresh = silence_thresh
+        self.noise_floor = noise_floor
+        self.min_silence_ms = min_silence_ms
+        self.min_pause_ms = min_pause_ms
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+
+        self.capacity = int(capacity_seconds * 1000 // frame_ms)
+        self._energy = np.full(self.capacity, -np.inf, dtype=np.float32)
+        self._pending = np.zeros(self.frame_samples, dtype=np.int16)
+        self._pending_len = 0
+
+        self.frames_seen = 0
+        self.trailing_silent_frames = 0
+        self.origin = 0
+        self._first_speech = None   # absolute frame index
+        self._last_speech = None    # absolute frame index
+        self._last_pause = None     # (start, end) absolute frame indices
+
+    # ─── Feeding ────────────────────────────────────────────────────────────────
+
+    def push(self, chunk: bytes) -> None:
+        """Feed raw PCM bytes. Only the frames completed by this chunk are analysed."""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+
+        # Complete a partial frame left over from the previous chunk first
+        if self._pending_len:
+            needed = self.frame_samples - self._pending_len
+            take = samples[:needed]
+            self._pending[self._pending_len:self._pending_len + len(take)] = take
+            self._pending_len += len(take)
+            samples = samples[len(take):]
+            if self._pending_len < self.frame_samples:
+                return
+            self._add_frames(self._pending.reshape(1, -1))
+            self._pending_len = 0
+
+        n_full = len(samples) // self.frame_samples
+        if n_full:
+            self._add_frames(samples[:n_full * self.frame_samples].reshape(n_full, self.frame_samples))
+
+        leftover = samples[n_full * self.frame_samples:]
+        self._pending[:len(leftover)] = leftover
+        self._pending_len = len(leftover)
+
+    def _add_frames(self, frames: np.ndarray) -> None:
+        energies = frame_dbfs(frames)
+        if self.noise_floor is not None:
+            self.silence_thresh = self.noise_floor.update(energies)
+        n = len(energies)
+        base = self.frames_seen
+
+        # Write into the ring, wrapping around the end if needed
+        start = self.frames_seen % self.capacity
+        if n >= self.capacity:
+            idx = np.arange(self.frames_seen + n - self.capacity, self.frames_seen + n) % self.capacity
+            self._energy[idx] = energies[-self.capacity:]
+        else:
+            first = min(n, self.capacity - start)
+            self._energy[start:start + first] = energies[:first]
+            self._energy[:n - first] = energies[first:]
+        self.frames_seen += n
+
+        loud = np.flatnonzero(energies >= self.silence_thresh)
+        if len(loud) == 0:
+            self.trailing_silent_frames += n
+            return
+
+        if self._first_speech is None:
+            self._first_speech = base + int(loud[0])
+        self._last_speech = base + int(loud[-1])
+
+        # Silent run that ends right before each loud frame; remember the latest long one
+        gaps = np.diff(np.concatenate(([-1 - self.trailing_silent_frames], loud))) - 1
+        long_gaps = np.flatnonzero(gaps * self.frame_ms >= self.min_pause_ms)
+        if len(long_gaps):
+            i = long_gaps[-1]
+            end = base + int(loud[i])
+            self._last_pause = (end - int(gaps[i]), end)
+
+        self.trailing_silent_frames = n - 1 - int(loud[-1])
+
+    def reset(self) -> None:
+        """Forget the current segment entirely (call after the whole buffer has been flushed)."""
+        self._pending_len = 0
+        self.trailing_silent_frames = 0
+        self.origin = self.frames_seen
+        self._first_speech = None
+        self._last_speech = None
+        self._last_pause = None
+
+    def consume(self, n_frames: int) -> None:
+        """Drop the first `n_frames` of the current segment; the rest becomes the new segment."""
+        self.origin = min(self.origin + n_frames, self.frames_seen)
+        if self._last_pause and self._last_pause[1] <= self.origin:
+            self._last_pause = None
+        if self._last_speech is None or self._last_speech < self.origin:
+            self._first_speech = self._last_speech = None
+        elif self._first_speech < self.origin:
+            # Rescan only the frames left in the segment (bounded by the ring size)
+            start = max(self.origin, self.frames_seen - self.capacity)
+            energies = self.recent_dbfs(self.frames_seen - start)
+            loud = np.flatnonzero(energies >= self.silence_thresh)
+            self._first_speech = start + int(loud[0]) if len(loud) else self._last_speech
+
+    # ─── Queries ────────────────────────────────────────────────────────────────
+
+    @property
+    def trailing_silence_ms(self) -> int:
+        return self.trailing_silent_frames * self.frame_ms
+
+    def has_trailing_silence(self, min_silence_ms: int | None = None) -> bool:
+        """True once the most recent audio has been silent for at least `min_silence_ms`."""
+        if min_silence_ms is None:
+            min_silence_ms = self.min_silence_ms
+        return self.trailing_silence_ms >= min_silence_ms
+
+    @property
+    def segment_frames(self) -> int:
+        """Complete frames in the current segment (a partial frame may still be pending)."""
+        return self.frames_seen - self.origin
+
+    def speech_bounds(self) -> tuple[int, int] | None:
+        """(first loud frame, one past the last loud frame) relative to `origin`, or None if all silent."""
+        if self._first_speech is None:
+            return None
+        return self._first_speech - self.origin, self._last_speech + 1 - self.origin
+
+    def last_pause(self) -> tuple[int, int] | None:
+        """Latest silent run of at least `min_pause_ms` followed by speech, relative to `origin`."""
+        if self._last_pause is None:
+            return None
+        start, end = self._last_pause
+        return max(start, self.origin) - self.origin, end - self.origin
+
+    def recent_dbfs(self, n_frames: int) -> np.ndarray:
+        """Copy of the last `n_frames` frame energies, oldest first."""
+        n_frames = min(n_frames, self.frames_seen, self.capacity)
+        end = self.frames_seen % self.capacity
+        idx = np.arange(end - n_frames, end) % self.capacity
+        return self._energy[idx]
+
+
+def has_enough_silence(audio_bytes: bytes,
+                       silence_thresh: float = -40,
+                       silence_len: int = 700,
+                       sample_rate: int = 16000) -> bool:
+    """
+    One-shot helper with the old main.has_enough_silence signature.
+    Prefer keeping a StreamingVAD alive and pushing chunks into it.
+    """
+    vad = StreamingVAD(sample_rate=sample_rate, silence_thresh=silence_thresh, min_silence_ms=silence_len)
+    vad.push(audio_bytes)
+    return vad.has_trailing_silence()